@@ -0,0 +1,71 @@
+"""
+batch_create.py file. Part of the Contextualise project.
+
+October 18, 2026
+Brett Alistair Kromkamp (brettkromkamp@gmail.com)
+
+Creating topics with the create-topic API endpoint, one request per topic, compared with the create-topics (batch)
+endpoint. The view functions are called directly (without HTTP) in a map whose search index has been built, so both
+include indexing the new topics.
+
+    python benchmarks/batch_create.py [--single 200] [--batches 1000 10000]
+"""
+
+import argparse
+import os
+import tempfile
+
+from flask_login import LoginManager, UserMixin, login_user
+from support import MAP_IDENTIFIER, USER_IDENTIFIER, create_app, create_database, format_duration, measure
+
+from contextualise import api
+from contextualise.topic_store import TopicStore
+from contextualise.utilities.search_index import search
+
+
+class User(UserMixin):
+    id = USER_IDENTIFIER
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--single", type=int, default=200)
+    parser.add_argument("--batches", type=int, nargs="+", default=[1000, 10000])
+    arguments = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "create.sqlite3")
+        create_database(path)
+        TopicStore(path).populate_map(MAP_IDENTIFIER, USER_IDENTIFIER)  # The base topics of every new map
+
+        app = create_app(path)
+        login_manager = LoginManager(app)
+        login_manager.user_loader(lambda identifier: User())
+        with app.app_context():
+            search(MAP_IDENTIFIER, "topic")  # Builds the map's search index
+
+        def create_topic(index):
+            form = {"topic-identifier": f"single-{index}", "topic-name": f"Single {index}"}
+            with app.test_request_context(method="POST", data=form):
+                login_user(User())
+                _, code = api.create_topic(str(MAP_IDENTIFIER))
+                assert code == 201
+
+        indexes = iter(range(arguments.single))
+        single = measure(lambda: create_topic(next(indexes)), arguments.single)
+        print(f"create-topic:  {format_duration(single)} per topic")
+
+        for size in arguments.batches:
+            items = [{"identifier": f"batch-{size}-{index}", "name": f"Batch {index}"} for index in range(size)]
+
+            def create_topics(items=items):
+                with app.test_request_context(method="POST", json=items):
+                    login_user(User())
+                    _, code = api.create_topics(str(MAP_IDENTIFIER))
+                    assert code == 201
+
+            print(f"create-topics: {format_duration(measure(create_topics))} for a batch of {size:,} topics")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+identifier_index.py file. Part of the Contextualise project.
+
+October 18, 2026
+Brett Alistair Kromkamp (brettkromkamp@gmail.com)
+
+Loading the identifier index of a map with many (synthetic) topics and looking up the topics an autocomplete prefix
+matches (of any type and of one type), compared with the LIKE query (`get_topic_identifiers`) the API used to run.
+
+    python benchmarks/identifier_index.py [--topics 50000]
+"""
+
+import argparse
+import os
+import random
+import sqlite3
+import tempfile
+
+from support import MAP_IDENTIFIER, add_topics, create_database, create_vocabulary, format_duration, measure
+
+from contextualise.topic_store import TopicStore
+from contextualise.utilities.identifier_index import IdentifierIndex
+
+TAGS_FRACTION = 0.1
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--topics", type=int, default=50000)
+    parser.add_argument("--prefix", default="st")
+    parser.add_argument("--repeat", type=int, default=1000)
+    arguments = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "identifiers.sqlite3")
+        create_database(path)
+        rng = random.Random(0)
+        vocabulary = create_vocabulary(rng)
+        tags = int(arguments.topics * TAGS_FRACTION)
+        connection = sqlite3.connect(path)
+        try:
+            with connection:
+                add_topics(connection, rng, vocabulary, arguments.topics - tags)
+                add_topics(connection, rng, vocabulary, tags, instance_of="tag")
+        finally:
+            connection.close()
+        store = TopicStore(path)
+
+        load = measure(lambda: IdentifierIndex(store.get_topic_name_records(MAP_IDENTIFIER)))
+        index = IdentifierIndex(store.get_topic_name_records(MAP_IDENTIFIER))
+        print(f"load the index ({len(index):,} topics): {format_duration(load)}")
+
+        prefix = arguments.prefix
+        for label, instance_ofs in (("any type", None), ("tags", ["tag"])):
+            queried = store.get_topic_identifiers(MAP_IDENTIFIER, prefix, instance_ofs=instance_ofs, limit=10)
+            # Identifier matches come first, in the query's order; then the topics that only match by name
+            assert index.lookup(prefix, instance_ofs=instance_ofs)[: len(queried)] == queried
+            looked_up = measure(
+                lambda instance_ofs=instance_ofs: index.lookup(prefix, instance_ofs=instance_ofs), arguments.repeat
+            )
+            like = measure(
+                lambda instance_ofs=instance_ofs: store.get_topic_identifiers(
+                    MAP_IDENTIFIER, prefix, instance_ofs=instance_ofs, limit=10
+                ),
+                max(arguments.repeat // 20, 1),
+            )
+            print(
+                f"'{prefix}', {label}: {format_duration(looked_up)} with the index, {format_duration(like)} with LIKE"
+            )
+
+
+if __name__ == "__main__":
+    main()
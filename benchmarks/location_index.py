@@ -0,0 +1,72 @@
+"""
+location_index.py file. Part of the Contextualise project.
+
+October 18, 2026
+Brett Alistair Kromkamp (brettkromkamp@gmail.com)
+
+Building the location index of a map with many (synthetic) locations, clustering them for a world view (computed on
+first use and then reused) and selecting the locations inside a small viewport, compared with scanning every location.
+
+    python benchmarks/location_index.py [--locations 50000]
+"""
+
+import argparse
+import random
+
+from support import format_duration, measure
+
+from contextualise.utilities.location_index import Location, LocationIndex
+
+WORLD = (-180.0, -85.0, 180.0, 85.0)
+WORLD_ZOOM = 2
+VIEWPORT = (4.7, 52.2, 5.1, 52.5)  # About the size of a city, from 'LOCATION_CLUSTER_MAX_ZOOM' on
+
+
+def create_locations(count: int) -> list[Location]:
+    rng = random.Random(0)
+    return [
+        Location(
+            f"location-{index}",
+            f"topic-{index}",
+            f"Topic {index}",
+            "",
+            rng.uniform(-60.0, 70.0),
+            rng.uniform(-180.0, 180.0),
+            f"Location {index}",
+        )
+        for index in range(count)
+    ]
+
+
+def scan(locations: list[Location], west: float, south: float, east: float, north: float) -> list[Location]:
+    return [
+        location for location in locations if west <= location.longitude <= east and south <= location.latitude <= north
+    ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--locations", type=int, default=50000)
+    parser.add_argument("--repeat", type=int, default=1000)
+    arguments = parser.parse_args()
+
+    locations = create_locations(arguments.locations)
+    print(f"build index ({len(locations):,} locations): {format_duration(measure(lambda: LocationIndex(locations)))}")
+
+    index = LocationIndex(locations)
+    first = measure(lambda: index.clusters(*WORLD, WORLD_ZOOM))
+    warm = measure(lambda: index.clusters(*WORLD, WORLD_ZOOM), arguments.repeat)
+    pins, clusters = index.clusters(*WORLD, WORLD_ZOOM)
+    print(f"world view clusters: {format_duration(first)} first, {format_duration(warm)} after that")
+    print(f"  {len(clusters):,} clusters and {len(pins):,} pins instead of {len(locations):,} pins")
+
+    assert sorted(index.within(*VIEWPORT)) == sorted(scan(locations, *VIEWPORT))
+    indexed = measure(lambda: index.within(*VIEWPORT), arguments.repeat)
+    scanned = measure(lambda: scan(locations, *VIEWPORT), max(arguments.repeat // 100, 1))
+    print(
+        f"small viewport: {format_duration(indexed)} with the index, {format_duration(scanned)} scanning every location"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+map_export.py file. Part of the Contextualise project.
+
+October 18, 2026
+Brett Alistair Kromkamp (brettkromkamp@gmail.com)
+
+Exporting a map with many (synthetic) topics, associations, notes and locations as NDJSON with `export_records`: the
+time until the first page of records is ready, the time of the whole export and the memory it takes when the chunks
+are streamed (as the export API does) compared with collecting the whole export first.
+
+    python benchmarks/map_export.py [--topics 50000]
+"""
+
+import argparse
+import os
+import random
+import sqlite3
+import tempfile
+import time
+import tracemalloc
+from itertools import chain
+
+from support import (
+    MAP_IDENTIFIER,
+    USER_IDENTIFIER,
+    add_associations,
+    add_locations,
+    add_notes,
+    add_topics,
+    create_database,
+    create_vocabulary,
+    format_duration,
+)
+
+from contextualise.topic_store import TopicStore
+from contextualise.utilities.map_export import export_records
+
+
+def peak_memory(function) -> int:
+    tracemalloc.start()
+    try:
+        function()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--topics", type=int, default=50000)
+    arguments = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "export.sqlite3")
+        create_database(path)
+        rng = random.Random(0)
+        vocabulary = create_vocabulary(rng)
+        connection = sqlite3.connect(path)
+        try:
+            with connection:
+                identifiers = add_topics(connection, rng, vocabulary, arguments.topics)
+                add_associations(connection, rng, identifiers, arguments.topics)
+                add_notes(connection, rng, vocabulary, identifiers, arguments.topics)
+                add_locations(connection, rng, identifiers, arguments.topics // 5)
+        finally:
+            connection.close()
+        store = TopicStore(path)
+        topic_map = store.get_map(MAP_IDENTIFIER, USER_IDENTIFIER)
+
+        start = time.perf_counter()
+        chunks = export_records(store, topic_map)
+        next(chunks)  # The map's header
+        first_chunk = next(chunks)
+        first_page = time.perf_counter() - start
+        lines = size = 0
+        for chunk in chain([first_chunk], chunks):
+            lines += chunk.count("\n")
+            size += len(chunk)
+        export = time.perf_counter() - start
+
+        def stream():
+            for _ in export_records(store, topic_map):
+                pass
+
+        def collect():
+            return "".join(export_records(store, topic_map))
+
+        print(f"export of {lines:,} records ({size / 1000000:.0f} MB of NDJSON)")
+        print(f"  first page of records after {format_duration(first_page)}, whole export {format_duration(export)}")
+        print(f"  peak traced memory: {peak_memory(stream) / 1000000:.1f} MB streamed", end="")
+        print(f", {peak_memory(collect) / 1000000:.1f} MB collected")
+
+
+if __name__ == "__main__":
+    main()
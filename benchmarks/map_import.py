@@ -0,0 +1,108 @@
+"""
+map_import.py file. Part of the Contextualise project.
+
+October 18, 2026
+Brett Alistair Kromkamp (brettkromkamp@gmail.com)
+
+Importing (synthetic) topics, each with a name and a text, from a CSV file with `MapImporter` (as the 'import-map'
+command does) in batches of different sizes, compared with creating the topics one at a time with the topic store's
+methods (as the views do). Every import runs in a process of its own, into a new database, to report its peak RSS.
+
+    python benchmarks/map_import.py [--topics 100000] [--batch-sizes 10000 100000]
+"""
+
+import argparse
+import csv
+import multiprocessing
+import os
+import random
+import resource
+import tempfile
+
+from support import (
+    MAP_IDENTIFIER,
+    USER_IDENTIFIER,
+    create_database,
+    create_vocabulary,
+    format_duration,
+    measure,
+    remove_database,
+)
+from topicdb.models.occurrence import Occurrence
+from topicdb.models.topic import Topic
+
+from contextualise.topic_store import TopicStore
+from contextualise.utilities.map_import import MapImporter, read_csv
+
+
+def write_csv(path: str, count: int) -> None:
+    rng = random.Random(0)
+    vocabulary = create_vocabulary(rng)
+    with open(path, "w", newline="", encoding="utf-8") as file:
+        writer = csv.writer(file)
+        writer.writerow(["identifier", "name", "text"])
+        for index in range(count):
+            name = " ".join(rng.sample(vocabulary, rng.randint(1, 3)))
+            writer.writerow(
+                [f"{name.replace(' ', '-')}-{index}", name.title(), " ".join(rng.choices(vocabulary, k=12))]
+            )
+
+
+def create_store(path: str) -> TopicStore:
+    remove_database(path)
+    create_database(path)
+    store = TopicStore(path)
+    store.populate_map(MAP_IDENTIFIER, USER_IDENTIFIER)  # The base topics of every new map
+    return store
+
+
+def import_csv(database_path: str, csv_path: str, batch_size: int) -> None:
+    store = create_store(database_path)
+    with open(csv_path, newline="", encoding="utf-8") as file:
+        progress = MapImporter(store, MAP_IDENTIFIER, batch_size=batch_size).import_records(read_csv(file))
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024  # Kilobytes on Linux
+    print(
+        f"batches of {batch_size:,}: {progress.records:,} topics in {format_duration(progress.seconds)} "
+        f"({progress.records / progress.seconds:,.0f} topics/s), peak RSS {peak_rss:.0f} MB"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--topics", type=int, default=100000)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[10000, 100000])
+    parser.add_argument("--single", type=int, default=200)
+    arguments = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        csv_path = os.path.join(directory, "topics.csv")
+        database_path = os.path.join(directory, "import.sqlite3")
+        write_csv(csv_path, arguments.topics)
+
+        for batch_size in arguments.batch_sizes:
+            process = multiprocessing.Process(target=import_csv, args=(database_path, csv_path, batch_size))
+            process.start()
+            process.join()
+
+        store = create_store(database_path)
+        with open(csv_path, newline="", encoding="utf-8") as file:
+            rows = csv.DictReader(file)
+
+            def create_topic():
+                row = next(rows)
+                topic = Topic(row["identifier"], "topic", row["name"])
+                store.create_topic(MAP_IDENTIFIER, topic)
+                store.create_occurrence(
+                    MAP_IDENTIFIER,
+                    Occurrence(instance_of="text", topic_identifier=topic.identifier, resource_data=row["text"]),
+                )
+
+            single = measure(create_topic, arguments.single)
+        print(
+            f"one at a time: {format_duration(single)} per topic "
+            f"({format_duration(single * arguments.topics)} for {arguments.topics:,} topics)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+markdown_rendering.py file. Part of the Contextualise project.
+
+October 18, 2026
+Brett Alistair Kromkamp (brettkromkamp@gmail.com)
+
+Rendering a typical note (with a table, strikethrough and a footnote) with a markdown parser created for every render,
+as the views used to, and with the shared parser of `utilities.markdown`; and serving the note's (raw occurrence bytes)
+from the rendered markdown cache.
+
+    python benchmarks/markdown_rendering.py [--repeat 5000]
+"""
+
+import argparse
+
+import mistune
+from support import format_duration, measure
+
+from contextualise.utilities.highlight_renderer import HighlightRenderer
+from contextualise.utilities.markdown import DEFAULT_PLUGINS, get_markdown, render_markdown
+
+NOTE = """# Release notes
+
+The importer now ~~loads~~ streams the file[^1] and reports its progress:
+
+| Records | Seconds | Records/s |
+|--------:|--------:|----------:|
+| 100,000 |    43.5 |     2,298 |
+| 500,000 |   219.0 |     2,283 |
+
+[^1]: One batch at a time.
+"""
+NOTE_BYTES = NOTE.encode("utf-8")
+
+
+def render_with_new_parser() -> str:
+    markdown = mistune.create_markdown(renderer=HighlightRenderer(escape=False), plugins=list(DEFAULT_PLUGINS))
+    return markdown(NOTE)
+
+
+def render_with_shared_parser() -> str:
+    return get_markdown()(NOTE)
+
+
+def render_from_cache() -> str:
+    return render_markdown(NOTE_BYTES)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5000)
+    arguments = parser.parse_args()
+
+    assert render_with_new_parser() == render_with_shared_parser() == render_from_cache()
+    print(f"parser per render: {format_duration(measure(render_with_new_parser, arguments.repeat))} per note")
+    print(f"shared parser:     {format_duration(measure(render_with_shared_parser, arguments.repeat))} per note")
+    print(f"cache hit:         {format_duration(measure(render_from_cache, arguments.repeat))} per note")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,307 @@
+"""
+network_graph.py file. Part of the Contextualise project.
+
+October 18, 2026
+Brett Alistair Kromkamp (brettkromkamp@gmail.com)
+
+Building the network graph of a map whose associations form one large (synthetic) tree: recursively, with a query
+counting the associations of every node, as `api.get_network` used to; and with `api._build_network`.
+
+Building a bounded network graph (as the network API does) around the best connected topic of a map with skewed
+(synthetic) association degrees: with a query for the associated topics of every topic that is expanded, as
+`api._build_network` used to; with the map's adjacency snapshot, first built on demand and then from the cache.
+
+    python benchmarks/network_graph.py [--topics 10000] [--associations 30000]
+"""
+
+import argparse
+import os
+import random
+import sqlite3
+import tempfile
+import time
+import uuid
+from collections import deque
+
+from support import (
+    MAP_IDENTIFIER,
+    add_associations,
+    add_topics,
+    create_app,
+    create_database,
+    create_vocabulary,
+    format_duration,
+    measure,
+)
+from topicdb.models.topic import Topic
+from typedtree.tree import Tree
+
+from contextualise import api
+from contextualise.api import _build_network
+from contextualise.utilities.map_cache import network_cache
+
+# The network API's default limits
+MAXIMUM_DEPTH = 4
+MAXIMUM_CHILDREN = 50
+MAXIMUM_NODES = 500
+
+
+def create_tree(path: str, count: int) -> tuple[Tree, str]:
+    """
+    Add the topics and one association from a (recently added) parent to every topic but the first.
+    :return: The tree of the topics (as the topic store's network traversal returned it to the previous builder) and
+        its root.
+    """
+    rng = random.Random(0)
+    connection = sqlite3.connect(path)
+    try:
+        with connection:
+            identifiers = add_topics(connection, rng, create_vocabulary(rng), count)
+            tree = Tree()
+            tree.add_node(identifiers[0], node_type="topic", payload={"level": 0, "topic": Topic(identifiers[0])})
+            associations = []
+            members = []
+            for index, identifier in enumerate(identifiers[1:], start=1):
+                parent = rng.choice(identifiers[max(index - 200, 0) : index])
+                tree.add_node(
+                    identifier,
+                    parent_pointer=parent,
+                    node_type="topic",
+                    edge_type="related",
+                    payload={"level": tree[parent].payload["level"] + 1, "topic": Topic(identifier)},
+                )
+                association_identifier = f"association-{index:07d}"
+                associations.append((MAP_IDENTIFIER, association_identifier, "related", "*"))
+                members.append(
+                    (
+                        MAP_IDENTIFIER,
+                        str(uuid.uuid4()),
+                        association_identifier,
+                        parent,
+                        "related",
+                        identifier,
+                        "related",
+                    )
+                )
+            connection.executemany("INSERT INTO topic VALUES (?, ?, ?, ?)", associations)
+            connection.executemany("INSERT INTO member VALUES (?, ?, ?, ?, ?, ?, ?)", members)
+    finally:
+        connection.close()
+    return tree, identifiers[0]
+
+
+def build_network_recursively(path: str, tree: Tree, topic_identifier: str) -> tuple[list, list]:
+    def get_topic_associations_count(identifier):
+        # As the topic store did: a connection and a query per topic
+        connection = sqlite3.connect(path)
+        try:
+            return connection.execute(
+                "SELECT COUNT(DISTINCT association_identifier) FROM member "
+                "WHERE map_identifier = ? AND (src_topic_ref = ? OR dest_topic_ref = ?)",
+                (MAP_IDENTIFIER, identifier, identifier),
+            ).fetchone()[0]
+        finally:
+            connection.close()
+
+    result = ([], [])
+
+    def build_network(inner_identifier):
+        level = tree[inner_identifier].payload["level"]
+        color = "#F00" if inner_identifier == topic_identifier else f"#{level * 3}{level * 3}{level * 3}"
+        result[0].append(
+            {
+                "id": inner_identifier,
+                "label": tree[inner_identifier].payload["topic"].first_base_name.name,
+                "instanceOf": tree[inner_identifier].payload["topic"].instance_of,
+                "value": get_topic_associations_count(inner_identifier),
+                "color": color,
+            }
+        )
+        for child in tree[inner_identifier].children:
+            result[1].append(
+                {
+                    "from": inner_identifier,
+                    "to": child.pointer,
+                    "label": child.type,
+                    "font": {"align": "middle"},
+                    "color": {"color": "#666", "opacity": 0.5},
+                }
+            )
+            build_network(child.pointer)  # Recursive call
+
+    build_network(topic_identifier)
+    return result
+
+
+class QueryAdjacency:
+    """
+    The associated topics of a topic retrieved with a query (and a connection) per topic, as the topic store's
+    `get_topic_neighbours` did, in the shape of an `AdjacencySnapshot`.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._last = (None, None, [])  # The traversal asks for a topic's neighbours and then for their number
+
+    def neighbours(self, identifier, scope=None, offset=0, limit=None):
+        if self._last[:2] != (identifier, scope):
+            self._last = (identifier, scope, self._get_neighbours(identifier, scope))
+        return self._last[2][offset : None if limit is None else offset + limit]
+
+    def neighbours_count(self, identifier, scope=None):
+        return len(self.neighbours(identifier, scope))
+
+    def associations_counts(self, identifiers):
+        identifiers = list(identifiers)
+        result = dict.fromkeys(identifiers, 0)
+        connection = sqlite3.connect(self.path)
+        try:
+            for start in range(0, len(identifiers), 400):
+                chunk = identifiers[start : start + 400]
+                placeholders = ", ".join("?" * len(chunk))
+                for topic_ref, count in connection.execute(
+                    f"""SELECT topic_ref, COUNT(DISTINCT association_identifier) FROM (
+                        SELECT src_topic_ref AS topic_ref, association_identifier FROM member
+                        WHERE map_identifier = ? AND src_topic_ref IN ({placeholders})
+                        UNION ALL
+                        SELECT dest_topic_ref AS topic_ref, association_identifier FROM member
+                        WHERE map_identifier = ? AND dest_topic_ref IN ({placeholders}))
+                    GROUP BY topic_ref""",
+                    (MAP_IDENTIFIER, *chunk, MAP_IDENTIFIER, *chunk),
+                ):
+                    result[topic_ref] = count
+        finally:
+            connection.close()
+        return result
+
+    def _get_neighbours(self, identifier, scope):
+        scope_condition = " AND topic.scope = ?" if scope else ""
+        connection = sqlite3.connect(self.path)
+        try:
+            records = connection.execute(
+                f"""SELECT member.src_topic_ref, member.dest_topic_ref, topic.instance_of
+                FROM member
+                JOIN topic ON topic.map_identifier = member.map_identifier AND
+                    topic.identifier = member.association_identifier AND
+                    topic.scope IS NOT NULL
+                WHERE member.map_identifier = ? AND
+                (member.src_topic_ref = ? OR member.dest_topic_ref = ?){scope_condition}
+                ORDER BY topic.identifier""",
+                (MAP_IDENTIFIER, identifier, identifier, *((scope,) if scope else ())),
+            ).fetchall()
+        finally:
+            connection.close()
+        result = []
+        neighbours = set()
+        for src_topic_ref, dest_topic_ref, instance_of in records:
+            for topic_ref in (src_topic_ref, dest_topic_ref):
+                if topic_ref != identifier and topic_ref not in neighbours:
+                    neighbours.add(topic_ref)
+                    result.append((topic_ref, instance_of))
+        return result
+
+
+def graph(nodes: list, edges: list) -> tuple[dict, set]:
+    return (
+        {node["id"]: node["value"] for node in nodes},
+        {(edge["from"], edge["to"], edge["label"]) for edge in edges},
+    )
+
+
+def benchmark_tree(directory: str, topics: int) -> None:
+    path = os.path.join(directory, "tree.sqlite3")
+    create_database(path)
+    tree, root = create_tree(path, topics)
+    app = create_app(path)  # `_build_network` looks the map's adjacency snapshot up through the application
+    store = app.extensions["topic_store"]
+
+    start = time.perf_counter()
+    previous = build_network_recursively(path, tree, root)
+    recursive = time.perf_counter() - start
+
+    with app.app_context():
+        start = time.perf_counter()
+        nodes, edges, _ = _build_network(store, MAP_IDENTIFIER, root, None, topics, topics, topics)
+        current = time.perf_counter() - start
+
+    assert graph(*previous) == graph(nodes, edges)
+    print(f"tree of {len(nodes):,} topics")
+    print(f"  recursive, a count query per topic: {format_duration(recursive)}")
+    print(f"  _build_network:                     {format_duration(current)}")
+
+
+def benchmark_hub(directory: str, topics: int, associations: int) -> None:
+    path = os.path.join(directory, "hub.sqlite3")
+    create_database(path)
+    rng = random.Random(0)
+    connection = sqlite3.connect(path)
+    try:
+        with connection:
+            identifiers = add_topics(connection, rng, create_vocabulary(rng), topics)
+            add_associations(connection, rng, identifiers, associations)
+    finally:
+        connection.close()
+    app = create_app(path)
+    store = app.extensions["topic_store"]
+    hub = identifiers[0]
+
+    def build_network():
+        with app.app_context():
+            return _build_network(store, MAP_IDENTIFIER, hub, None, MAXIMUM_DEPTH, MAXIMUM_CHILDREN, MAXIMUM_NODES)
+
+    get_adjacency = api._get_adjacency
+    api._get_adjacency = lambda map_identifier: QueryAdjacency(path)
+    try:
+        start = time.perf_counter()
+        previous = build_network()
+        queried = time.perf_counter() - start
+    finally:
+        api._get_adjacency = get_adjacency
+
+    network_cache.invalidate(MAP_IDENTIFIER)
+    start = time.perf_counter()
+    current = build_network()
+    cold = time.perf_counter() - start
+    warm = measure(build_network, 20)
+
+    adjacency = network_cache.get(MAP_IDENTIFIER)
+    traversal = measure(lambda: traverse(adjacency, hub), 100)
+
+    assert previous == current
+    print(
+        f"{len(current[0]):,} topics around the best connected one ({topics:,} topics, {associations:,} associations)"
+    )
+    print(f"  a query per expanded topic:       {format_duration(queried)}")
+    print(f"  snapshot built on demand (cold):  {format_duration(cold)}")
+    print(f"  cached snapshot (warm):           {format_duration(warm)}")
+    print(f"    of which the traversal:         {format_duration(traversal)}")
+
+
+def traverse(adjacency, topic_identifier: str) -> dict:
+    # The (bounded) breadth-first traversal of `_build_network` without the topics' names and types
+    levels = {topic_identifier: 0}
+    queue = deque([topic_identifier])
+    while queue and len(levels) < MAXIMUM_NODES:
+        identifier = queue.popleft()
+        if levels[identifier] >= MAXIMUM_DEPTH:
+            continue
+        for neighbour, _ in adjacency.neighbours(identifier, limit=MAXIMUM_CHILDREN):
+            if neighbour not in levels and len(levels) < MAXIMUM_NODES:
+                levels[neighbour] = levels[identifier] + 1
+                queue.append(neighbour)
+    return levels
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--topics", type=int, default=10000)
+    parser.add_argument("--associations", type=int, default=30000)
+    arguments = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        benchmark_tree(directory, arguments.topics)
+        benchmark_hub(directory, arguments.topics, arguments.associations)
+
+
+if __name__ == "__main__":
+    main()
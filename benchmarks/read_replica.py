@@ -0,0 +1,119 @@
+"""
+read_replica.py file. Part of the Contextualise project.
+
+October 18, 2026
+Brett Alistair Kromkamp (brettkromkamp@gmail.com)
+
+Reader processes that keep scanning a map with many (synthetic) topics while an editor commits small batches of
+topics, with the readers reading the primary database and reading the read replica's snapshot: the latency of the
+editor's commits and the size of the primary's write-ahead log (whose checkpoints can't complete while readers hold
+on to it). Also the time it takes to make the snapshot.
+
+    python benchmarks/read_replica.py [--topics 200000] [--readers 4] [--duration 10]
+"""
+
+import argparse
+import multiprocessing
+import os
+import random
+import sqlite3
+import tempfile
+import time
+import uuid
+
+from support import (
+    MAP_IDENTIFIER,
+    add_topics,
+    create_database,
+    create_vocabulary,
+    format_duration,
+    measure,
+    percentile,
+)
+from topicdb.models.topic import Topic
+
+from contextualise.topic_store import TopicStore
+from contextualise.utilities.database import set_journal_mode
+from contextualise.utilities.read_replica import ReadReplica
+
+
+def read(path: str, stop) -> None:
+    store = TopicStore(path, pool_size=1)
+    while not stop.is_set():
+        store.get_topic_name_records(MAP_IDENTIFIER)  # A whole-map scan, like (re)building a map's indexes
+
+
+def write(path: str, duration: float, results: multiprocessing.Queue) -> None:
+    store = TopicStore(path, pool_size=1)
+    latencies = []
+    end = time.monotonic() + duration
+    while time.monotonic() < end:
+        topics = [Topic(f"written-{uuid.uuid4().hex}", "topic", "Written") for _ in range(10)]
+        start = time.perf_counter()
+        store.create_entities(MAP_IDENTIFIER, topics=topics)
+        latencies.append(time.perf_counter() - start)
+        time.sleep(0.01)
+    results.put(latencies)
+
+
+def run(primary_path: str, readers_path: str, readers: int, duration: float) -> tuple[list[float], int]:
+    stop = multiprocessing.Event()
+    results = multiprocessing.Queue()
+    reader_processes = [multiprocessing.Process(target=read, args=(readers_path, stop)) for _ in range(readers)]
+    for process in reader_processes:
+        process.start()
+    time.sleep(1)  # The readers are busy by the time the editor starts
+
+    writer_process = multiprocessing.Process(target=write, args=(primary_path, duration, results))
+    writer_process.start()
+    latencies = results.get()
+    writer_process.join()
+    stop.set()
+    for process in reader_processes:
+        process.join()
+
+    wal_path = f"{primary_path}-wal"
+    wal_size = os.path.getsize(wal_path) if os.path.exists(wal_path) else 0
+    connection = sqlite3.connect(primary_path)
+    try:
+        connection.execute("PRAGMA wal_checkpoint(TRUNCATE)")  # The next run starts with an empty log
+    finally:
+        connection.close()
+    return latencies, wal_size
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--topics", type=int, default=200000)
+    parser.add_argument("--readers", type=int, default=4)
+    parser.add_argument("--duration", type=float, default=10.0)
+    arguments = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "primary.sqlite3")
+        create_database(path)
+        rng = random.Random(0)
+        connection = sqlite3.connect(path)
+        try:
+            with connection:
+                add_topics(connection, rng, create_vocabulary(rng), arguments.topics)
+        finally:
+            connection.close()
+        set_journal_mode(path, "WAL")
+
+        replica = ReadReplica(path, os.path.join(directory, "primary-replica.sqlite3"), 60.0, TopicStore)
+        snapshot = measure(replica.refresh)
+        size = os.path.getsize(replica.snapshot_path)
+        print(f"snapshot of {size / 1000000:.0f} MB in {format_duration(snapshot)}")
+
+        for label, readers_path in (("primary", path), ("snapshot", replica.snapshot_path)):
+            latencies, wal_size = run(path, readers_path, arguments.readers, arguments.duration)
+            print(
+                f"readers on the {label}: {len(latencies):,} commits, p50 {format_duration(percentile(latencies, 0.5))}, "
+                f"p99 {format_duration(percentile(latencies, 0.99))}, max {format_duration(max(latencies))}, "
+                f"WAL {wal_size / 1000000:.1f} MB"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+resource_store.py file. Part of the Contextualise project.
+
+October 18, 2026
+Brett Alistair Kromkamp (brettkromkamp@gmail.com)
+
+Storing an uploaded file with `save_resource` (which hashes its content) compared with saving it under a new name with
+`FileStorage.save`, as the views used to; and the disk space taken by the same file uploaded several times, to the same
+map and to other maps.
+
+    python benchmarks/resource_store.py [--size 64] [--uploads 4]
+"""
+
+import argparse
+import os
+import tempfile
+import time
+import uuid
+
+from support import create_app, create_database, format_duration
+from werkzeug.datastructures import FileStorage
+
+from contextualise.utilities.resource_store import get_map_directory, save_resource
+
+
+def disk_usage(directory: str) -> tuple[int, int]:
+    """
+    :return: The number of (non-hidden) files in the directory and its subdirectories, and the size of the distinct
+        files (inodes) among them.
+    """
+    files = 0
+    inodes = {}
+    for root, _, file_names in os.walk(directory):
+        for file_name in file_names:
+            if not file_name.startswith("."):
+                status = os.stat(os.path.join(root, file_name))
+                files += 1
+                inodes[status.st_ino] = status.st_size
+    return files, sum(inodes.values())
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, default=64, help="MiB")
+    parser.add_argument("--uploads", type=int, default=4)
+    arguments = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        upload_path = os.path.join(directory, "upload.bin")
+        with open(upload_path, "wb") as file:
+            file.write(os.urandom(arguments.size * 1024 * 1024))
+
+        database_path = os.path.join(directory, "resources.sqlite3")
+        create_database(database_path)
+        app = create_app(database_path, static_folder=os.path.join(directory, "static"))
+        with app.app_context(), open(upload_path, "rb") as upload:
+            saved_path = os.path.join(directory, f"{uuid.uuid4()}.bin")
+            start = time.perf_counter()
+            FileStorage(upload).save(saved_path)
+            saved = time.perf_counter() - start
+            os.remove(saved_path)
+
+            upload.seek(0)
+            start = time.perf_counter()
+            save_resource(1, upload, "bin")
+            stored = time.perf_counter() - start
+            print(f"new {arguments.size} MiB file: {format_duration(stored)} stored, {format_duration(saved)} saved")
+
+            for index in range(1, arguments.uploads):
+                upload.seek(0)
+                save_resource(1 + index % 2, upload, "bin")  # Alternately to a second map and to the first one again
+            resources_directory = os.path.dirname(get_map_directory(1))
+            files, size = disk_usage(resources_directory)
+            print(
+                f"{arguments.uploads} uploads of the same file to two maps: {files} files, "
+                f"{size / 1024 / 1024:.0f} MiB on disk instead of {arguments.uploads * arguments.size} MiB"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+search_index.py file. Part of the Contextualise project.
+
+October 18, 2026
+Brett Alistair Kromkamp (brettkromkamp@gmail.com)
+
+Building the full-text search index of a map with many (synthetic) notes on its first search and then searching it
+for two words, compared with finding the notes containing both words with a LIKE scan of the occurrences.
+
+    python benchmarks/search_index.py [--notes 50000] [--words 80] [--query "..."]
+
+The default query is two words of the (random) vocabulary; the words of the search text are matched as prefixes.
+"""
+
+import argparse
+import os
+import random
+import sqlite3
+import tempfile
+
+from support import (
+    MAP_IDENTIFIER,
+    add_notes,
+    add_topics,
+    create_app,
+    create_database,
+    create_vocabulary,
+    format_duration,
+    measure,
+)
+
+from contextualise.utilities.search_index import drop_search_index, search
+
+
+def like_scan(path: str, words: list[str]) -> int:
+    connection = sqlite3.connect(path)
+    try:
+        conditions = " AND ".join("CAST(resource_data AS TEXT) LIKE ?" for _ in words)
+        return connection.execute(
+            f"SELECT COUNT(*) FROM occurrence WHERE map_identifier = ? AND {conditions}",
+            (MAP_IDENTIFIER, *(f"%{word}%" for word in words)),
+        ).fetchone()[0]
+    finally:
+        connection.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--notes", type=int, default=50000)
+    parser.add_argument("--words", type=int, default=80)
+    parser.add_argument("--query")
+    parser.add_argument("--repeat", type=int, default=20)
+    arguments = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "search.sqlite3")
+        create_database(path)
+        rng = random.Random(0)
+        vocabulary = create_vocabulary(rng)
+        connection = sqlite3.connect(path)
+        try:
+            with connection:
+                identifiers = add_topics(connection, rng, vocabulary, 1000)
+                add_notes(connection, rng, vocabulary, identifiers, arguments.notes, arguments.words)
+        finally:
+            connection.close()
+
+        query = arguments.query or " ".join(vocabulary[:2])
+        words = query.split()
+        with create_app(path).app_context():
+            drop_search_index(MAP_IDENTIFIER)
+            build = measure(lambda: search(MAP_IDENTIFIER, query))
+            count, _ = search(MAP_IDENTIFIER, query)
+            searched = measure(lambda: search(MAP_IDENTIFIER, query), arguments.repeat)
+
+        scanned = measure(lambda: like_scan(path, words), max(arguments.repeat // 4, 1))
+        print(f"first search, building the index ({arguments.notes:,} notes): {format_duration(build)}")
+        print(f"search for '{query}' ({count:,} matches):  {format_duration(searched)}")
+        print(f"LIKE scan ({like_scan(path, words):,} matches): {format_duration(scanned)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+similar_topics.py file. Part of the Contextualise project.
+
+October 18, 2026
+Brett Alistair Kromkamp (brettkromkamp@gmail.com)
+
+Building the trigram index of a map with many (synthetic) topics and finding the topics most similar to a few
+(misspelled) queries, compared with comparing the query with the (precomputed) trigrams of every topic.
+
+    python benchmarks/similar_topics.py [--topics 100000]
+"""
+
+import argparse
+import os
+import random
+import sqlite3
+import tempfile
+import uuid
+from heapq import nlargest
+
+from support import MAP_IDENTIFIER, add_topics, create_database, create_vocabulary, format_duration, measure
+
+from contextualise.topic_store import TopicStore
+from contextualise.utilities.trigram_index import TrigramIndex, trigrams
+
+THRESHOLD = 0.25
+
+
+def scan(topics: dict[str, list[frozenset[str]]], query: str, limit: int = 5) -> list[tuple[str, float]]:
+    query_trigrams = trigrams(query)
+    similarities = {}
+    for identifier, texts_trigrams in topics.items():
+        similarity = max(
+            len(query_trigrams & text_trigrams) / len(query_trigrams | text_trigrams)
+            for text_trigrams in texts_trigrams
+        )
+        if similarity >= THRESHOLD:
+            similarities[identifier] = similarity
+    return nlargest(limit, similarities.items(), key=lambda item: (item[1], item[0]))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--topics", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=20)
+    arguments = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "similar.sqlite3")
+        create_database(path)
+        rng = random.Random(0)
+        vocabulary = create_vocabulary(rng)
+        connection = sqlite3.connect(path)
+        try:
+            with connection:
+                identifiers = add_topics(connection, rng, vocabulary, arguments.topics - 1)
+                connection.execute("INSERT INTO topic VALUES (?, 'neural-networks', 'topic', NULL)", (MAP_IDENTIFIER,))
+                connection.execute(
+                    "INSERT INTO basename VALUES (?, ?, 'Neural Networks', 'neural-networks', '*', 'eng')",
+                    (MAP_IDENTIFIER, str(uuid.uuid4())),
+                )
+        finally:
+            connection.close()
+        records = TopicStore(path).get_topic_name_records(MAP_IDENTIFIER)
+
+        build = measure(lambda: TrigramIndex(records))
+        index = TrigramIndex(records)
+        print(f"build the index ({len(index):,} topics): {format_duration(build)}")
+
+        topics = {}
+        for identifier, _, name in records:
+            texts_trigrams = topics.setdefault(identifier, [trigrams(identifier)])
+            if name:
+                texts_trigrams.append(trigrams(name))
+
+        misspelled = identifiers[0].rsplit("-", 1)[0].replace("-", " ")[:-1]  # An existing name missing a letter
+        for query in ("nueral netwrk", misspelled):
+            similar = index.similar(query, threshold=THRESHOLD)
+            assert [topic.identifier for topic in similar] == [identifier for identifier, _ in scan(topics, query)]
+            indexed = measure(lambda query=query: index.similar(query, threshold=THRESHOLD), arguments.repeat)
+            scanned = measure(lambda query=query: scan(topics, query), max(arguments.repeat // 10, 1))
+            print(f"'{query}': {format_duration(indexed)} with the index, {format_duration(scanned)} scanning")
+            print(f"  {', '.join(f'{topic.identifier} ({topic.similarity})' for topic in similar[:3])}")
+
+
+if __name__ == "__main__":
+    main()
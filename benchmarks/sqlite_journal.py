@@ -0,0 +1,118 @@
+"""
+sqlite_journal.py file. Part of the Contextualise project.
+
+October 18, 2026
+Brett Alistair Kromkamp (brettkromkamp@gmail.com)
+
+One writer process committing large batches of topics into a map with many (synthetic) topics while reader processes
+look up topics, with SQLite's rollback journal (the previous default) and in WAL mode: the latency of the reads (in
+particular the longest stall) and the number of failed reads and writes.
+
+    python benchmarks/sqlite_journal.py [--topics 200000] [--readers 4] [--duration 8]
+"""
+
+import argparse
+import multiprocessing
+import os
+import random
+import shutil
+import sqlite3
+import tempfile
+import time
+
+from support import (
+    MAP_IDENTIFIER,
+    add_topics,
+    create_database,
+    create_vocabulary,
+    format_duration,
+    percentile,
+    remove_database,
+)
+from topicdb.models.topic import Topic
+from topicdb.topicdberror import TopicDbError
+
+from contextualise.topic_store import TopicStore
+from contextualise.utilities.database import set_journal_mode
+
+WRITE_BATCH_SIZE = 20000
+
+
+def write(path: str, duration: float, results: multiprocessing.Queue) -> None:
+    store = TopicStore(path)
+    batches = errors = 0
+    end = time.monotonic() + duration
+    while time.monotonic() < end:
+        topics = [Topic(f"written-{batches}-{index}", "topic", f"Written {index}") for index in range(WRITE_BATCH_SIZE)]
+        try:
+            store.create_entities(MAP_IDENTIFIER, topics=topics)
+            batches += 1
+        except TopicDbError:
+            errors += 1
+    results.put(("writer", batches, errors, []))
+
+
+def read(path: str, identifiers: list[str], duration: float, results: multiprocessing.Queue) -> None:
+    store = TopicStore(path)
+    rng = random.Random(os.getpid())
+    latencies = []
+    errors = 0
+    end = time.monotonic() + duration
+    while time.monotonic() < end:
+        start = time.perf_counter()
+        try:
+            store.get_topic_instance_ofs(MAP_IDENTIFIER, rng.sample(identifiers, 10))
+            latencies.append(time.perf_counter() - start)
+        except (TopicDbError, sqlite3.Error):
+            errors += 1
+    results.put(("reader", len(latencies), errors, latencies))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--topics", type=int, default=200000)
+    parser.add_argument("--readers", type=int, default=4)
+    parser.add_argument("--duration", type=float, default=8.0)
+    arguments = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        template_path = os.path.join(directory, "template.sqlite3")
+        create_database(template_path)
+        rng = random.Random(0)
+        connection = sqlite3.connect(template_path)
+        try:
+            with connection:
+                identifiers = add_topics(connection, rng, create_vocabulary(rng), arguments.topics)
+        finally:
+            connection.close()
+
+        path = os.path.join(directory, "journal.sqlite3")
+        for journal_mode in ("DELETE", "WAL"):
+            remove_database(path)
+            shutil.copy(template_path, path)
+            set_journal_mode(path, journal_mode)
+
+            results = multiprocessing.Queue()
+            processes = [multiprocessing.Process(target=write, args=(path, arguments.duration, results))]
+            processes.extend(
+                multiprocessing.Process(target=read, args=(path, identifiers, arguments.duration, results))
+                for _ in range(arguments.readers)
+            )
+            for process in processes:
+                process.start()
+            reports = [results.get() for _ in processes]
+            for process in processes:
+                process.join()
+
+            _, batches, write_errors, _ = next(report for report in reports if report[0] == "writer")
+            latencies = [latency for report in reports if report[0] == "reader" for latency in report[3]]
+            read_errors = sum(report[2] for report in reports if report[0] == "reader")
+            print(
+                f"{journal_mode:6} {batches} batches written ({write_errors} failed), {len(latencies):,} reads "
+                f"({read_errors} failed): p50 {format_duration(percentile(latencies, 0.5))}, "
+                f"p99 {format_duration(percentile(latencies, 0.99))}, max {format_duration(max(latencies))}"
+            )
+
+
+if __name__ == "__main__":
+    main()
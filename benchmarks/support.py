@@ -0,0 +1,170 @@
+"""
+support.py file. Part of the Contextualise project.
+
+October 18, 2026
+Brett Alistair Kromkamp (brettkromkamp@gmail.com)
+"""
+
+import os
+import random
+import sqlite3
+import string
+import time
+import uuid
+from collections.abc import Callable
+
+from flask import Flask
+
+from contextualise import topic_store
+from contextualise.topic_store import TopicStore
+
+MAP_IDENTIFIER = 1
+USER_IDENTIFIER = 1
+
+
+def measure(function: Callable, repeat: int = 1) -> float:
+    """
+    :return: The mean duration of a call (in seconds).
+    """
+    start = time.perf_counter()
+    for _ in range(repeat):
+        function()
+    return (time.perf_counter() - start) / repeat
+
+
+def percentile(values: list[float], fraction: float) -> float:
+    values = sorted(values)
+    return values[min(int(len(values) * fraction), len(values) - 1)]
+
+
+def format_duration(seconds: float) -> str:
+    if seconds >= 1:
+        return f"{seconds:.2f} s"
+    if seconds >= 0.001:
+        return f"{seconds * 1000:.2f} ms"
+    return f"{seconds * 1000000:.1f} us"
+
+
+def create_vocabulary(rng: random.Random, size: int = 5000) -> list[str]:
+    return ["".join(rng.choices(string.ascii_lowercase, k=rng.randint(4, 10))) for _ in range(size)]
+
+
+def create_database(path: str) -> None:
+    """
+    Create a topic store database with a single (empty) map owned by `USER_IDENTIFIER`.
+    """
+    TopicStore(path).create_database()
+    connection = sqlite3.connect(path)
+    try:
+        with connection:
+            connection.execute(
+                "INSERT INTO map (identifier, name, description, image_path, initialised) VALUES (?, ?, '', '', 1)",
+                (MAP_IDENTIFIER, "Benchmark"),
+            )
+            connection.execute(
+                "INSERT INTO user_map (user_identifier, map_identifier, owner, collaboration_mode) VALUES (?, ?, 1, ?)",
+                (USER_IDENTIFIER, MAP_IDENTIFIER, "edit"),
+            )
+    finally:
+        connection.close()
+
+
+def add_topics(
+    connection: sqlite3.Connection, rng: random.Random, vocabulary: list[str], count: int, instance_of: str = "topic"
+) -> list[str]:
+    """
+    Add topics, each with a base name of one to three words from the vocabulary.
+    :return: The topics' identifiers.
+    """
+    identifiers = []
+    topics = []
+    base_names = []
+    for index in range(count):
+        name = " ".join(rng.sample(vocabulary, rng.randint(1, 3)))
+        identifier = f"{name.replace(' ', '-')}-{index}"
+        identifiers.append(identifier)
+        topics.append((MAP_IDENTIFIER, identifier, instance_of, None))
+        base_names.append((MAP_IDENTIFIER, str(uuid.uuid4()), name.title(), identifier, "*", "eng"))
+    connection.executemany("INSERT INTO topic VALUES (?, ?, ?, ?)", topics)
+    connection.executemany("INSERT INTO basename VALUES (?, ?, ?, ?, ?, ?)", base_names)
+    return identifiers
+
+
+def add_associations(connection: sqlite3.Connection, rng: random.Random, identifiers: list[str], count: int) -> None:
+    """
+    Add 'related' associations with skewed degrees: the sources follow a Pareto distribution over the topics (the
+    first topic being the best connected one) and the destinations are uniformly distributed.
+    """
+    associations = []
+    members = []
+    for index in range(count):
+        association_identifier = f"association-{index:07d}"
+        source = identifiers[min(int(rng.paretovariate(1.2)) - 1, len(identifiers) - 1)]
+        destination = rng.choice(identifiers)
+        associations.append((MAP_IDENTIFIER, association_identifier, "related", "*"))
+        members.append(
+            (MAP_IDENTIFIER, str(uuid.uuid4()), association_identifier, source, "related", destination, "related")
+        )
+    connection.executemany("INSERT INTO topic VALUES (?, ?, ?, ?)", associations)
+    connection.executemany("INSERT INTO member VALUES (?, ?, ?, ?, ?, ?, ?)", members)
+
+
+def add_notes(
+    connection: sqlite3.Connection,
+    rng: random.Random,
+    vocabulary: list[str],
+    identifiers: list[str],
+    count: int,
+    words: int = 80,
+) -> None:
+    notes = [
+        (
+            MAP_IDENTIFIER,
+            str(uuid.uuid4()),
+            "note",
+            "*",
+            "",
+            " ".join(rng.choices(vocabulary, k=words)).encode("utf-8"),
+            rng.choice(identifiers),
+            "eng",
+        )
+        for _ in range(count)
+    ]
+    connection.executemany("INSERT INTO occurrence VALUES (?, ?, ?, ?, ?, ?, ?, ?)", notes)
+
+
+def add_locations(connection: sqlite3.Connection, rng: random.Random, identifiers: list[str], count: int) -> None:
+    occurrences = []
+    attributes = []
+    for index in range(count):
+        occurrence_identifier = str(uuid.uuid4())
+        coordinates = f"{rng.uniform(-60, 70):.5f}, {rng.uniform(-180, 180):.5f}"
+        occurrences.append(
+            (MAP_IDENTIFIER, occurrence_identifier, "location", "*", "", None, rng.choice(identifiers), "eng")
+        )
+        for name, value in (("geographic-coordinates", coordinates), ("location-name", f"Location {index}")):
+            attributes.append(
+                (MAP_IDENTIFIER, str(uuid.uuid4()), occurrence_identifier, name, value, "string", "*", "eng")
+            )
+    connection.executemany("INSERT INTO occurrence VALUES (?, ?, ?, ?, ?, ?, ?, ?)", occurrences)
+    connection.executemany("INSERT INTO attribute VALUES (?, ?, ?, ?, ?, ?, ?, ?)", attributes)
+
+
+def create_app(database_path: str, static_folder: str | None = None, **config) -> Flask:
+    """
+    A bare application with (only) the topic store set up, for the components that look it up through `current_app`.
+    Its instance folder is the database's directory.
+    """
+    app = Flask(
+        "contextualise", static_folder=static_folder, instance_path=os.path.dirname(os.path.abspath(database_path))
+    )
+    app.config.from_object("contextualise.settings")
+    app.config.update(DATABASE_PATH=database_path, SECRET_KEY="benchmark", **config)
+    topic_store.init_app(app)
+    return app
+
+
+def remove_database(path: str) -> None:
+    for suffix in ("", "-wal", "-shm", "-journal"):
+        if os.path.exists(f"{path}{suffix}"):
+            os.remove(f"{path}{suffix}")
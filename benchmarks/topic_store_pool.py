@@ -0,0 +1,119 @@
+"""
+topic_store_pool.py file. Part of the Contextualise project.
+
+October 18, 2026
+Brett Alistair Kromkamp (brettkromkamp@gmail.com)
+
+Topic store queries (a batched type lookup, one of TopicDB's own methods and a full-text search) with a new connection
+per call, as the topic store used before it had a connection pool, and with the pooled connections; sequentially and
+from many threads at once.
+
+    python benchmarks/topic_store_pool.py [--threads 16] [--calls 750]
+"""
+
+import argparse
+import os
+import random
+import sqlite3
+import tempfile
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+
+from support import (
+    MAP_IDENTIFIER,
+    USER_IDENTIFIER,
+    add_notes,
+    add_topics,
+    create_app,
+    create_database,
+    create_vocabulary,
+    format_duration,
+    measure,
+)
+from topicdb.store.retrievalmode import RetrievalMode
+
+from contextualise.utilities.database import connect, register_pool
+from contextualise.utilities.search_index import search
+
+
+class ConnectionPerCall:
+    # In place of the store's `ConnectionPool`: a connection is opened (and tuned) for every query and closed after it
+    closed = False
+
+    def __init__(self, database_path: str) -> None:
+        self.database_path = database_path
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        connection = connect(self.database_path)
+        try:
+            yield connection
+        finally:
+            connection.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--calls", type=int, default=750)
+    parser.add_argument("--repeat", type=int, default=3000)
+    arguments = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "pool.sqlite3")
+        create_database(path)
+        rng = random.Random(0)
+        vocabulary = create_vocabulary(rng)
+        connection = sqlite3.connect(path)
+        try:
+            with connection:
+                identifiers = add_topics(connection, rng, vocabulary, 10000)
+                add_notes(connection, rng, vocabulary, identifiers, 10000)
+        finally:
+            connection.close()
+
+        app = create_app(path)
+        store = app.extensions["topic_store"]
+        store.populate_map(MAP_IDENTIFIER, USER_IDENTIFIER)
+        pool = store.pool
+        lookup = identifiers[:2]
+        query = vocabulary[0]
+
+        def get_topic():
+            store.get_topic(MAP_IDENTIFIER, lookup[0], resolve_attributes=RetrievalMode.RESOLVE_ATTRIBUTES)
+
+        def look_up(calls):
+            for _ in range(calls):
+                store.get_topic_instance_ofs(MAP_IDENTIFIER, lookup)
+
+        with app.app_context():
+            search(MAP_IDENTIFIER, query)  # Builds the map's search index
+            for label, connections in (("connection per call", ConnectionPerCall(path)), ("pool", pool)):
+                store.pool = connections
+                register_pool(connections)  # For TopicDB's own methods
+                looked_up = measure(lambda: look_up(1), arguments.repeat)
+                got_topic = measure(get_topic, arguments.repeat)
+                searched = measure(lambda: search(MAP_IDENTIFIER, query), arguments.repeat)
+
+                threads = [threading.Thread(target=look_up, args=(arguments.calls,)) for _ in range(arguments.threads)]
+                start = time.perf_counter()
+                for thread in threads:
+                    thread.start()
+                for thread in threads:
+                    thread.join()
+                concurrent = time.perf_counter() - start
+
+                print(
+                    f"{label}: get_topic_instance_ofs {format_duration(looked_up)}, get_topic {format_duration(got_topic)}, "
+                    f"search {format_duration(searched)}, {arguments.threads} threads x {arguments.calls} lookups "
+                    f"{format_duration(concurrent)}"
+                )
+            store.pool = pool
+            register_pool(pool)
+        print(f"pool metrics: {pool.metrics()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -9,7 +9,7 @@ import logging
 import os
 from logging.handlers import RotatingFileHandler
 
-from flask import Flask, render_template, session
+from flask import Flask, jsonify, render_template, session
 from flask_mail import Mail
 from flask_security.core import RoleMixin, Security, UserMixin
 from flask_security.datastore import SQLAlchemySessionUserDatastore
@@ -28,9 +28,9 @@ from sqlalchemy import (
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import backref, relationship, scoped_session, sessionmaker
 
-from . import constants
+from . import commands, constants, topic_store
 from .topic_store import get_topic_store
-from .utilities import filters
+from .utilities import database, filters, map_cache, markdown
 from .version import __version__
 
 
@@ -46,6 +46,9 @@ def create_app(test_config=None):
     app.config.from_mapping(
         DEBUG=False,
         DATABASE_PATH=os.path.join(app.instance_path, app.config["DATABASE_FILE"]),
+        AUTH_DATABASE_PATH=os.path.join(
+            app.instance_path, app.config["AUTH_DATABASE_FILE"] or app.config["DATABASE_FILE"]
+        ),
         SECRET_KEY=app.config["SECRET_KEY"],
         SECURITY_PASSWORD_SALT=app.config["SECURITY_PASSWORD_SALT"],
         SECURITY_REGISTERABLE=True,
@@ -97,6 +100,23 @@ def create_app(test_config=None):
     def health():
         return "Healthy!"
 
+    @app.route("/health/topic-store")
+    def topic_store_health():
+        # The connection pool of this (worker) process
+        metrics = get_topic_store().pool.metrics()
+        return jsonify(
+            {
+                "poolSize": metrics.size,
+                "openConnections": metrics.open,
+                "idleConnections": metrics.idle,
+                "checkouts": metrics.checkouts,
+                "waits": metrics.waits,
+                "waitSeconds": metrics.wait_seconds,
+                "maxWaitSeconds": metrics.max_wait_seconds,
+                "timeouts": metrics.timeouts,
+            }
+        )
+
     # HTTP error handlers
     @app.errorhandler(403)
     def forbidden(e):
@@ -114,8 +134,15 @@ def create_app(test_config=None):
     def internal_server_error(e):
         return render_template("500.html"), 500
 
-    # Setup Flask-Security
-    engine = create_engine(f"sqlite:///{app.config['DATABASE_PATH']}")
+    # Tune (every connection to) the SQLite databases
+    database.init_app(app)
+
+    # Set up the (process-wide) topic store
+    topic_store.init_app(app)
+
+    # Setup Flask-Security (with its own engine so that the users and roles can live in a separate database)
+    engine = create_engine(f"sqlite:///{app.config['AUTH_DATABASE_PATH']}")
+    database.tune_engine(engine)
     db_session = scoped_session(sessionmaker(autocommit=False, autoflush=False, bind=engine))
 
     Base = declarative_base()
@@ -196,12 +223,23 @@ def create_app(test_config=None):
     # Register custom filters
     filters.register_filters(app)
 
+    # Set up the rendered markdown cache
+    markdown.init_app(app)
+
+    # Set up the (per-map) caches of derived data
+    map_cache.init_app(app)
+
+    # Register the command-line (Flask CLI) commands
+    commands.init_app(app)
+
     # Register Blueprints
     import contextualise.api
 
     app.register_blueprint(contextualise.api.bp)
     csrf.exempt(contextualise.api.create_topic)
     csrf.exempt(contextualise.api.create_association)
+    csrf.exempt(contextualise.api.create_topics)
+    csrf.exempt(contextualise.api.create_associations)
 
     import contextualise.map
 
@@ -263,6 +301,10 @@ def create_app(test_config=None):
 
     app.register_blueprint(contextualise.location.bp)
 
+    import contextualise.search
+
+    app.register_blueprint(contextualise.search.bp)
+
     # Set up logging
     if not app.debug:
         logs_directory = os.path.join(app.instance_path, "logs")
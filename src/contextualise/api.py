@@ -5,10 +5,22 @@ February 13, 2022
 Brett Alistair Kromkamp (brettkromkamp@gmail.com)
 """
 
+import math
+from collections import deque
 from datetime import datetime
 
-import mistune
-from flask import Blueprint, abort, jsonify, render_template, request
+from flask import (
+    Blueprint,
+    Response,
+    abort,
+    current_app,
+    jsonify,
+    render_template,
+    request,
+    session,
+    stream_with_context,
+    url_for,
+)
 from flask_login import current_user, login_required  # type: ignore
 from slugify import slugify
 from topicdb.models.association import Association
@@ -21,8 +33,27 @@ from topicdb.store.retrievalmode import RetrievalMode
 from contextualise.temporaltype import TemporalType
 
 from . import constants
+from .search import get_search_scope
 from .topic_store import get_topic_store
-from .utilities.highlight_renderer import HighlightRenderer
+from .utilities.adjacency import AdjacencySnapshot
+from .utilities.filters import prefetch_topic_names
+from .utilities.identifier_index import get_identifier_index, get_trigram_index, update_identifier_index
+from .utilities.location_index import Location, LocationIndex
+from .utilities.map_access import get_map_access
+from .utilities.map_cache import location_cache, network_cache, timeline_cache
+from .utilities.map_export import export_records
+from .utilities.markdown import render_markdown
+from .utilities.search_index import search, update_search_index
+from .utilities.trigram_index import SIMILARITY_THRESHOLD
+from .utilities.uploads import (
+    UploadError,
+    cancel_upload,
+    finish_upload,
+    get_upload,
+    get_upload_directory,
+    start_upload,
+    write_chunk,
+)
 
 bp = Blueprint("api", __name__)
 
@@ -31,15 +62,7 @@ bp = Blueprint("api", __name__)
 def _initialize(map_identifier, topic_identifier, current_user):
     store = get_topic_store()
 
-    is_map_owner = False
-    if current_user.is_authenticated:  # User is logged in
-        is_map_owner = store.is_map_owner(map_identifier, current_user.id)
-        if is_map_owner:
-            topic_map = store.get_map(map_identifier, current_user.id)
-        else:
-            topic_map = store.get_map(map_identifier)
-    else:  # User is not logged in
-        topic_map = store.get_map(map_identifier)
+    topic_map = get_map_access(map_identifier, current_user).topic_map
 
     topic = store.get_topic(
         map_identifier,
@@ -50,6 +73,285 @@ def _initialize(map_identifier, topic_identifier, current_user):
     return store, topic_map, topic
 
 
+def _build_timeline(store, map_identifier, scope_identifier):
+    events = store.get_occurrences(
+        map_identifier=map_identifier,
+        instance_of="temporal-event",
+        scope=scope_identifier,
+        inline_resource_data=RetrievalMode.INLINE_RESOURCE_DATA,
+        resolve_attributes=RetrievalMode.RESOLVE_ATTRIBUTES,
+    )
+    eras = store.get_occurrences(
+        map_identifier=map_identifier,
+        instance_of="temporal-era",
+        scope=scope_identifier,
+        inline_resource_data=RetrievalMode.INLINE_RESOURCE_DATA,
+        resolve_attributes=RetrievalMode.RESOLVE_ATTRIBUTES,
+    )
+
+    # Resolve the names of all of the temporals' topics at once rather than one topic per event or era
+    topic_names = store.get_topic_base_names(
+        map_identifier,
+        [occurrence.topic_identifier for occurrence in events + eras],
+        scope=scope_identifier,
+    )
+
+    temporal_events = []
+    for event in events:
+        text = event.resource_data.decode() if event.resource_data else "No description provided."
+        start_year, start_month, start_day = event.get_attribute_by_name("temporal-start-date").value.split("-")
+        media_url = (
+            event.get_attribute_by_name("temporal-media-url").value
+            if event.get_attribute_by_name("temporal-media-url")
+            else "/static/no-data.svg"
+        )
+        event_topic_name = topic_names.get(event.topic_identifier, "Undefined")
+        text += f"""
+        <br />
+        <br />
+        <a target="_self" href="/temporals/{map_identifier}/{event.topic_identifier}"><small>Go to temporal</small></a>
+        """.strip()
+        temporal_events.append(
+            {
+                "start_date": {
+                    "year": start_year,
+                    "month": start_month,
+                    "day": start_day,
+                },
+                "text": {
+                    "headline": f'<a target="_self" href="/topics/view/{map_identifier}/{event.topic_identifier}">{event_topic_name}</a>',
+                    "text": text,
+                },
+                "unique_id": event.topic_identifier,
+                "media": {
+                    "url": media_url,
+                },
+            }
+        )
+    temporal_eras = []
+    for era in eras:
+        text = era.resource_data.decode() if era.resource_data else "No description provided."
+        start_year, start_month, start_day = era.get_attribute_by_name("temporal-start-date").value.split("-")
+        end_year, end_month, end_day = era.get_attribute_by_name("temporal-end-date").value.split("-")
+        temporal_eras.append(
+            {
+                "start_date": {
+                    "year": start_year,
+                    "month": start_month,
+                    "day": start_day,
+                },
+                "end_date": {
+                    "year": end_year,
+                    "month": end_month,
+                    "day": end_day,
+                },
+                "text": {
+                    "headline": topic_names.get(era.topic_identifier, "Undefined"),
+                    "text": text,
+                },
+            }
+        )
+
+    return {
+        "scale": "human",
+        "events": temporal_events,
+        "eras": temporal_eras,
+    }
+
+
+def _location_to_dict(map_identifier, location):
+    return {
+        "map_identifier": map_identifier,
+        "occurrence_identifier": location.occurrence_identifier,
+        "topic_identifier": location.topic_identifier,
+        "base_name": location.base_name,
+        "description": location.description,
+        "lat": location.latitude,
+        "lng": location.longitude,
+        "label": location.label,
+    }
+
+
+def _build_locations(store, map_identifier, scope_identifier):
+    location_records = store.get_occurrence_records(
+        map_identifier,
+        "location",
+        ("geographic-coordinates", "location-name"),
+        scope=scope_identifier,
+    )
+    topic_names = store.get_topic_base_names(
+        map_identifier,
+        [location_record["topic_identifier"] for location_record in location_records],
+        scope=scope_identifier,
+    )
+
+    locations = []
+    for location_record in location_records:
+        try:
+            latitude, longitude = (float(value) for value in location_record["geographic-coordinates"].split(","))
+        except (AttributeError, ValueError):  # Missing or malformed coordinates
+            continue
+        locations.append(
+            Location(
+                location_record["identifier"],
+                location_record["topic_identifier"],
+                topic_names.get(location_record["topic_identifier"], "Undefined"),
+                location_record["resource_data"].decode() if location_record["resource_data"] else "",
+                latitude,
+                longitude,
+                location_record["location-name"],
+            )
+        )
+    return locations
+
+
+def _get_adjacency(map_identifier):
+    # The snapshot is built on first use and invalidated by the views that create or delete associations. It is shared
+    # by all requests, so it is built from the primary database rather than from the read replica
+    adjacency = network_cache.get(map_identifier)
+    if adjacency is None:
+        adjacency = AdjacencySnapshot(get_topic_store(primary=True).get_association_members(map_identifier))
+        network_cache.set(map_identifier, None, adjacency)
+    return adjacency
+
+
+def _get_network_limits(default_depth):
+    # The configured limits are both the defaults and the maximums clients can ask for
+    maximum_depth = request.args.get("depth", default_depth, type=int)
+    maximum_children = request.args.get("children", current_app.config["NETWORK_MAX_CHILDREN"], type=int)
+    maximum_nodes = request.args.get("nodes", current_app.config["NETWORK_MAX_NODES"], type=int)
+    return (
+        max(1, min(maximum_depth, current_app.config["NETWORK_MAX_DEPTH"])),
+        max(1, min(maximum_children, current_app.config["NETWORK_MAX_CHILDREN"])),
+        max(2, min(maximum_nodes, current_app.config["NETWORK_MAX_NODES"])),
+    )
+
+
+def _build_network(
+    store,
+    map_identifier,
+    topic_identifier,
+    scope_identifier,
+    maximum_depth,
+    maximum_children,
+    maximum_nodes,
+    offset=0,
+):
+    adjacency = _get_adjacency(map_identifier)
+
+    # Breadth-first traversal bounded by depth, by the number of associations followed per topic (fan-out) and by
+    # the total number of topics. Only the topics that are reached for the first time are connected by an edge
+    levels = {topic_identifier: 0}
+    tree_edges = []
+    expanded = {}  # Expanded topic -> (offset of the first association not followed, number of associations)
+    budget_exhausted = False
+
+    queue = deque([topic_identifier])
+    while queue and not budget_exhausted:
+        identifier = queue.popleft()
+        if levels[identifier] >= maximum_depth:
+            continue
+
+        next_offset = offset if identifier == topic_identifier else 0
+        neighbours = adjacency.neighbours(
+            identifier, scope=scope_identifier, offset=next_offset, limit=maximum_children
+        )
+        for neighbour, association_type in neighbours:
+            if neighbour not in levels:
+                if len(levels) >= maximum_nodes:
+                    budget_exhausted = True
+                    break
+                levels[neighbour] = levels[identifier] + 1
+                tree_edges.append((identifier, neighbour, association_type))
+                queue.append(neighbour)
+            next_offset += 1
+        expanded[identifier] = (next_offset, adjacency.neighbours_count(identifier, scope=scope_identifier))
+
+    # Resolve the names and types of all of the topics at once
+    base_names = store.get_topic_base_names(map_identifier, levels.keys())
+    instance_ofs = store.get_topic_instance_ofs(map_identifier, levels.keys())
+    edges_counts = adjacency.associations_counts(levels.keys())
+
+    nodes = []
+    for identifier, depth in levels.items():
+        level = max(depth - 1, 0)  # Topics are on the level of the topic they were reached from
+
+        # group = instance_of
+        color = f"#{level * 3}{level * 3}{level * 3}"
+        if level == 0:
+            color = "#A00"
+        if identifier == topic_identifier:
+            color = "#F00"
+
+        # Mark the topics with associations that haven't been followed so that they can be expanded later on
+        if identifier in expanded:
+            children_offset, neighbours_count = expanded[identifier]
+            truncated = children_offset < neighbours_count
+        else:
+            children_offset = 0
+            truncated = edges_counts.get(identifier, 0) > (0 if identifier == topic_identifier else 1)
+
+        node = {
+            "id": identifier,
+            # "label": base_name + "\n[" + instance_of + "]",
+            "label": base_names.get(identifier, "Undefined"),
+            "instanceOf": instance_ofs.get(identifier, ""),
+            "value": edges_counts.get(identifier, 0),
+            "color": color,
+            "truncated": truncated,
+            "childrenOffset": children_offset,
+        }
+        nodes.append(node)
+
+    edges = []
+    for from_identifier, to_identifier, association_type in tree_edges:
+        edge = {
+            "from": from_identifier,
+            "to": to_identifier,
+            "label": association_type,
+            "font": {"align": "middle"},
+            # "arrows": "to, from",
+            "color": {"color": "#666", "opacity": 0.5},
+        }
+        edges.append(edge)
+
+    limits = {
+        "truncated": any(node["truncated"] for node in nodes),
+        "maximumDepth": maximum_depth,
+        "maximumChildren": maximum_children,
+        "maximumNodes": maximum_nodes,
+    }
+    return nodes, edges, limits  # The first two elements are the vis.js nodes and edges
+
+
+def _get_batch_items():
+    # The batch endpoints accept a JSON array of objects (one per topic or association)
+    items = request.get_json(silent=True)
+    if not isinstance(items, list) or not all(isinstance(item, dict) for item in items):
+        return None, (jsonify({"status": "error", "code": 400}), 400)
+    if len(items) > constants.BATCH_MAX_ITEMS:
+        return None, (jsonify({"status": "error", "code": 413}), 413)
+    return items, None
+
+
+def _batch_item_value(item, key, default=""):
+    value = str(item.get(key) or "").strip()
+    return value if value else default
+
+
+def _batch_response(results):
+    created = sum(1 for result in results if result["code"] == 201)
+    code = 201 if created == len(results) else 207  # Multi-status: (some of) the items were rejected
+    response = {
+        "status": "success" if code == 201 else "error",
+        "code": code,
+        "created": created,
+        "rejected": len(results) - created,
+        "results": results,
+    }
+    return jsonify(response), code
+
+
 # endregion
 
 
@@ -85,6 +387,32 @@ def topic_exists(map_identifier):
     return jsonify(result), 200
 
 
+@bp.route("/api/similar-topics/<map_identifier>")
+@login_required
+def similar_topics(map_identifier):
+    store = get_topic_store()
+
+    topic_map = store.get_map(map_identifier, current_user.id)
+    if topic_map is None:
+        return jsonify({"status": "error", "code": 404}), 404
+
+    query_term = request.args.get("q", "").strip()
+    limit = min(max(request.args.get("k", 5, type=int), 1), 25)
+    instance_of = request.args.get("instance-of")
+    threshold = min(max(request.args.get("threshold", SIMILARITY_THRESHOLD, type=float), 0.1), 1.0)
+
+    similar = get_trigram_index(map_identifier).similar(
+        query_term, limit=limit, instance_ofs=[instance_of.lower()] if instance_of else None, threshold=threshold
+    )
+    result = {
+        "query": query_term,
+        "similarTopics": [
+            {"identifier": topic.identifier, "name": topic.name, "similarity": topic.similarity} for topic in similar
+        ],
+    }
+    return jsonify(result), 200
+
+
 @bp.route("/api/create-topic/<map_identifier>", methods=["POST"])
 @login_required
 def create_topic(map_identifier):
@@ -121,10 +449,104 @@ def create_topic(map_identifier):
             store.create_topic(topic_map.identifier, topic)
             store.create_occurrence(topic_map.identifier, text_occurrence)
             store.create_attribute(topic_map.identifier, modification_attribute)
+            update_search_index(topic_map.identifier, topic.identifier)
+            update_identifier_index(store, topic_map.identifier, topic.identifier)
 
             return jsonify({"status": "success", "code": 201}), 201
 
 
+@bp.route("/api/create-topics/<map_identifier>", methods=["POST"])
+@login_required
+def create_topics(map_identifier):
+    store = get_topic_store()
+
+    topic_map = store.get_map(map_identifier, current_user.id)
+    if topic_map is None:
+        return jsonify({"status": "error", "code": 404}), 404
+
+    items, error_response = _get_batch_items()
+    if error_response:
+        return error_response
+
+    results = []
+    topics = []  # (Result, topic, text occurrence) tuples of the items that passed the first validation pass
+    for index, item in enumerate(items):
+        topic_identifier = slugify(_batch_item_value(item, "identifier"))
+        result = {"index": index, "identifier": topic_identifier, "code": 201}
+        results.append(result)
+        if not topic_identifier:
+            result.update({"code": 400, "message": "Missing topic identifier"})
+            continue
+        topic = Topic(
+            topic_identifier,
+            _batch_item_value(item, "instanceOf", "topic"),
+            _batch_item_value(item, "name", "Undefined"),
+        )
+        text_occurrence = Occurrence(
+            instance_of="text",
+            topic_identifier=topic.identifier,
+            scope=_batch_item_value(item, "scope", constants.UNIVERSAL_SCOPE),
+            resource_data=_batch_item_value(item, "text", "Topic automatically created."),
+        )
+        topics.append((result, topic, text_occurrence))
+
+    # Resolve which of the referenced topics already exist with a single (batched) query
+    existing_identifiers = store.get_topic_instance_ofs(
+        topic_map.identifier,
+        [
+            reference
+            for _, topic, occurrence in topics
+            for reference in (topic.identifier, topic.instance_of, occurrence.scope)
+        ],
+    ).keys()
+    new_identifiers = set()
+    for result, topic, _ in topics:
+        if topic.identifier in existing_identifiers or topic.identifier in new_identifiers:
+            result.update({"code": 409, "message": "Topic already exists"})
+        else:
+            new_identifiers.add(topic.identifier)
+    # Items can use other items of the batch as their type or scope. Rejecting an item therefore invalidates the items
+    # that refer to it, so the references are checked again until no more items are rejected
+    rejected = True
+    while rejected:
+        rejected = False
+        for result, topic, occurrence in topics:
+            if result["code"] != 201:
+                continue
+            if topic.instance_of not in existing_identifiers and topic.instance_of not in new_identifiers:
+                result.update({"code": 409, "message": f"Topic type '{topic.instance_of}' does not exist"})
+            elif (
+                occurrence.scope != constants.UNIVERSAL_SCOPE
+                and occurrence.scope not in existing_identifiers
+                and occurrence.scope not in new_identifiers
+            ):
+                result.update({"code": 409, "message": f"Scope '{occurrence.scope}' does not exist"})
+            else:
+                continue
+            new_identifiers.discard(topic.identifier)
+            rejected = True
+
+    new_topics = []
+    occurrences = []
+    timestamp = str(datetime.now())
+    for result, topic, text_occurrence in topics:
+        if result["code"] == 201:
+            topic.add_attribute(
+                Attribute("modification-timestamp", timestamp, topic.identifier, data_type=DataType.TIMESTAMP)
+            )
+            new_topics.append(topic)
+            occurrences.append(text_occurrence)
+
+    # Persist objects to the topic store (in a single transaction)
+    if new_topics:
+        store.create_entities(topic_map.identifier, topics=new_topics, occurrences=occurrences)
+        new_topic_identifiers = [topic.identifier for topic in new_topics]
+        update_search_index(topic_map.identifier, *new_topic_identifiers)
+        update_identifier_index(store, topic_map.identifier, *new_topic_identifiers)
+
+    return _batch_response(results)
+
+
 @bp.route("/api/get-identifiers/<map_identifier>")
 @login_required
 def get_identifiers(map_identifier):
@@ -138,10 +560,11 @@ def get_identifiers(map_identifier):
 
     query_term = request.args.get("q").lower()
     instance_of = request.args.get("instance-of")
+    identifier_index = get_identifier_index(map_identifier)
     if instance_of:
-        result = store.get_topic_identifiers(map_identifier, query_term, instance_ofs=[instance_of.lower()], limit=10)
+        result = identifier_index.lookup(query_term, instance_ofs=[instance_of.lower()], limit=10)
     else:
-        result = store.get_topic_identifiers(map_identifier, query_term, limit=10)
+        result = identifier_index.lookup(query_term, limit=10)
     return jsonify(result), 200
 
 
@@ -157,7 +580,8 @@ def get_tags(map_identifier):
     # TODO: Missing logic?
 
     query_term = request.args.get("term").lower()
-    result = {"suggestions": store.get_topic_identifiers(map_identifier, query_term, instance_ofs=["tag"], limit=10)}
+    identifier_index = get_identifier_index(map_identifier)
+    result = {"suggestions": identifier_index.lookup(query_term, instance_ofs=["tag"], limit=10)}
     return jsonify(result), 200
 
 
@@ -165,20 +589,13 @@ def get_tags(map_identifier):
 def get_network(map_identifier, topic_identifier):
     store = get_topic_store()
 
-    if current_user.is_authenticated:  # User is logged in
-        is_map_owner = store.is_map_owner(map_identifier, current_user.id)
-        if is_map_owner:
-            topic_map = store.get_map(map_identifier, current_user.id)
-        else:
-            topic_map = store.get_map(map_identifier)
-        if topic_map is None:
-            return jsonify({"status": "error", "code": 404}), 404
-    else:  # User is not logged in
-        topic_map = store.get_map(map_identifier)
-        if topic_map is None:
-            return jsonify({"status": "error", "code": 404}), 404
-        if not topic_map.published:  # User is not logged in and the map is not published
-            return jsonify({"status": "error", "code": 403}), 403
+    map_access = get_map_access(map_identifier, current_user)
+    topic_map = map_access.topic_map
+    if topic_map is None:
+        return jsonify({"status": "error", "code": 404}), 404
+    # The map is private and the user is neither its owner nor collaborating on it
+    if not map_access.can_read:
+        return jsonify({"status": "error", "code": 403}), 403
 
     topic = store.get_topic(map_identifier, topic_identifier)
 
@@ -187,54 +604,18 @@ def get_network(map_identifier, topic_identifier):
     if not scope_filtered:
         scope_identifier = None
 
-    def build_network(inner_identifier):
-        base_name = tree[inner_identifier].payload["topic"].first_base_name.name
-        instance_of = tree[inner_identifier].payload["topic"].instance_of
-        level = tree[inner_identifier].payload["level"]
-        children = tree[inner_identifier].children
-        edges_count = store.get_topic_associations_count(map_identifier, inner_identifier)
-
-        # group = instance_of
-        color = f"#{level * 3}{level * 3}{level * 3}"
-        if level == 0:
-            color = "#A00"
-        if inner_identifier == topic_identifier:
-            color = "#F00"
-
-        node = {
-            "id": inner_identifier,
-            # "label": base_name + "\n[" + instance_of + "]",
-            "label": base_name,
-            "instanceOf": instance_of,
-            "value": edges_count,
-            "color": color,
-        }
-
-        result[nodes].append(node)
-
-        for child in children:
-            # child_type_topic = store.get_topic(map_identifier, child.type)
-            edge = {
-                "from": inner_identifier,
-                "to": child.pointer,
-                "label": child.type,
-                "font": {"align": "middle"},
-                # "arrows": "to, from",
-                "color": {"color": "#666", "opacity": 0.5},
-            }
-            result[edges].append(edge)
-            build_network(child.pointer)  # Recursive call
-
     if topic:
-        tree = store.get_topics_network(map_identifier, topic_identifier, scope=scope_identifier)
-        if len(tree) > 1:
-            nodes = 0
-            edges = 1
-            result = (
-                [],
-                [],
-            )  # The result is a tuple containing two lists of dictionaries
-            build_network(topic_identifier)
+        maximum_depth, maximum_children, maximum_nodes = _get_network_limits(current_app.config["NETWORK_MAX_DEPTH"])
+        result = _build_network(
+            store,
+            map_identifier,
+            topic_identifier,
+            scope_identifier,
+            maximum_depth,
+            maximum_children,
+            maximum_nodes,
+        )
+        if len(result[0]) > 1:
             return jsonify(result), 200
         else:
             return (
@@ -248,178 +629,336 @@ def get_network(map_identifier, topic_identifier):
         )
 
 
-@bp.route("/api/get-timeline/<map_identifier>")
-def get_timeline(map_identifier):
+@bp.route("/api/expand-network/<map_identifier>/<topic_identifier>")
+def expand_network(map_identifier, topic_identifier):
     store = get_topic_store()
 
-    if current_user.is_authenticated:  # User is logged in
-        is_map_owner = store.is_map_owner(map_identifier, current_user.id)
-        if is_map_owner:
-            topic_map = store.get_map(map_identifier, current_user.id)
-        else:
-            topic_map = store.get_map(map_identifier)
-        if topic_map is None:
-            return jsonify({"status": "error", "code": 404}), 404
-    else:  # User is not logged in
-        topic_map = store.get_map(map_identifier)
-        if topic_map is None:
-            return jsonify({"status": "error", "code": 404}), 404
-        if not topic_map.published:  # User is not logged in and the map is not published
-            return jsonify({"status": "error", "code": 403}), 403
+    map_access = get_map_access(map_identifier, current_user)
+    topic_map = map_access.topic_map
+    if topic_map is None:
+        return jsonify({"status": "error", "code": 404}), 404
+    # The map is private and the user is neither its owner nor collaborating on it
+    if not map_access.can_read:
+        return jsonify({"status": "error", "code": 403}), 403
+
+    if not store.topic_exists(map_identifier, topic_identifier):
+        return (
+            jsonify({"status": "error", "code": 404, "message": "Topic not found"}),
+            404,
+        )
 
     scope_identifier = request.args.get("scope", type=str)
     scope_filtered = request.args.get("filter", type=int)
     if not scope_filtered:
         scope_identifier = None
 
-    events = store.get_occurrences(
-        map_identifier=map_identifier,
-        instance_of="temporal-event",
-        scope=scope_identifier,
-        inline_resource_data=RetrievalMode.INLINE_RESOURCE_DATA,
-        resolve_attributes=RetrievalMode.RESOLVE_ATTRIBUTES,
-    )
-    eras = store.get_occurrences(
-        map_identifier=map_identifier,
-        instance_of="temporal-era",
-        scope=scope_identifier,
-        inline_resource_data=RetrievalMode.INLINE_RESOURCE_DATA,
-        resolve_attributes=RetrievalMode.RESOLVE_ATTRIBUTES,
+    # Expanding a topic continues with the associations (from 'offset' on) that weren't followed before
+    offset = max(0, request.args.get("offset", 0, type=int))
+    maximum_depth, maximum_children, maximum_nodes = _get_network_limits(1)
+    result = _build_network(
+        store,
+        map_identifier,
+        topic_identifier,
+        scope_identifier,
+        maximum_depth,
+        maximum_children,
+        maximum_nodes,
+        offset=offset,
     )
+    return jsonify(result), 200
 
-    temporal_events = []
-    for event in events:
-        text = event.resource_data.decode() if event.resource_data else "No description provided."
-        start_year, start_month, start_day = event.get_attribute_by_name("temporal-start-date").value.split("-")
-        media_url = (
-            event.get_attribute_by_name("temporal-media-url").value
-            if event.get_attribute_by_name("temporal-media-url")
-            else "/static/no-data.svg"
-        )
-        event_topic = store.get_topic(map_identifier, event.topic_identifier, scope=scope_identifier)
-        text += f"""
-        <br />
-        <br />
-        <a target="_self" href="/temporals/{map_identifier}/{event_topic.identifier}"><small>Go to temporal</small></a>
-        """.strip()
-        temporal_events.append(
-            {
-                "start_date": {
-                    "year": start_year,
-                    "month": start_month,
-                    "day": start_day,
-                },
-                "text": {
-                    "headline": f'<a target="_self" href="/topics/view/{map_identifier}/{event_topic.identifier}">{event_topic.first_base_name.name}</a>',
-                    "text": text,
-                },
-                "unique_id": event.topic_identifier,
-                "media": {
-                    "url": media_url,
-                },
-            }
-        )
-    temporal_eras = []
-    for era in eras:
-        text = era.resource_data.decode() if era.resource_data else "No description provided."
-        start_year, start_month, start_day = era.get_attribute_by_name("temporal-start-date").value.split("-")
-        end_year, end_month, end_day = era.get_attribute_by_name("temporal-end-date").value.split("-")
-        era_topic = store.get_topic(map_identifier, era.topic_identifier, scope=scope_identifier)
-        temporal_eras.append(
-            {
-                "start_date": {
-                    "year": start_year,
-                    "month": start_month,
-                    "day": start_day,
-                },
-                "end_date": {
-                    "year": end_year,
-                    "month": end_month,
-                    "day": end_day,
-                },
-                "text": {
-                    "headline": era_topic.first_base_name.name,
-                    "text": text,
-                },
-            }
-        )
 
-    if len(temporal_events) == 0:
+@bp.route("/api/get-timeline/<map_identifier>")
+def get_timeline(map_identifier):
+    map_access = get_map_access(map_identifier, current_user)
+    topic_map = map_access.topic_map
+    if topic_map is None:
+        return jsonify({"status": "error", "code": 404}), 404
+    # The map is private and the user is neither its owner nor collaborating on it
+    if not map_access.can_read:
+        return jsonify({"status": "error", "code": 403}), 403
+
+    scope_identifier = request.args.get("scope", type=str)
+    scope_filtered = request.args.get("filter", type=int)
+    if not scope_filtered:
+        scope_identifier = None
+
+    # The assembled timeline is cached per map (and scope); the temporal and topic views invalidate it. Like the other
+    # shared caches, it is built from the primary database rather than from the read replica
+    result = timeline_cache.get(map_identifier, scope_identifier)
+    if result is None:
+        result = _build_timeline(get_topic_store(primary=True), map_identifier, scope_identifier)
+        timeline_cache.set(map_identifier, scope_identifier, result)
+
+    if len(result["events"]) == 0:
         return (
             jsonify({"status": "error", "code": 404, "message": "No temporal data"}),
             404,
         )
-
-    result = {
-        "scale": "human",
-        "events": temporal_events,
-        "eras": temporal_eras,
-    }
     return jsonify(result), 200
 
 
 @bp.route("/api/get-geographic-map/<map_identifier>")
 def get_geographic_map(map_identifier):
-    store = get_topic_store()
-
-    if current_user.is_authenticated:  # User is logged in
-        is_map_owner = store.is_map_owner(map_identifier, current_user.id)
-        if is_map_owner:
-            topic_map = store.get_map(map_identifier, current_user.id)
-        else:
-            topic_map = store.get_map(map_identifier)
-        if topic_map is None:
-            return jsonify({"status": "error", "code": 404}), 404
-    else:  # User is not logged in
-        topic_map = store.get_map(map_identifier)
-        if topic_map is None:
-            return jsonify({"status": "error", "code": 404}), 404
-        if not topic_map.published:  # User is not logged in and the map is not published
-            return jsonify({"status": "error", "code": 403}), 403
+    map_access = get_map_access(map_identifier, current_user)
+    topic_map = map_access.topic_map
+    if topic_map is None:
+        return jsonify({"status": "error", "code": 404}), 404
+    # The map is private and the user is neither its owner nor collaborating on it
+    if not map_access.can_read:
+        return jsonify({"status": "error", "code": 403}), 403
 
     scope_identifier = request.args.get("scope", type=str)
     scope_filtered = request.args.get("filter", type=int)
     if not scope_filtered:
         scope_identifier = None
 
-    location_occurrences = store.get_occurrences(
-        map_identifier=map_identifier,
-        instance_of="location",
-        scope=scope_identifier,
-        inline_resource_data=RetrievalMode.INLINE_RESOURCE_DATA,
-        resolve_attributes=RetrievalMode.RESOLVE_ATTRIBUTES,
-    )
+    # The location table (and its spatial index) is cached per map (and scope), built from the primary database; the
+    # location and topic views invalidate it
+    location_index = location_cache.get(map_identifier, scope_identifier)
+    if location_index is None:
+        location_index = LocationIndex(
+            _build_locations(get_topic_store(primary=True), map_identifier, scope_identifier)
+        )
+        location_cache.set(map_identifier, scope_identifier, location_index)
 
-    if len(location_occurrences) == 0:
+    if len(location_index) == 0:
         return (
             jsonify({"status": "error", "code": 404, "message": "No geographic data"}),
             404,
         )
 
-    locations = []
-    for location_occurrence in location_occurrences:
-        latitude, longitude = location_occurrence.get_attribute_by_name("geographic-coordinates").value.split(",")
-        description = location_occurrence.resource_data.decode() if location_occurrence.resource_data else ""
-        location_topic = store.get_topic(map_identifier, location_occurrence.topic_identifier, scope=scope_identifier)
-        locations.append(
-            {
-                "map_identifier": map_identifier,
-                "occurrence_identifier": location_occurrence.identifier,
-                "topic_identifier": location_occurrence.topic_identifier,
-                "base_name": location_topic.first_base_name.name,
-                "description": description,
-                "lat": latitude,
-                "lng": longitude,
-                "label": location_occurrence.get_attribute_by_name("location-name").value,
-            }
+    # Without a bounding box all of the map's locations are returned
+    bounding_box = request.args.get("bbox", type=str)
+    if not bounding_box:
+        result = {
+            "locations": [_location_to_dict(map_identifier, location) for location in location_index.locations],
+        }
+        return jsonify(result), 200
+
+    try:
+        west, south, east, north = (float(value) for value in bounding_box.split(","))
+        if not all(math.isfinite(value) for value in (west, south, east, north)):
+            raise ValueError("Bounding box values must be finite")
+    except ValueError:
+        return (
+            jsonify({"status": "error", "code": 400, "message": "Bounding box is not 'west,south,east,north'"}),
+            400,
         )
+    # Zoomed out viewports extend beyond the poles
+    south = min(max(south, -90.0), 90.0)
+    north = min(max(north, -90.0), 90.0)
+    zoom = max(0, request.args.get("zoom", 0, type=int))
+
+    clusters = []
+    if zoom < current_app.config["LOCATION_CLUSTER_MAX_ZOOM"]:
+        locations, clusters = location_index.clusters(west, south, east, north, zoom)
+    else:
+        locations = location_index.within(west, south, east, north)
 
     result = {
-        "locations": locations,
+        "zoom": zoom,
+        "locations": [_location_to_dict(map_identifier, location) for location in locations],
+        "clusters": [
+            {
+                "lat": cluster.latitude,
+                "lng": cluster.longitude,
+                "count": cluster.count,
+                "bounds": [[cluster.south, cluster.west], [cluster.north, cluster.east]],
+            }
+            for cluster in clusters
+        ],
     }
+    target_identifier = request.args.get("target", type=str)
+    if target_identifier:
+        target_location = location_index.get(target_identifier)
+        result["target"] = _location_to_dict(map_identifier, target_location) if target_location else None
     return jsonify(result), 200
 
 
+@bp.route("/api/search/<map_identifier>")
+def search_map(map_identifier):
+    store = get_topic_store()
+
+    map_access = get_map_access(map_identifier, current_user)
+    topic_map = map_access.topic_map
+    if topic_map is None:
+        return jsonify({"status": "error", "code": 404}), 404
+    # The map is private and the user is neither its owner nor collaborating on it
+    if not map_access.can_read:
+        return jsonify({"status": "error", "code": 403}), 403
+
+    query = request.args.get("q", "").strip()
+    offset = max(request.args.get("offset", 0, type=int), 0)
+    limit = min(max(request.args.get("limit", constants.SEARCH_ITEMS_PER_PAGE, type=int), 1), 100)
+    scope_identifier = get_search_scope()
+
+    results_count, results = search(map_identifier, query, scope=scope_identifier, offset=offset, limit=limit)
+    topic_names = store.get_topic_base_names(map_identifier, [result["topic_identifier"] for result in results])
+    for result in results:
+        result["topic_name"] = topic_names.get(result["topic_identifier"], result["topic_identifier"])
+        if result["kind"] == "note" and result["topic_identifier"] == "notes":
+            result["url"] = url_for("note.index", map_identifier=topic_map.identifier)
+        else:
+            result["url"] = url_for(
+                "topic.view", map_identifier=topic_map.identifier, topic_identifier=result["topic_identifier"]
+            )
+
+    return jsonify({"query": query, "scope": scope_identifier, "count": results_count, "results": results}), 200
+
+
+@bp.route("/api/export/<map_identifier>")
+def export_map(map_identifier):
+    store = get_topic_store()
+
+    map_access = get_map_access(map_identifier, current_user)
+    topic_map = map_access.topic_map
+    if topic_map is None:
+        return jsonify({"status": "error", "code": 404}), 404
+    # The map is private and the user is neither its owner nor collaborating on it
+    if not map_access.can_read:
+        return jsonify({"status": "error", "code": 403}), 403
+
+    resolve_resource_data = request.args.get("resource-data", 0, type=int) == 1
+
+    # The records are streamed while they are being read (a page at a time) from the topic store
+    response = Response(
+        stream_with_context(export_records(store, topic_map, resolve_resource_data=resolve_resource_data)),
+        mimetype="application/x-ndjson",
+    )
+    response.headers["Content-Disposition"] = f'attachment; filename="map-{topic_map.identifier}.ndjson"'
+    return response
+
+
+def _get_upload_map(map_identifier):
+    # Uploading requires write access to the map
+    map_access = get_map_access(map_identifier, current_user)
+    if map_access.topic_map is None:
+        return None, (jsonify({"status": "error", "code": 404}), 404)
+    if not map_access.can_write:
+        return None, (jsonify({"status": "error", "code": 403}), 403)
+    return map_access.topic_map, None
+
+
+def _upload_response(upload, code=200):
+    response = {
+        "status": "success",
+        "code": code,
+        "uploadIdentifier": upload["identifier"],
+        "size": upload["size"],
+        "offset": upload["offset"],
+        "chunkSize": constants.UPLOAD_CHUNK_SIZE,
+    }
+    return jsonify(response), code
+
+
+def _upload_error_response(error):
+    return jsonify({"status": "error", "code": error.code, "message": str(error)}), error.code
+
+
+@bp.route("/api/uploads/<map_identifier>", methods=["POST"])
+@login_required
+def start_chunked_upload(map_identifier):
+    topic_map, error_response = _get_upload_map(map_identifier)
+    if error_response:
+        return error_response
+
+    # The file itself is sent in chunks (of at most 'chunkSize' bytes) to the upload's URL; see `upload_chunk`
+    item = request.get_json(silent=True)
+    if not isinstance(item, dict) or not isinstance(item.get("size"), int):
+        return jsonify({"status": "error", "code": 400}), 400
+    try:
+        upload = start_upload(
+            get_upload_directory(topic_map.identifier),
+            str(item.get("fileName") or ""),
+            item["size"],
+            str(item.get("kind") or ""),
+            current_user.id,
+            current_app.config["UPLOAD_MAX_SIZE"],
+        )
+    except UploadError as error:
+        return _upload_error_response(error)
+    return _upload_response(upload, 201)
+
+
+@bp.route("/api/uploads/<map_identifier>/<upload_identifier>", methods=["GET", "PUT", "DELETE"])
+@login_required
+def upload_chunk(map_identifier, upload_identifier):
+    topic_map, error_response = _get_upload_map(map_identifier)
+    if error_response:
+        return error_response
+
+    directory = get_upload_directory(topic_map.identifier)
+    try:
+        upload = get_upload(directory, upload_identifier, current_user.id)
+        if request.method == "PUT":
+            # The chunk is the (raw) request body and is streamed to disk instead of being read into memory
+            offset = request.args.get("offset", -1, type=int)
+            upload["offset"] = write_chunk(directory, upload, offset, request.stream)
+        elif request.method == "DELETE":
+            cancel_upload(directory, upload_identifier)
+            return jsonify({"status": "success", "code": 200}), 200
+    except UploadError as error:
+        return _upload_error_response(error)
+    # A GET request returns the offset to resume an interrupted upload from
+    return _upload_response(upload)
+
+
+@bp.route("/api/uploads/<map_identifier>/<upload_identifier>/complete", methods=["POST"])
+@login_required
+def complete_chunked_upload(map_identifier, upload_identifier):
+    store = get_topic_store()
+
+    topic_map, error_response = _get_upload_map(map_identifier)
+    if error_response:
+        return error_response
+
+    item = request.get_json(silent=True)
+    if not isinstance(item, dict):
+        return jsonify({"status": "error", "code": 400}), 400
+    topic_identifier = _batch_item_value(item, "topicIdentifier")
+    title = _batch_item_value(item, "title")
+    scope = _batch_item_value(item, "scope", session.get("current_scope", constants.UNIVERSAL_SCOPE))
+    if not title:
+        return jsonify({"status": "error", "code": 400, "message": "Missing title"}), 400
+    if not store.topic_exists(topic_map.identifier, topic_identifier):
+        return jsonify({"status": "error", "code": 404, "message": "Topic not found"}), 404
+    if not store.topic_exists(topic_map.identifier, scope):
+        return jsonify({"status": "error", "code": 400, "message": "Scope not found"}), 400
+
+    directory = get_upload_directory(topic_map.identifier)
+    try:
+        upload = get_upload(directory, upload_identifier, current_user.id)
+        file_name = finish_upload(directory, upload, topic_map.identifier)
+    except UploadError as error:
+        return _upload_error_response(error)
+
+    occurrence = Occurrence(
+        instance_of=upload["kind"],
+        topic_identifier=topic_identifier,
+        scope=scope,
+        resource_ref=file_name,
+    )
+    title_attribute = Attribute(
+        "title",
+        title,
+        occurrence.identifier,
+        data_type=DataType.STRING,
+    )
+
+    # Persist objects to the topic store
+    store.create_occurrence(topic_map.identifier, occurrence)
+    store.create_attribute(topic_map.identifier, title_attribute)
+
+    response = {
+        "status": "success",
+        "code": 201,
+        "occurrenceIdentifier": occurrence.identifier,
+        "resourceRef": file_name,
+    }
+    return jsonify(response), 201
+
+
 @bp.route("/api/create-association/<map_identifier>", methods=("POST",))
 @login_required
 def create_association(map_identifier):
@@ -470,10 +1009,89 @@ def create_association(map_identifier):
 
     # Persist association object to the topic store
     store.create_association(map_identifier, association)
+    network_cache.invalidate(map_identifier)
 
     return jsonify({"status": "success", "code": 201}), 201
 
 
+@bp.route("/api/create-associations/<map_identifier>", methods=["POST"])
+@login_required
+def create_associations(map_identifier):
+    store = get_topic_store()
+
+    topic_map = store.get_map(map_identifier, current_user.id)
+    if topic_map is None:
+        return jsonify({"status": "error", "code": 404}), 404
+
+    items, error_response = _get_batch_items()
+    if error_response:
+        return error_response
+
+    results = []
+    associations = []  # (Result, association) tuples of the items that passed the first validation pass
+    for index, item in enumerate(items):
+        association_identifier = slugify(_batch_item_value(item, "identifier"))
+        result = {"index": index, "identifier": association_identifier, "code": 201}
+        results.append(result)
+        if not _batch_item_value(item, "srcTopicRef") or not _batch_item_value(item, "destTopicRef"):
+            result.update({"code": 400, "message": "Missing source or destination topic reference"})
+            continue
+
+        # If no values have been provided set their default values
+        association = Association(
+            identifier=association_identifier,
+            instance_of=_batch_item_value(item, "instanceOf", "association"),
+            name=_batch_item_value(item, "name", "Undefined"),
+            scope=_batch_item_value(item, "scope", constants.UNIVERSAL_SCOPE),
+            src_topic_ref=_batch_item_value(item, "srcTopicRef"),
+            dest_topic_ref=_batch_item_value(item, "destTopicRef"),
+            src_role_spec=_batch_item_value(item, "srcRoleSpec", "related"),
+            dest_role_spec=_batch_item_value(item, "destRoleSpec", "related"),
+        )
+        result["identifier"] = association.identifier
+        associations.append((result, association))
+
+    # Resolve which of the referenced topics already exist with a single (batched) query
+    existing_identifiers = store.get_topic_instance_ofs(
+        topic_map.identifier,
+        [
+            reference
+            for _, association in associations
+            for reference in (
+                association.identifier,
+                association.instance_of,
+                association.scope,
+                association.member.src_topic_ref,
+                association.member.dest_topic_ref,
+            )
+        ],
+    ).keys()
+    new_identifiers = set()
+    new_associations = []
+    for result, association in associations:
+        if association.identifier in existing_identifiers or association.identifier in new_identifiers:
+            result.update({"code": 409, "message": "Association already exists"})
+        elif (
+            association.member.src_topic_ref not in existing_identifiers
+            or association.member.dest_topic_ref not in existing_identifiers
+        ):
+            result.update({"code": 409, "message": "Source or destination topic does not exist"})
+        elif association.instance_of not in existing_identifiers:
+            result.update({"code": 409, "message": f"Association type '{association.instance_of}' does not exist"})
+        elif association.scope != constants.UNIVERSAL_SCOPE and association.scope not in existing_identifiers:
+            result.update({"code": 409, "message": f"Scope '{association.scope}' does not exist"})
+        else:
+            new_identifiers.add(association.identifier)
+            new_associations.append(association)
+
+    # Persist association objects to the topic store (in a single transaction)
+    if new_associations:
+        store.create_entities(topic_map.identifier, associations=new_associations)
+        network_cache.invalidate(topic_map.identifier)
+
+    return _batch_response(results)
+
+
 # endregion
 
 
@@ -500,6 +1118,15 @@ def get_associations(map_identifier, topic_identifier, scope_identifier, scope_f
         associations = store.get_association_groups(
             map_identifier, topic_identifier, associations=filtered_associations
         )
+        prefetch_topic_names(
+            map_identifier,
+            [
+                identifier
+                for instance_of, roles in associations.dict.items()
+                for role, topic_refs in roles.items()
+                for identifier in (instance_of, role, *topic_refs)
+            ],
+        )
     else:
         associations = []
 
@@ -568,15 +1195,7 @@ def delete_topic_note(map_identifier, topic_identifier, note_identifier):
 
     delete_note_identifier = note_identifier
     delete_note_title = note_occurrence.get_attribute_by_name("title").value
-    markdown = mistune.create_markdown(
-        renderer=HighlightRenderer(escape=False),
-        plugins=[
-            "strikethrough",
-            "footnotes",
-            "table",
-        ],
-    )
-    delete_note_text = markdown(note_occurrence.resource_data.decode())
+    delete_note_text = render_markdown(note_occurrence.resource_data)
     delete_note_scope = note_occurrence.scope
 
     return render_template(
@@ -604,15 +1223,7 @@ def delete_notes_note(map_identifier, topic_identifier, note_identifier):
 
     delete_note_identifier = note_identifier
     delete_note_title = note_occurrence.get_attribute_by_name("title").value
-    markdown = mistune.create_markdown(
-        renderer=HighlightRenderer(escape=False),
-        plugins=[
-            "strikethrough",
-            "footnotes",
-            "table",
-        ],
-    )
-    delete_note_text = markdown(note_occurrence.resource_data.decode())
+    delete_note_text = render_markdown(note_occurrence.resource_data)
     delete_note_scope = note_occurrence.scope
 
     return render_template(
@@ -14,6 +14,8 @@ from topicdb.topicdberror import TopicDbError
 from contextualise.utilities.topicstore import initialize
 
 from . import constants
+from .utilities.filters import prefetch_topic_names
+from .utilities.map_cache import get_notes_count, network_cache
 
 bp = Blueprint("association", __name__)
 
@@ -28,7 +30,23 @@ def index(map_identifier, topic_identifier):
     creation_date_attribute = topic.get_attribute_by_name("creation-timestamp")
     creation_date = maya.parse(creation_date_attribute.value) if creation_date_attribute else "Undefined"
 
-    map_notes_count = store.get_topic_occurrences_statistics(map_identifier, "notes")["note"]
+    map_notes_count = get_notes_count(map_identifier)
+
+    prefetch_topic_names(
+        map_identifier,
+        [
+            identifier
+            for association in associations
+            for identifier in (
+                association.instance_of,
+                association.scope,
+                association.member.src_topic_ref,
+                association.member.src_role_spec,
+                association.member.dest_topic_ref,
+                association.member.dest_role_spec,
+            )
+        ],
+    )
 
     return render_template(
         "association/index.html",
@@ -45,7 +63,7 @@ def index(map_identifier, topic_identifier):
 def create(map_identifier, topic_identifier):
     store, topic_map, topic = initialize(map_identifier, topic_identifier, current_user)
 
-    map_notes_count = store.get_topic_occurrences_statistics(map_identifier, "notes")["note"]
+    map_notes_count = get_notes_count(map_identifier)
     error = 0
 
     flash(
@@ -127,6 +145,7 @@ def create(map_identifier, topic_identifier):
 
             # Persist association object to the topic store
             store.create_association(map_identifier, association)
+            network_cache.invalidate(map_identifier)
 
             flash("Association successfully created.", "success")
             return redirect(
@@ -182,6 +201,7 @@ def delete(map_identifier, topic_identifier, association_identifier):
     else:
         try:
             store.delete_association(map_identifier, association_identifier)
+            network_cache.invalidate(map_identifier)
             flash("Association successfully deleted.", "success")
         except TopicDbError:
             flash(
@@ -205,7 +225,21 @@ def view(map_identifier, topic_identifier, association_identifier):
 
     association = store.get_association(map_identifier, association_identifier)
 
-    map_notes_count = store.get_topic_occurrences_statistics(map_identifier, "notes")["note"]
+    map_notes_count = get_notes_count(map_identifier)
+
+    if association:
+        prefetch_topic_names(
+            map_identifier,
+            [
+                topic_identifier,
+                association.instance_of,
+                association.scope,
+                association.member.src_topic_ref,
+                association.member.src_role_spec,
+                association.member.dest_topic_ref,
+                association.member.dest_role_spec,
+            ],
+        )
 
     return render_template(
         "association/view.html",
@@ -16,6 +16,10 @@ from werkzeug.utils import redirect
 
 from contextualise.utilities.topicstore import initialize
 
+from .utilities.filters import prefetch_topic_names
+from .utilities.map_cache import get_notes_count
+from .utilities.search_index import update_search_index
+
 bp = Blueprint("attribute", __name__)
 
 
@@ -44,7 +48,11 @@ def index(map_identifier, topic_identifier):
     entity_type = "topic"
     return_url = "topic.view"
 
-    map_notes_count = store.get_topic_occurrences_statistics(map_identifier, "notes")["note"]
+    map_notes_count = get_notes_count(map_identifier)
+
+    prefetch_topic_names(
+        map_identifier, [x for attribute in attributes for x in (attribute["type"], attribute["scope"])]
+    )
 
     return render_template(
         "attribute/index.html",
@@ -103,7 +111,11 @@ def entity_index(map_identifier, topic_identifier, entity_identifier, entity_typ
     creation_date_attribute = topic.get_attribute_by_name("creation-timestamp")
     creation_date = maya.parse(creation_date_attribute.value) if creation_date_attribute else "Undefined"
 
-    map_notes_count = store.get_topic_occurrences_statistics(map_identifier, "notes")["note"]
+    map_notes_count = get_notes_count(map_identifier)
+
+    prefetch_topic_names(
+        map_identifier, [x for attribute in attributes for x in (attribute["type"], attribute["scope"])]
+    )
 
     return render_template(
         "attribute/index.html",
@@ -127,7 +139,7 @@ def add(map_identifier, topic_identifier):
     post_url = "attribute.add"
     cancel_url = "attribute.index"
 
-    map_notes_count = store.get_topic_occurrences_statistics(map_identifier, "notes")["note"]
+    map_notes_count = get_notes_count(map_identifier)
     error = 0
 
     if request.method == "POST":
@@ -166,6 +178,7 @@ def add(map_identifier, topic_identifier):
 
             # Persist objects to the topic store
             store.create_attribute(topic_map.identifier, attribute)
+            update_search_index(map_identifier, topic_identifier)
 
             flash("Attribute successfully added.", "success")
             return redirect(
@@ -222,7 +235,7 @@ def entity_add(map_identifier, topic_identifier, entity_identifier, entity_type)
     post_url = "attribute.entity_add"
     cancel_url = "attribute.entity_index"
 
-    map_notes_count = store.get_topic_occurrences_statistics(map_identifier, "notes")["note"]
+    map_notes_count = get_notes_count(map_identifier)
     error = 0
 
     if request.method == "POST":
@@ -261,6 +274,7 @@ def entity_add(map_identifier, topic_identifier, entity_identifier, entity_type)
 
             # Persist objects to the topic store
             store.create_attribute(topic_map.identifier, attribute)
+            update_search_index(map_identifier, topic_identifier)
 
             flash("Attribute successfully added.", "success")
             return redirect(
@@ -319,7 +333,7 @@ def edit(map_identifier, topic_identifier, attribute_identifier):
     form_attribute_type = str(attribute.data_type).capitalize()
     form_attribute_scope = attribute.scope
 
-    map_notes_count = store.get_topic_occurrences_statistics(map_identifier, "notes")["note"]
+    map_notes_count = get_notes_count(map_identifier)
     error = 0
 
     if request.method == "POST":
@@ -357,6 +371,7 @@ def edit(map_identifier, topic_identifier, attribute_identifier):
                 scope=form_attribute_scope,
             )
             store.create_attribute(topic_map.identifier, updated_attribute)
+            update_search_index(map_identifier, topic_identifier)
 
             flash("Attribute successfully updated.", "success")
             return redirect(
@@ -433,7 +448,7 @@ def entity_edit(
     form_attribute_type = str(attribute.data_type).capitalize()
     form_attribute_scope = attribute.scope
 
-    map_notes_count = store.get_topic_occurrences_statistics(map_identifier, "notes")["note"]
+    map_notes_count = get_notes_count(map_identifier)
     error = 0
 
     if request.method == "POST":
@@ -471,6 +486,7 @@ def entity_edit(
                 scope=form_attribute_scope,
             )
             store.create_attribute(topic_map.identifier, updated_attribute)
+            update_search_index(map_identifier, topic_identifier)
 
             flash("Attribute successfully updated.", "success")
             return redirect(
@@ -528,11 +544,12 @@ def delete(map_identifier, topic_identifier, attribute_identifier):
     form_attribute_type = str(attribute.data_type).capitalize()
     form_attribute_scope = attribute.scope
 
-    map_notes_count = store.get_topic_occurrences_statistics(map_identifier, "notes")["note"]
+    map_notes_count = get_notes_count(map_identifier)
 
     if request.method == "POST":
         # Delete attribute from topic store
         store.delete_attribute(map_identifier, attribute.identifier)
+        update_search_index(map_identifier, topic_identifier)
 
         flash("Attribute successfully deleted.", "success")
         return redirect(
@@ -601,11 +618,12 @@ def entity_delete(
     form_attribute_type = str(attribute.data_type).capitalize()
     form_attribute_scope = attribute.scope
 
-    map_notes_count = store.get_topic_occurrences_statistics(map_identifier, "notes")["note"]
+    map_notes_count = get_notes_count(map_identifier)
 
     if request.method == "POST":
         # Delete attribute from topic store
         store.delete_attribute(map_identifier, attribute.identifier)
+        update_search_index(map_identifier, topic_identifier)
 
         flash("Attribute successfully deleted.", "success")
         return redirect(
@@ -0,0 +1,155 @@
+"""
+commands.py file. Part of the Contextualise project.
+
+October 18, 2026
+Brett Alistair Kromkamp (brettkromkamp@gmail.com)
+"""
+
+import itertools
+import os
+import sqlite3
+
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+from topicdb.topicdberror import TopicDbError
+
+from . import constants
+from .topic_store import get_topic_store
+from .utilities.database import AUTH_TABLES, move_tables
+from .utilities.map_cache import map_access_cache
+from .utilities.map_import import ImportProgress, MapImporter, read_csv, read_ndjson
+from .utilities.resource_store import collect_garbage
+from .utilities.search_index import drop_search_index
+from .utilities.uploads import collect_expired_uploads
+
+
+def _echo_progress(progress: ImportProgress) -> None:
+    rate = progress.records / progress.seconds if progress.seconds else 0
+    click.echo(
+        f"{progress.records:,} records read, {progress.created:,} created, {progress.skipped:,} skipped, "
+        f"{progress.rejected:,} rejected ({rate:,.0f} records/s)"
+    )
+
+
+@click.command("import-map")
+@click.argument("file_path", type=click.Path(exists=True, dir_okay=False))
+@click.option("--map-identifier", type=int, help="Import into this (existing) map instead of creating a new map.")
+@click.option("--user-identifier", type=int, help="The owner of the new map.")
+@click.option("--name", help="The name of the new map. Defaults to the name in the NDJSON header or the file name.")
+@click.option("--input-format", type=click.Choice(["ndjson", "csv"]), help="Defaults to the file's extension.")
+@click.option("--batch-size", type=click.IntRange(min=1), default=constants.IMPORT_BATCH_SIZE, show_default=True)
+@with_appcontext
+def import_map_command(file_path, map_identifier, user_identifier, name, input_format, batch_size):
+    """
+    Import a topic map from an NDJSON (as exported by '/api/export') or CSV file.
+    """
+    store = get_topic_store()
+
+    if input_format is None:
+        input_format = "csv" if file_path.lower().endswith(".csv") else "ndjson"
+    with open(file_path, encoding="utf-8", newline="" if input_format == "csv" else None) as file:
+        records = read_csv(file) if input_format == "csv" else read_ndjson(file)
+
+        # An NDJSON export starts with a header describing the map
+        first_record = next(records, None)
+        header = first_record[1] if first_record and first_record[1].get("type") == "map" else None
+        if first_record:
+            records = itertools.chain([first_record], records)
+
+        if map_identifier is None:
+            if user_identifier is None:
+                raise click.UsageError("Either '--map-identifier' or '--user-identifier' is required.")
+            if current_app.extensions["security"].datastore.find_user(id=user_identifier) is None:
+                raise click.BadParameter(f"There is no user {user_identifier}.", param_hint="'--user-identifier'")
+            if not name:
+                name = header["name"] if header else os.path.splitext(os.path.basename(file_path))[0]
+            map_identifier = store.create_map(
+                user_identifier, name, header.get("description", "") if header else "", "", initialised=True
+            )
+            # A full export includes the map's base topics
+            if header is None:
+                store.populate_map(map_identifier, user_identifier)
+            topic_map_directory = os.path.join(
+                current_app.static_folder, constants.RESOURCES_DIRECTORY, str(map_identifier)
+            )
+            if not os.path.isdir(topic_map_directory):
+                os.makedirs(topic_map_directory)
+            click.echo(f"Created map {map_identifier} ('{name}')")
+        elif store.get_map(map_identifier) is None:
+            raise click.BadParameter(f"There is no map {map_identifier}.", param_hint="'--map-identifier'")
+
+        # The entities of a full export come with their own 'creation-timestamp' attributes
+        importer = MapImporter(
+            store, map_identifier, batch_size=batch_size, progress=_echo_progress, creation_timestamps=header is None
+        )
+        try:
+            progress = importer.import_records(records)
+        except ValueError as error:  # Invalid JSON
+            raise click.ClickException(f"{error}. The records before it were imported.")
+        except (TopicDbError, sqlite3.Error) as error:  # Reading from (rather than writing to) the database failed
+            raise click.ClickException(f"The import stopped: {error}. The records read before the error were imported.")
+        finally:
+            # The search index is rebuilt on the map's next search instead of being maintained while importing
+            drop_search_index(map_identifier)
+            map_access_cache.invalidate(map_identifier)
+
+    for line_number, error in importer.rejections:
+        click.echo(f"Line {line_number}: {error}", err=True)
+    click.echo(
+        f"Imported {progress.created:,} records into map {map_identifier} in {progress.seconds:.1f} s "
+        f"({progress.skipped:,} skipped, {progress.rejected:,} rejected)"
+    )
+
+
+@click.command("migrate-auth-database")
+@click.option("--keep-source", is_flag=True, help="Copy the users and roles instead of moving them.")
+@with_appcontext
+def migrate_auth_database_command(keep_source):
+    """
+    Move the users and roles from the topic store database to the 'AUTH_DATABASE_FILE' database.
+    """
+    source_path = current_app.config["DATABASE_PATH"]
+    target_path = current_app.config["AUTH_DATABASE_PATH"]
+    if os.path.abspath(source_path) == os.path.abspath(target_path):
+        raise click.UsageError("Set 'AUTH_DATABASE_FILE' to the (new) users and roles database first.")
+
+    # The users keep their identifiers; the topic store refers to them (as the owners and collaborators of maps)
+    try:
+        counts = move_tables(source_path, target_path, AUTH_TABLES, keep_source=keep_source)
+    except (ValueError, sqlite3.Error) as error:
+        raise click.ClickException(str(error))
+
+    click.echo(
+        f"{'Copied' if keep_source else 'Moved'} {counts['user']:,} users, {counts['role']:,} roles and "
+        f"{counts['roles_users']:,} role assignments to {target_path}"
+    )
+
+
+@click.command("gc-resources")
+@click.option("--dry-run", is_flag=True, help="Only report the files that would be removed.")
+@click.option(
+    "--grace-period",
+    type=int,
+    default=constants.RESOURCE_GRACE_PERIOD,
+    show_default=True,
+    help="Seconds (recently uploaded) files are left alone.",
+)
+@with_appcontext
+def gc_resources_command(dry_run, grace_period):
+    """
+    Remove the uploaded files that no occurrence or map refers to anymore, like those of deleted topics, and the
+    abandoned chunked uploads.
+    """
+    removed_files, freed_bytes = collect_garbage(get_topic_store(primary=True), grace_period, dry_run=dry_run)
+    removed_uploads, freed_upload_bytes = collect_expired_uploads(dry_run=dry_run)
+    click.echo(
+        f"{'Would remove' if dry_run else 'Removed'} {removed_files:,} files and {removed_uploads:,} abandoned uploads, "
+        f"freeing {(freed_bytes + freed_upload_bytes) / (1024 * 1024):,.1f} MiB"
+    )
+
+
+def init_app(app):
+    app.cli.add_command(import_map_command)
+    app.cli.add_command(migrate_auth_database_command)
+    app.cli.add_command(gc_resources_command)
@@ -20,3 +20,10 @@ STATUS_CODE = 1
 MAP_ITEMS_PER_PAGE = 9
 TOPIC_ITEMS_PER_PAGE = 25
 RESOURCE_ITEMS_PER_PAGE = 25
+SEARCH_ITEMS_PER_PAGE = 25
+BATCH_MAX_ITEMS = 10000
+EXPORT_PAGE_SIZE = 1000
+IMPORT_BATCH_SIZE = 100000
+UPLOAD_CHUNK_SIZE = 2 * 1024 * 1024  # Below the (4 megabyte) maximum request size
+UPLOAD_EXPIRY = 24 * 60 * 60  # Seconds before an abandoned upload is removed
+RESOURCE_GRACE_PERIOD = 60 * 60  # Seconds before an unreferenced resource file is removed by garbage collection
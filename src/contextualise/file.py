@@ -5,13 +5,9 @@ February 13, 2022
 Brett Alistair Kromkamp (brettkromkamp@gmail.com)
 """
 
-import os
-import uuid
-
 import maya  # type: ignore
 from flask import (
     Blueprint,
-    current_app,
     flash,
     redirect,
     render_template,
@@ -28,7 +24,8 @@ from topicdb.topicdberror import TopicDbError
 
 from contextualise.utilities.topicstore import initialize
 
-from . import constants
+from .utilities.map_cache import get_notes_count
+from .utilities.resource_store import save_resource
 
 bp = Blueprint("file", __name__)
 
@@ -59,7 +56,7 @@ def index(map_identifier, topic_identifier):
     creation_date_attribute = topic.get_attribute_by_name("creation-timestamp")
     creation_date = maya.parse(creation_date_attribute.value) if creation_date_attribute else "Undefined"
 
-    map_notes_count = store.get_topic_occurrences_statistics(map_identifier, "notes")["note"]
+    map_notes_count = get_notes_count(map_identifier)
 
     return render_template(
         "file/index.html",
@@ -76,7 +73,7 @@ def index(map_identifier, topic_identifier):
 def upload(map_identifier, topic_identifier):
     store, topic_map, topic = initialize(map_identifier, topic_identifier, current_user)
 
-    map_notes_count = store.get_topic_occurrences_statistics(map_identifier, "notes")["note"]
+    map_notes_count = get_notes_count(map_identifier)
     error = 0
 
     if request.method == "POST":
@@ -106,16 +103,10 @@ def upload(map_identifier, topic_identifier):
             )
         else:
             file_extension = get_file_extension(form_upload_file.filename)
-            file_file_name = f"{str(uuid.uuid4())}.{file_extension}"
             form_file_title = f"{form_file_title} (.{file_extension})"
 
-            # Create the file directory for this topic map if it doesn't already exist
-            file_directory = os.path.join(current_app.static_folder, constants.RESOURCES_DIRECTORY, str(map_identifier))
-            if not os.path.isdir(file_directory):
-                os.makedirs(file_directory)
-
-            file_path = os.path.join(file_directory, file_file_name)
-            form_upload_file.save(file_path)
+            # Store the file (once, however often it is uploaded) and link it into the topic map's directory
+            file_file_name = save_resource(topic_map.identifier, form_upload_file.stream, file_extension)
 
             file_occurrence = Occurrence(
                 instance_of="file",
@@ -176,7 +167,7 @@ def edit(map_identifier, topic_identifier, file_identifier):
     form_file_title = file_occurrence.get_attribute_by_name("title").value
     form_file_scope = file_occurrence.scope
 
-    map_notes_count = store.get_topic_occurrences_statistics(map_identifier, "notes")["note"]
+    map_notes_count = get_notes_count(map_identifier)
     error = 0
 
     if request.method == "POST":
@@ -252,19 +243,10 @@ def delete(map_identifier, topic_identifier, file_identifier):
         flash("An error occurred while trying to delete the file.", "warning")
     else:
         try:
-            # Delete file occurrence from topic store
+            # Delete file occurrence from topic store (the file itself is removed from the file system by 'gc-resources'
+            # once no other occurrence refers to it)
             store.delete_occurrence(map_identifier, file_occurrence.identifier)
 
-            # Delete file from file system
-            file_file_path = os.path.join(
-                current_app.static_folder,
-                constants.RESOURCES_DIRECTORY,
-                str(map_identifier),
-                file_occurrence.resource_ref,
-            )
-            if os.path.exists(file_file_path):
-                os.remove(file_file_path)
-
             flash("File successfully deleted.", "success")
         except TopicDbError:
             flash(
@@ -5,13 +5,9 @@ February 13, 2022
 Brett Alistair Kromkamp (brettkromkamp@gmail.com)
 """
 
-import os
-import uuid
-
 import maya  # type: ignore
 from flask import (
     Blueprint,
-    current_app,
     flash,
     redirect,
     render_template,
@@ -29,6 +25,8 @@ from topicdb.topicdberror import TopicDbError
 from contextualise.utilities.topicstore import initialize
 
 from . import constants
+from .utilities.map_cache import get_notes_count
+from .utilities.resource_store import save_resource
 
 bp = Blueprint("image", __name__)
 
@@ -59,7 +57,7 @@ def index(map_identifier, topic_identifier):
     creation_date_attribute = topic.get_attribute_by_name("creation-timestamp")
     creation_date = maya.parse(creation_date_attribute.value) if creation_date_attribute else "Undefined"
 
-    map_notes_count = store.get_topic_occurrences_statistics(map_identifier, "notes")["note"]
+    map_notes_count = get_notes_count(map_identifier)
 
     return render_template(
         "image/index.html",
@@ -76,7 +74,7 @@ def index(map_identifier, topic_identifier):
 def upload(map_identifier, topic_identifier):
     store, topic_map, topic = initialize(map_identifier, topic_identifier, current_user)
 
-    map_notes_count = store.get_topic_occurrences_statistics(map_identifier, "notes")["note"]
+    map_notes_count = get_notes_count(map_identifier)
     error = 0
 
     if request.method == "POST":
@@ -107,17 +105,10 @@ def upload(map_identifier, topic_identifier):
                 "warning",
             )
         else:
-            image_file_name = f"{str(uuid.uuid4())}.{get_file_extension(form_upload_file.filename)}"
-
-            # Create the image directory for this topic map if it doesn't already exist
-            image_directory = os.path.join(
-                current_app.static_folder, constants.RESOURCES_DIRECTORY, str(map_identifier)
+            # Store the image (once, however often it is uploaded) and link it into the topic map's directory
+            image_file_name = save_resource(
+                topic_map.identifier, form_upload_file.stream, get_file_extension(form_upload_file.filename)
             )
-            if not os.path.isdir(image_directory):
-                os.makedirs(image_directory)
-
-            file_path = os.path.join(image_directory, image_file_name)
-            form_upload_file.save(file_path)
 
             image_occurrence = Occurrence(
                 instance_of="image",
@@ -179,7 +170,7 @@ def edit(map_identifier, topic_identifier, image_identifier):
     form_image_resource_ref = image_occurrence.resource_ref
     form_image_scope = image_occurrence.scope
 
-    map_notes_count = store.get_topic_occurrences_statistics(map_identifier, "notes")["note"]
+    map_notes_count = get_notes_count(map_identifier)
     error = 0
 
     if request.method == "POST":
@@ -256,18 +247,9 @@ def delete(map_identifier, topic_identifier, image_identifier):
         flash("An error occurred while trying to delete the image.", "warning")
     else:
         try:
-            # Delete image occurrence from topic store
+            # Delete image occurrence from topic store (the image itself is removed from the file system by
+            # 'gc-resources' once no other occurrence refers to it)
             store.delete_occurrence(map_identifier, image_occurrence.identifier)
-
-            # Delete image from file system
-            image_file_path = os.path.join(
-                current_app.static_folder,
-                constants.RESOURCES_DIRECTORY,
-                str(map_identifier),
-                image_occurrence.resource_ref,
-            )
-            if os.path.exists(image_file_path):
-                os.remove(image_file_path)
             flash("Image successfully deleted.", "success")
         except TopicDbError:
             flash(
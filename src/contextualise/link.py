@@ -16,6 +16,9 @@ from topicdb.topicdberror import TopicDbError
 
 from contextualise.utilities.topicstore import initialize
 
+from .utilities.map_cache import get_notes_count
+from .utilities.search_index import update_search_index
+
 bp = Blueprint("link", __name__)
 
 
@@ -45,7 +48,7 @@ def index(map_identifier, topic_identifier):
     creation_date_attribute = topic.get_attribute_by_name("creation-timestamp")
     creation_date = maya.parse(creation_date_attribute.value) if creation_date_attribute else "Undefined"
 
-    map_notes_count = store.get_topic_occurrences_statistics(map_identifier, "notes")["note"]
+    map_notes_count = get_notes_count(map_identifier)
 
     return render_template(
         "link/index.html",
@@ -62,7 +65,7 @@ def index(map_identifier, topic_identifier):
 def add(map_identifier, topic_identifier):
     store, topic_map, topic = initialize(map_identifier, topic_identifier, current_user)
 
-    map_notes_count = store.get_topic_occurrences_statistics(map_identifier, "notes")["note"]
+    map_notes_count = get_notes_count(map_identifier)
     error = 0
 
     if request.method == "POST":
@@ -104,6 +107,7 @@ def add(map_identifier, topic_identifier):
             # Persist objects to the topic store
             store.create_occurrence(topic_map.identifier, link_occurrence)
             store.create_attribute(topic_map.identifier, title_attribute)
+            update_search_index(topic_map.identifier, topic.identifier)
 
             flash("Link successfully added.", "success")
             return redirect(
@@ -148,7 +152,7 @@ def edit(map_identifier, topic_identifier, link_identifier):
     form_link_title = link_occurrence.get_attribute_by_name("title").value
     form_link_scope = link_occurrence.scope
 
-    map_notes_count = store.get_topic_occurrences_statistics(map_identifier, "notes")["note"]
+    map_notes_count = get_notes_count(map_identifier)
     error = 0
 
     if request.method == "POST":
@@ -183,6 +187,8 @@ def edit(map_identifier, topic_identifier, link_identifier):
             if link_occurrence.scope != form_link_scope:
                 store.update_occurrence_scope(map_identifier, link_occurrence.identifier, form_link_scope)
 
+            update_search_index(topic_map.identifier, topic.identifier)
+
             flash("Link successfully updated.", "success")
             return redirect(
                 url_for(
@@ -226,6 +232,7 @@ def delete(map_identifier, topic_identifier, link_identifier):
         try:
             # Delete link occurrence from topic store
             store.delete_occurrence(map_identifier, link_occurrence.identifier)
+            update_search_index(topic_map.identifier, topic.identifier)
             flash("Link successfully deleted.", "success")
         except TopicDbError:
             flash(
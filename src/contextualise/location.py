@@ -19,6 +19,8 @@ from topicdb.topicdberror import TopicDbError
 
 from contextualise.utilities.topicstore import initialize
 
+from .utilities.map_cache import get_notes_count, location_cache
+
 bp = Blueprint("location", __name__)
 
 
@@ -74,7 +76,7 @@ def index(map_identifier, topic_identifier):
     creation_date_attribute = topic.get_attribute_by_name("creation-timestamp")
     creation_date = maya.parse(creation_date_attribute.value) if creation_date_attribute else "Undefined"
 
-    map_notes_count = store.get_topic_occurrences_statistics(map_identifier, "notes")["note"]
+    map_notes_count = get_notes_count(map_identifier)
 
     return render_template(
         "location/index.html",
@@ -91,7 +93,7 @@ def index(map_identifier, topic_identifier):
 def add(map_identifier, topic_identifier):
     store, topic_map, topic = initialize(map_identifier, topic_identifier, current_user)
 
-    map_notes_count = store.get_topic_occurrences_statistics(map_identifier, "notes")["note"]
+    map_notes_count = get_notes_count(map_identifier)
     error = 0
 
     if request.method == "POST":
@@ -139,6 +141,7 @@ def add(map_identifier, topic_identifier):
             store.create_occurrence(topic_map.identifier, location_occurrence, ontology_mode=OntologyMode.LENIENT)
             store.create_attribute(topic_map.identifier, name_attribute, ontology_mode=OntologyMode.LENIENT)
             store.create_attribute(topic_map.identifier, coordinates_attribute, ontology_mode=OntologyMode.LENIENT)
+            location_cache.invalidate(topic_map.identifier)
 
             flash("Location successfully added.", "success")
             return redirect(
@@ -172,9 +175,9 @@ def add(map_identifier, topic_identifier):
 @bp.route("/locations/edit/<map_identifier>/<topic_identifier>/<location_identifier>", methods=("GET", "POST"))
 @login_required
 def edit(map_identifier, topic_identifier, location_identifier):
-    store, topic_map, topic = initialize(map_identifier, topic_identifier, current_user)
+    _, topic_map, topic = initialize(map_identifier, topic_identifier, current_user)
 
-    map_notes_count = store.get_topic_occurrences_statistics(map_identifier, "notes")["note"]
+    map_notes_count = get_notes_count(map_identifier)
     error = 0
 
     return render_template(
@@ -209,6 +212,7 @@ def delete(map_identifier, topic_identifier, location_identifier):
         try:
             # Delete location occurrence from topic store
             store.delete_occurrence(map_identifier, location_occurrence.identifier)
+            location_cache.invalidate(map_identifier)
             flash("Location successfully deleted.", "success")
         except TopicDbError:
             flash(
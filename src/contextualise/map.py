@@ -7,7 +7,6 @@ Brett Alistair Kromkamp (brettkromkamp@gmail.com)
 
 import os
 import shutil
-import uuid
 
 from flask import (
     Blueprint,
@@ -26,6 +25,10 @@ from werkzeug.utils import redirect
 
 from . import constants
 from .topic_store import get_topic_store
+from .utilities.map_access import get_map_access
+from .utilities.map_cache import map_access_cache
+from .utilities.resource_store import save_resource
+from .utilities.search_index import drop_search_index
 
 bp = Blueprint("map", __name__)
 
@@ -119,22 +122,19 @@ def create():
                 "warning",
             )
         else:
-            image_file_name = (
-                f"{str(uuid.uuid4())}.{get_file_extension(form_upload_file.filename)}" if form_upload_file else ""
-            )
-
             # Create and initialise the topic map
             map_identifier = store.create_map(
                 current_user.id,
                 form_map_name,
                 form_map_description,
-                image_file_name,
+                "",
                 initialised=True,
                 published=form_map_published,
                 promoted=False,
             )
             if map_identifier:
                 store.populate_map(map_identifier, current_user.id)
+                map_access_cache.invalidate(map_identifier)
 
                 # Create the directory for this topic map
                 topic_map_directory = os.path.join(
@@ -143,10 +143,20 @@ def create():
                 if not os.path.isdir(topic_map_directory):
                     os.makedirs(topic_map_directory)
 
-                # If there is an image for the topic map then upload it to the map's directory
+                # If there is an image for the topic map then upload it to the map's directory (its file name depends
+                # on the map)
                 if form_upload_file:
-                    file_path = os.path.join(topic_map_directory, image_file_name)
-                    form_upload_file.save(file_path)
+                    image_file_name = save_resource(
+                        map_identifier, form_upload_file.stream, get_file_extension(form_upload_file.filename)
+                    )
+                    store.update_map(
+                        map_identifier,
+                        form_map_name,
+                        form_map_description,
+                        image_file_name,
+                        published=form_map_published,
+                        promoted=False,
+                    )
 
                 flash("Map successfully created.", "success")
             else:
@@ -179,6 +189,8 @@ def delete(map_identifier):
     try:
         # Remove map from the topic store
         store.delete_map(map_identifier, current_user.id)
+        map_access_cache.invalidate(map_identifier)
+        drop_search_index(map_identifier)
 
         # Delete the map's directory
         topic_map_directory = os.path.join(
@@ -237,14 +249,9 @@ def edit(map_identifier):
         else:
             if form_upload_file:
                 # Upload the image for the topic map to the map's directory
-                image_file_name = f"{str(uuid.uuid4())}.{get_file_extension(form_upload_file.filename)}"
-                topic_map_directory = os.path.join(
-                    current_app.static_folder, constants.RESOURCES_DIRECTORY, str(map_identifier)
+                image_file_name = save_resource(
+                    topic_map.identifier, form_upload_file.stream, get_file_extension(form_upload_file.filename)
                 )
-                file_path = os.path.join(topic_map_directory, image_file_name)
-                form_upload_file.save(file_path)
-
-                # TODO: Remove the map's previous image
             else:
                 image_file_name = topic_map.image_path
 
@@ -258,6 +265,10 @@ def edit(map_identifier):
                 published=form_map_published,
                 promoted=promoted,
             )
+            # The map's previous image is removed from the file system by 'gc-resources' (unless occurrences refer to
+            # the same file)
+            map_access_cache.invalidate(map_identifier)
+
             flash("Map successfully updated.", "success")
             return redirect(url_for("map.view", map_identifier=map_identifier))
 
@@ -273,29 +284,13 @@ def edit(map_identifier):
 
 @bp.route("/maps/view/<map_identifier>")
 def view(map_identifier):
-    store = get_topic_store()
-
-    collaboration_mode = None
-    if current_user.is_authenticated:  # User is logged in
-        is_map_owner = store.is_map_owner(map_identifier, current_user.id)
-        if is_map_owner:
-            topic_map = store.get_map(map_identifier, current_user.id)
-        else:
-            topic_map = store.get_map(map_identifier)
-        if topic_map is None:
-            abort(404)
-        collaboration_mode = store.get_collaboration_mode(map_identifier, current_user.id)
-        # The map is private and doesn't belong to the user who is trying to
-        # access it
-        if not topic_map.published and not is_map_owner:
-            if not collaboration_mode:  # The user is not collaborating on the map
-                abort(403)
-    else:  # User is not logged in
-        topic_map = store.get_map(map_identifier)
-        if topic_map is None:
-            abort(404)
-        if not topic_map.published:  # User is not logged in and the map is not published
-            abort(403)
+    map_access = get_map_access(map_identifier, current_user)
+    topic_map = map_access.topic_map
+    if topic_map is None:
+        abort(404)
+    # The map is private and the user is neither its owner nor collaborating on it
+    if not map_access.can_read:
+        abort(403)
 
     # Reset breadcrumbs and (current) scope
     session["breadcrumbs"] = []
@@ -365,6 +360,7 @@ def add_collaborator(map_identifier):
                 collaborator.id,
                 collaboration_mode,
             )
+            map_access_cache.invalidate(topic_map.identifier)
             flash("Collaborator successfully added.", "success")
             return redirect(url_for("map.collaborators", map_identifier=topic_map.identifier))
 
@@ -401,6 +397,7 @@ def delete_collaborator(map_identifier, collaborator_identifier):
             )
         else:
             store.stop_collaboration(map_identifier, collaborator_identifier)
+            map_access_cache.invalidate(map_identifier)
             flash("Collaborator successfully removed.", "success")
             return redirect(url_for("map.collaborators", map_identifier=topic_map.identifier))
 
@@ -447,6 +444,7 @@ def edit_collaborator(map_identifier, collaborator_identifier):
                 collaborator_identifier,
                 CollaborationMode[form_collaboration_mode.upper()],
             )
+            map_access_cache.invalidate(map_identifier)
             flash("Collaborator successfully updated.", "success")
             return redirect(url_for("map.collaborators", map_identifier=topic_map.identifier))
 
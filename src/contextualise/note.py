@@ -8,7 +8,6 @@ Brett Alistair Kromkamp (brettkromkamp@gmail.com)
 from datetime import datetime
 
 import maya  # type: ignore
-import mistune
 from flask import Blueprint, flash, redirect, render_template, request, session, url_for
 from flask_login import current_user, login_required  # type: ignore
 from topicdb.models.attribute import Attribute
@@ -23,7 +22,11 @@ from werkzeug.exceptions import abort
 from contextualise.utilities.topicstore import initialize
 
 from .topic_store import get_topic_store
-from .utilities.highlight_renderer import HighlightRenderer
+from .utilities.identifier_index import update_identifier_index
+from .utilities.map_access import get_map_access
+from .utilities.map_cache import update_notes_count
+from .utilities.markdown import discard_markdown, render_markdown, warm_markdown
+from .utilities.search_index import update_search_index
 
 bp = Blueprint("note", __name__)
 
@@ -32,26 +35,13 @@ bp = Blueprint("note", __name__)
 def index(map_identifier):
     store = get_topic_store()
 
-    if current_user.is_authenticated:  # User is logged in
-        is_map_owner = store.is_map_owner(map_identifier, current_user.id)
-        if is_map_owner:
-            topic_map = store.get_map(map_identifier, current_user.id)
-        else:
-            topic_map = store.get_map(map_identifier)
-        if topic_map is None:
-            abort(404)
-        collaboration_mode = store.get_collaboration_mode(map_identifier, current_user.id)
-        # The map is private and doesn't belong to the user who is trying to
-        # access it
-        if not topic_map.published and not is_map_owner:
-            if not collaboration_mode:  # The user is not collaborating on the map
-                abort(403)
-    else:  # User is not logged in
-        topic_map = store.get_map(map_identifier)
-        if topic_map is None:
-            abort(404)
-        if not topic_map.published:  # User is not logged in and the map is not published
-            abort(403)
+    map_access = get_map_access(map_identifier, current_user)
+    topic_map = map_access.topic_map
+    if topic_map is None:
+        abort(404)
+    # The map is private and the user is neither its owner nor collaborating on it
+    if not map_access.can_read:
+        abort(403)
 
     topic = store.get_topic(map_identifier, "notes")
     if topic is None:
@@ -65,21 +55,13 @@ def index(map_identifier):
         resolve_attributes=RetrievalMode.RESOLVE_ATTRIBUTES,
     )
     notes = []
-    markdown = mistune.create_markdown(
-        renderer=HighlightRenderer(escape=False),
-        plugins=[
-            "strikethrough",
-            "footnotes",
-            "table",
-        ],
-    )
     for note_occurrence in note_occurrences:
         notes.append(
             {
                 "identifier": note_occurrence.identifier,
                 "title": note_occurrence.get_attribute_by_name("title").value,
                 "timestamp": maya.parse(note_occurrence.get_attribute_by_name("modification-timestamp").value),
-                "text": markdown(note_occurrence.resource_data.decode()),
+                "text": render_markdown(note_occurrence.resource_data),
             }
         )
 
@@ -96,15 +78,7 @@ def index(map_identifier):
             resolve_attributes=RetrievalMode.RESOLVE_ATTRIBUTES,
         )
         delete_note_title = note_occurrence.get_attribute_by_name("title").value
-        markdown = mistune.create_markdown(
-            renderer=HighlightRenderer(escape=False),
-            plugins=[
-                "strikethrough",
-                "footnotes",
-                "table",
-            ],
-        )
-        delete_note_text = markdown(note_occurrence.resource_data.decode())
+        delete_note_text = render_markdown(note_occurrence.resource_data)
         delete_note_scope = note_occurrence.scope
 
     return render_template(
@@ -173,6 +147,11 @@ def add(map_identifier):
             store.create_occurrence(topic_map.identifier, note_occurrence)
             store.create_attribute(topic_map.identifier, title_attribute)
             store.create_attribute(topic_map.identifier, modification_attribute)
+            update_notes_count(topic_map.identifier, 1)
+
+            # Render the note ahead of the first view
+            warm_markdown(form_note_text)
+            update_search_index(topic_map.identifier, "notes")
 
             flash("Note successfully added.", "success")
             return redirect(url_for("note.index", map_identifier=topic_map.identifier))
@@ -203,15 +182,7 @@ def attach(map_identifier, note_identifier):
     )
 
     form_note_title = note_occurrence.get_attribute_by_name("title").value
-    markdown = mistune.create_markdown(
-        renderer=HighlightRenderer(escape=False),
-        plugins=[
-            "strikethrough",
-            "footnotes",
-            "table",
-        ],
-    )
-    form_note_text = markdown(note_occurrence.resource_data.decode())
+    form_note_text = render_markdown(note_occurrence.resource_data)
     form_note_scope = note_occurrence.scope
 
     error = 0
@@ -230,6 +201,8 @@ def attach(map_identifier, note_identifier):
             )
         else:
             store.update_occurrence_topic_identifier(map_identifier, note_identifier, form_note_topic_identifier)
+            update_notes_count(map_identifier, -1)
+            update_search_index(map_identifier, "notes", form_note_topic_identifier)
             flash("Note successfully attached.", "success")
             return redirect(
                 url_for(
@@ -317,6 +290,9 @@ def convert(map_identifier, note_identifier):
 
             # Remove the original note occurrence
             store.delete_occurrence(topic_map.identifier, note_identifier)
+            update_notes_count(topic_map.identifier, -1)
+            update_search_index(topic_map.identifier, "notes", new_topic.identifier)
+            update_identifier_index(store, topic_map.identifier, new_topic.identifier)
 
             flash("Note successfully converted.", "success")
             return redirect(
@@ -424,13 +400,17 @@ def edit(map_identifier, note_identifier):
                 timestamp,
             )
 
-            # Update note (occurrence)
+            # Update note (occurrence) and replace its previously rendered text
             store.update_occurrence_data(map_identifier, note_occurrence.identifier, form_note_text)
+            discard_markdown(note_occurrence.resource_data)
+            warm_markdown(form_note_text)
 
             # Update note's scope if it has changed
             if note_occurrence.scope != form_note_scope:
                 store.update_occurrence_scope(map_identifier, note_occurrence.identifier, form_note_scope)
 
+            update_search_index(map_identifier, note_occurrence.topic_identifier)
+
             flash("Note successfully updated.", "success")
             return redirect(
                 url_for(
@@ -490,6 +470,8 @@ def delete(map_identifier, note_identifier):
     else:
         try:
             store.delete_occurrence(map_identifier, note_occurrence.identifier)
+            update_notes_count(map_identifier, -1)
+            update_search_index(map_identifier, note_occurrence.topic_identifier)
             flash("Note successfully deleted.", "success")
         except TopicDbError:
             flash(
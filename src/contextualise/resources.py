@@ -17,6 +17,8 @@ from contextualise import constants
 from contextualise.temporaltype import TemporalType
 
 from .topic_store import get_topic_store
+from .utilities.filters import prefetch_topic_names
+from .utilities.map_access import get_map_access
 
 bp = Blueprint("resources", __name__)
 
@@ -25,27 +27,13 @@ bp = Blueprint("resources", __name__)
 def _initialize(map_identifier, topic_identifier, current_user):
     store = get_topic_store()
 
-    collaboration_mode = None
-    if current_user.is_authenticated:  # User is logged in
-        is_map_owner = store.is_map_owner(map_identifier, current_user.id)
-        if is_map_owner:
-            topic_map = store.get_map(map_identifier, current_user.id)
-        else:
-            topic_map = store.get_map(map_identifier)
-        if topic_map is None:
-            abort(404)
-        collaboration_mode = store.get_collaboration_mode(map_identifier, current_user.id)
-        # The map is private and doesn't belong to the user who is trying to
-        # access it
-        if not topic_map.published and not is_map_owner:
-            if not collaboration_mode:  # The user is not collaborating on the map
-                abort(403)
-    else:  # User is not logged in
-        topic_map = store.get_map(map_identifier)
-        if topic_map is None:
-            abort(404)
-        if not topic_map.published:  # User is not logged in and the map is not published
-            abort(403)
+    map_access = get_map_access(map_identifier, current_user)
+    topic_map = map_access.topic_map
+    if topic_map is None:
+        abort(404)
+    # The map is private and the user is neither its owner nor collaborating on it
+    if not map_access.can_read:
+        abort(403)
 
     topic = store.get_topic(
         map_identifier,
@@ -95,6 +83,8 @@ def images(map_identifier, topic_identifier):
     sorted_images = sorted(images, key=lambda x: x["topic_identifier"])
     grouped_images = {k: list(v) for k, v in groupby(sorted_images, key=lambda x: x["topic_identifier"])}
 
+    prefetch_topic_names(map_identifier, [x for image in images for x in (image["topic_identifier"], image["scope"])])
+
     return render_template(
         "resources/images.html",
         topic_map=topic_map,
@@ -139,6 +129,8 @@ def files(map_identifier, topic_identifier):
     sorted_files = sorted(files, key=lambda x: x["topic_identifier"])
     grouped_files = {k: list(v) for k, v in groupby(sorted_files, key=lambda x: x["topic_identifier"])}
 
+    prefetch_topic_names(map_identifier, [x for file in files for x in (file["topic_identifier"], file["scope"])])
+
     return render_template(
         "resources/files.html",
         topic_map=topic_map,
@@ -183,6 +175,8 @@ def videos(map_identifier, topic_identifier):
     sorted_videos = sorted(videos, key=lambda x: x["topic_identifier"])
     grouped_videos = {k: list(v) for k, v in groupby(sorted_videos, key=lambda x: x["topic_identifier"])}
 
+    prefetch_topic_names(map_identifier, [x for video in videos for x in (video["topic_identifier"], video["scope"])])
+
     return render_template(
         "resources/videos.html",
         topic_map=topic_map,
@@ -227,6 +221,8 @@ def links(map_identifier, topic_identifier):
     sorted_links = sorted(links, key=lambda x: x["topic_identifier"])
     grouped_links = {k: list(v) for k, v in groupby(sorted_links, key=lambda x: x["topic_identifier"])}
 
+    prefetch_topic_names(map_identifier, [x for link in links for x in (link["topic_identifier"], link["scope"])])
+
     return render_template(
         "resources/links.html",
         topic_map=topic_map,
@@ -271,6 +267,8 @@ def scenes(map_identifier, topic_identifier):
     sorted_files = sorted(files, key=lambda x: x["topic_identifier"])
     grouped_files = {k: list(v) for k, v in groupby(sorted_files, key=lambda x: x["topic_identifier"])}
 
+    prefetch_topic_names(map_identifier, [x for file in files for x in (file["topic_identifier"], file["scope"])])
+
     return render_template(
         "resources/scenes.html",
         topic_map=topic_map,
@@ -315,6 +313,8 @@ def notes(map_identifier, topic_identifier):
     sorted_notes = sorted(notes, key=lambda x: x["topic_identifier"])
     grouped_notes = {k: list(v) for k, v in groupby(sorted_notes, key=lambda x: x["topic_identifier"]) if k != "notes"}
 
+    prefetch_topic_names(map_identifier, [x for note in notes for x in (note["topic_identifier"], note["scope"])])
+
     return render_template(
         "resources/notes.html",
         topic_map=topic_map,
@@ -385,6 +385,10 @@ def temporals(map_identifier, topic_identifier):
     # Sort temporals chronologically (by start date)
     sorted_temporals = sorted(temporals, key=lambda x: x["start_date"])
 
+    prefetch_topic_names(
+        map_identifier, [x for temporal in temporals for x in (temporal["topic_identifier"], temporal["scope"])]
+    )
+
     return render_template(
         "resources/temporals.html",
         topic_map=topic_map,
@@ -435,6 +439,10 @@ def locations(map_identifier, topic_identifier):
     sorted_locations = sorted(locations, key=lambda x: x["topic_identifier"])
     grouped_locations = {k: list(v) for k, v in groupby(sorted_locations, key=lambda x: x["topic_identifier"])}
 
+    prefetch_topic_names(
+        map_identifier, [x for location in locations for x in (location["topic_identifier"], location["scope"])]
+    )
+
     return render_template(
         "resources/locations.html",
         topic_map=topic_map,
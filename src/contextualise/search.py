@@ -0,0 +1,78 @@
+"""
+search.py file. Part of the Contextualise project.
+
+October 18, 2026
+Brett Alistair Kromkamp (brettkromkamp@gmail.com)
+"""
+
+from flask import Blueprint, render_template, request, session
+from flask_login import current_user  # type: ignore
+from werkzeug.exceptions import abort
+
+from . import constants
+from .topic_store import get_topic_store
+from .utilities.filters import prefetch_topic_names
+from .utilities.map_access import get_map_access
+from .utilities.search_index import search
+
+bp = Blueprint("search", __name__)
+
+
+# region Functions
+def get_search_scope():
+    # Search results are scope filtered in the same way as the topic view (see 'topic.view')
+    scope_filtered = request.args.get("filter", type=int)
+    if scope_filtered is None:
+        scope_filtered = session.get("scope_filter", default=1)
+    if scope_filtered:
+        return session.get("current_scope", constants.UNIVERSAL_SCOPE)
+    return None
+
+
+# endregion
+
+
+@bp.route("/search/<map_identifier>")
+def index(map_identifier):
+    store = get_topic_store()
+
+    map_access = get_map_access(map_identifier, current_user)
+    topic_map = map_access.topic_map
+    if topic_map is None:
+        abort(404)
+    # The map is private and the user is neither its owner nor collaborating on it
+    if not map_access.can_read:
+        abort(403)
+
+    topic = store.get_topic(map_identifier, "home")
+    if topic is None:
+        abort(404)
+
+    query = request.args.get("q", "").strip()
+    scope_identifier = get_search_scope()
+
+    # Pagination
+    page = request.args.get("page", 1, type=int)
+    offset = (page - 1) * constants.SEARCH_ITEMS_PER_PAGE
+
+    results_count, results = search(
+        map_identifier, query, scope=scope_identifier, offset=offset, limit=constants.SEARCH_ITEMS_PER_PAGE
+    )
+    total_pages = (results_count + constants.SEARCH_ITEMS_PER_PAGE - 1) // constants.SEARCH_ITEMS_PER_PAGE
+
+    prefetch_topic_names(
+        map_identifier,
+        [result["topic_identifier"] for result in results] + ([scope_identifier] if scope_identifier else []),
+    )
+
+    return render_template(
+        "search/index.html",
+        topic_map=topic_map,
+        topic=topic,
+        query=query,
+        scope_identifier=scope_identifier,
+        results=results,
+        results_count=results_count,
+        page=page,
+        total_pages=total_pages,
+    )
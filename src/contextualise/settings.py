@@ -6,9 +6,31 @@ Brett Alistair Kromkamp (brettkromkamp@gmail.com)
 """
 
 DATABASE_FILE = "changeme.sqlite3"
+AUTH_DATABASE_FILE = None  # Keep the users and roles in this database instead; see 'flask migrate-auth-database'
 
 EMAIL_USERNAME = "changeme@changeme.com"
 EMAIL_PASSWORD = "changeme"
 EMAIL_SERVER = "smtp.changeme.com"
 EMAIL_SENDER = "Change Me <changeme@changeme.com>"
 EMAIL_PORT = 587
+
+MARKDOWN_CACHE_SIZE = 1024  # Number of rendered texts and notes kept in memory (per process)
+MARKDOWN_DISK_CACHE = False  # Also keep rendered texts and notes in the instance folder
+HIGHLIGHT_MAX_CODE_SIZE = None  # Code blocks longer than this (in characters) are not syntax highlighted
+MAP_CACHE_TTL = 300  # Seconds before cached per-map data (timeline, locations) is rebuilt by other processes
+LOCATION_CLUSTER_MAX_ZOOM = 13  # From this zoom level on the geographic map shows the locations instead of clusters
+MAP_ACCESS_CACHE_TTL = 30  # Seconds a user's (cached) access to a map is trusted before it is resolved again
+NETWORK_MAX_DEPTH = 4  # Maximum number of associations between a topic and the topics in its network graph
+NETWORK_MAX_CHILDREN = 50  # Maximum number of associations followed per topic before it is marked as truncated
+NETWORK_MAX_NODES = 500  # Maximum number of topics in a network graph (response)
+SQLITE_JOURNAL_MODE = "WAL"  # Readers and (a single) writer don't block each other; stored in the database file
+SQLITE_SYNCHRONOUS = "NORMAL"  # In WAL mode a power loss can lose the last transactions but can't corrupt the database
+SQLITE_BUSY_TIMEOUT = 5000  # Milliseconds a connection waits for a lock before failing with "database is locked"
+SQLITE_CACHE_SIZE = -16384  # Page cache per connection; negative values are in KiB (16 MiB), positive ones in pages
+SQLITE_MMAP_SIZE = 268435456  # Bytes of the database file that are read through memory-mapped I/O (256 MiB)
+SQLITE_TEMP_STORE = "MEMORY"  # Keep temporary tables and indices (for sorting, for example) in memory
+TOPIC_STORE_POOL_SIZE = 8  # Maximum number of (long-lived) topic store connections per (worker) process
+TOPIC_STORE_POOL_TIMEOUT = 10  # Seconds a request waits for a topic store connection when all of them are in use
+READ_REPLICA_INTERVAL = 0  # Seconds between refreshes of the database snapshot for anonymous visitors; 0 disables it
+UPLOAD_MAX_SIZE = 268435456  # Maximum size in bytes (256 MiB) of a file, a 3D scene for example, uploaded in chunks
+RESOURCE_LINK_KEY = None  # Key of the uploaded files' names; by default a random key kept in the instance folder
@@ -0,0 +1,78 @@
+/*
+ * chunked-upload.js file. Part of the Contextualise project.
+ *
+ * Uploads the file of an (image, file or 3D scene) upload form in chunks through the '/api/uploads' endpoints so that
+ * files larger than the maximum request size can be uploaded. Interrupted chunks are resumed from the offset the
+ * server reports.
+ */
+
+function chunkedUpload(options) {
+    var form = document.getElementById(options.formId);
+    var maxRetries = 5;
+
+    form.addEventListener("submit", async function (event) {
+        var file = document.getElementById(options.fileInputId).files[0];
+        var title = document.getElementById(options.titleInputId).value.trim();
+        if (!file || !title) {
+            return; // The (regular) form submission reports the missing values
+        }
+        event.preventDefault();
+
+        var headers = { "X-CSRFToken": form.querySelector("input[name='_csrf_token']").value };
+        var uploadsUrl = "/api/uploads/" + options.mapIdentifier;
+        var submitButton = form.querySelector("button[type='submit']");
+        var submitButtonText = submitButton.textContent;
+        submitButton.disabled = true;
+
+        try {
+            var response = await axios.post(
+                uploadsUrl,
+                { fileName: file.name, size: file.size, kind: options.kind },
+                { headers: headers }
+            );
+            var uploadUrl = uploadsUrl + "/" + response.data.uploadIdentifier;
+            var chunkSize = response.data.chunkSize;
+            var offset = 0;
+            var retries = 0;
+
+            while (offset < file.size) {
+                try {
+                    response = await axios.put(uploadUrl + "?offset=" + offset, file.slice(offset, offset + chunkSize), {
+                        headers: Object.assign({ "Content-Type": "application/octet-stream" }, headers),
+                    });
+                    offset = response.data.offset;
+                    retries = 0;
+                } catch (error) {
+                    var status = error.response ? error.response.status : 0;
+                    if ((status >= 400 && status < 500 && status !== 409) || retries === maxRetries) {
+                        throw error;
+                    }
+                    retries++;
+                    await new Promise(function (resolve) {
+                        setTimeout(resolve, 1000 * retries);
+                    });
+                    // Resume from wherever the server got to
+                    response = await axios.get(uploadUrl, { headers: headers });
+                    offset = response.data.offset;
+                }
+                submitButton.textContent = "Uploading... " + Math.floor((offset * 100) / file.size) + "%";
+            }
+
+            await axios.post(
+                uploadUrl + "/complete",
+                {
+                    topicIdentifier: options.topicIdentifier,
+                    title: title,
+                    scope: document.getElementById(options.scopeInputId).value.trim(),
+                },
+                { headers: headers }
+            );
+            window.location.href = options.redirectUrl;
+        } catch (error) {
+            var message = error.response && error.response.data ? error.response.data.message : null;
+            notyf.error(message || "Unable to upload the file!");
+            submitButton.disabled = false;
+            submitButton.textContent = submitButtonText;
+        }
+    });
+}
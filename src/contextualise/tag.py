@@ -17,6 +17,9 @@ from flask_login import current_user, login_required  # type: ignore
 
 from contextualise.utilities.topicstore import initialize
 
+from .utilities.identifier_index import update_identifier_index
+from .utilities.map_cache import get_notes_count, network_cache
+from .utilities.search_index import update_search_index
 
 bp = Blueprint("tag", __name__)
 
@@ -28,7 +31,7 @@ def add(map_identifier, topic_identifier):
 
     form_tags = None
 
-    map_notes_count = store.get_topic_occurrences_statistics(map_identifier, "notes")["note"]
+    map_notes_count = get_notes_count(map_identifier)
     error = 0
 
     if request.method == "POST":
@@ -46,6 +49,9 @@ def add(map_identifier, topic_identifier):
         else:
             for form_tag in form_tags.split(","):
                 store.create_tag(map_identifier, topic.identifier, form_tag)
+            network_cache.invalidate(map_identifier)  # Tags are associations as well
+            update_search_index(map_identifier, topic.identifier, *form_tags.split(","))
+            update_identifier_index(store, map_identifier, topic.identifier, *form_tags.split(","))
 
             flash("Tags successfully added.", "success")
             return redirect(
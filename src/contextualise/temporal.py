@@ -21,6 +21,8 @@ from topicdb.topicdberror import TopicDbError
 from contextualise.temporaltype import TemporalType
 from contextualise.utilities.topicstore import initialize
 
+from .utilities.map_cache import get_notes_count, timeline_cache
+
 bp = Blueprint("temporal", __name__)
 
 
@@ -106,7 +108,7 @@ def index(map_identifier, topic_identifier):
     creation_date_attribute = topic.get_attribute_by_name("creation-timestamp")
     creation_date = maya.parse(creation_date_attribute.value) if creation_date_attribute else "Undefined"
 
-    map_notes_count = store.get_topic_occurrences_statistics(map_identifier, "notes")["note"]
+    map_notes_count = get_notes_count(map_identifier)
 
     return render_template(
         "temporal/index.html",
@@ -123,7 +125,7 @@ def index(map_identifier, topic_identifier):
 def add(map_identifier, topic_identifier):
     store, topic_map, topic = initialize(map_identifier, topic_identifier, current_user)
 
-    map_notes_count = store.get_topic_occurrences_statistics(map_identifier, "notes")["note"]
+    map_notes_count = get_notes_count(map_identifier)
     error = 0
 
     temporals = store.get_topic_occurrences(
@@ -223,6 +225,8 @@ def add(map_identifier, topic_identifier):
                     store.create_attribute(topic_map.identifier, start_date_attribute)
                     store.create_attribute(topic_map.identifier, end_date_attribute)
 
+            timeline_cache.invalidate(topic_map.identifier)
+
             flash("Temporal successfully added.", "success")
             return redirect(
                 url_for(
@@ -279,9 +283,9 @@ def add(map_identifier, topic_identifier):
 @bp.route("/temporals/edit/<map_identifier>/<topic_identifier>/<temporal_identifier>", methods=("GET", "POST"))
 @login_required
 def edit(map_identifier, topic_identifier, temporal_identifier):
-    store, topic_map, topic = initialize(map_identifier, topic_identifier, current_user)
+    _, topic_map, topic = initialize(map_identifier, topic_identifier, current_user)
 
-    map_notes_count = store.get_topic_occurrences_statistics(map_identifier, "notes")["note"]
+    map_notes_count = get_notes_count(map_identifier)
     error = 0
 
     if request.method == "POST":
@@ -319,6 +323,7 @@ def delete(map_identifier, topic_identifier, temporal_identifier):
         try:
             # Delete temporal occurrence from topic store
             store.delete_occurrence(map_identifier, temporal_occurrence.identifier)
+            timeline_cache.invalidate(map_identifier)
             flash("Temporal successfully deleted.", "success")
         except TopicDbError:
             flash(
@@ -5,13 +5,9 @@ February 13, 2022
 Brett Alistair Kromkamp (brettkromkamp@gmail.com)
 """
 
-import os
-import uuid
-
 import maya  # type: ignore
 from flask import (
     Blueprint,
-    current_app,
     flash,
     redirect,
     render_template,
@@ -31,6 +27,9 @@ from contextualise.utilities.topicstore import initialize
 
 from . import constants
 from .topic_store import get_topic_store
+from .utilities.map_access import get_map_access
+from .utilities.map_cache import get_notes_count
+from .utilities.resource_store import save_resource
 
 bp = Blueprint("three_d", __name__)
 
@@ -61,7 +60,7 @@ def index(map_identifier, topic_identifier):
     creation_date_attribute = topic.get_attribute_by_name("creation-timestamp")
     creation_date = maya.parse(creation_date_attribute.value) if creation_date_attribute else "Undefined"
 
-    map_notes_count = store.get_topic_occurrences_statistics(map_identifier, "notes")["note"]
+    map_notes_count = get_notes_count(map_identifier)
 
     return render_template(
         "three_d/index.html",
@@ -78,7 +77,7 @@ def index(map_identifier, topic_identifier):
 def upload(map_identifier, topic_identifier):
     store, topic_map, topic = initialize(map_identifier, topic_identifier, current_user)
 
-    map_notes_count = store.get_topic_occurrences_statistics(map_identifier, "notes")["note"]
+    map_notes_count = get_notes_count(map_identifier)
     error = 0
 
     if request.method == "POST":
@@ -108,15 +107,9 @@ def upload(map_identifier, topic_identifier):
             )
         else:
             file_extension = get_file_extension(form_upload_file.filename)
-            file_file_name = f"{str(uuid.uuid4())}.{file_extension}"
-
-            # Create the file directory for this topic map if it doesn't already exist
-            file_directory = os.path.join(current_app.static_folder, constants.RESOURCES_DIRECTORY, str(map_identifier))
-            if not os.path.isdir(file_directory):
-                os.makedirs(file_directory)
 
-            file_path = os.path.join(file_directory, file_file_name)
-            form_upload_file.save(file_path)
+            # Store the file (once, however often it is uploaded) and link it into the topic map's directory
+            file_file_name = save_resource(topic_map.identifier, form_upload_file.stream, file_extension)
 
             file_occurrence = Occurrence(
                 instance_of="3d-scene",
@@ -177,7 +170,7 @@ def edit(map_identifier, topic_identifier, file_identifier):
     form_file_title = file_occurrence.get_attribute_by_name("title").value
     form_file_scope = file_occurrence.scope
 
-    map_notes_count = store.get_topic_occurrences_statistics(map_identifier, "notes")["note"]
+    map_notes_count = get_notes_count(map_identifier)
     error = 0
 
     if request.method == "POST":
@@ -253,19 +246,10 @@ def delete(map_identifier, topic_identifier, file_identifier):
         flash("An error occurred while trying to delete the 3D scene.", "warning")
     else:
         try:
-            # Delete (3D scene) file occurrence from topic store
+            # Delete (3D scene) file occurrence from topic store (the file itself is removed from the file system by
+            # 'gc-resources' once no other occurrence refers to it)
             store.delete_occurrence(map_identifier, file_occurrence.identifier)
 
-            # Delete file from file system
-            file_file_path = os.path.join(
-                current_app.static_folder,
-                constants.RESOURCES_DIRECTORY,
-                str(map_identifier),
-                file_occurrence.resource_ref,
-            )
-            if os.path.exists(file_file_path):
-                os.remove(file_file_path)
-
             flash("3D scene successfully deleted.", "success")
         except TopicDbError:
             flash(
@@ -286,27 +270,13 @@ def delete(map_identifier, topic_identifier, file_identifier):
 def view(map_identifier, topic_identifier, file_url):
     store = get_topic_store()
 
-    collaboration_mode = None
-    if current_user.is_authenticated:  # User is logged in
-        is_map_owner = store.is_map_owner(map_identifier, current_user.id)
-        if is_map_owner:
-            topic_map = store.get_map(map_identifier, current_user.id)
-        else:
-            topic_map = store.get_map(map_identifier)
-        if topic_map is None:
-            abort(404)
-        collaboration_mode = store.get_collaboration_mode(map_identifier, current_user.id)
-        # The map is private and doesn't belong to the user who is trying to
-        # access it
-        if not topic_map.published and not is_map_owner:
-            if not collaboration_mode:  # The user is not collaborating on the map
-                abort(403)
-    else:  # User is not logged in
-        topic_map = store.get_map(map_identifier)
-        if topic_map is None:
-            abort(404)
-        if not topic_map.published:  # User is not logged in and the map is not published
-            abort(403)
+    map_access = get_map_access(map_identifier, current_user)
+    topic_map = map_access.topic_map
+    if topic_map is None:
+        abort(404)
+    # The map is private and the user is neither its owner nor collaborating on it
+    if not map_access.can_read:
+        abort(403)
 
     topic = store.get_topic(
         map_identifier,
@@ -316,7 +286,7 @@ def view(map_identifier, topic_identifier, file_url):
     if topic is None:
         abort(404)
 
-    map_notes_count = store.get_topic_occurrences_statistics(map_identifier, "notes")["note"]
+    map_notes_count = get_notes_count(map_identifier)
 
     return render_template(
         "three_d/view.html",
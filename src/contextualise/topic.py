@@ -9,7 +9,6 @@ from collections import deque
 from datetime import datetime
 
 import maya  # type: ignore
-import mistune
 from flask import (
     Blueprint,
     current_app,
@@ -35,7 +34,18 @@ from contextualise.utilities.topicstore import initialize
 
 from . import constants
 from .topic_store import get_topic_store
-from .utilities.highlight_renderer import HighlightRenderer
+from .utilities.filters import prefetch_topic_names
+from .utilities.identifier_index import update_identifier_index
+from .utilities.map_access import get_map_access
+from .utilities.map_cache import (
+    get_notes_count,
+    location_cache,
+    network_cache,
+    timeline_cache,
+    update_notes_count,
+)
+from .utilities.markdown import discard_markdown, render_markdown, warm_markdown
+from .utilities.search_index import update_search_index
 
 bp = Blueprint("topic", __name__)
 
@@ -44,39 +54,24 @@ bp = Blueprint("topic", __name__)
 def view(map_identifier, topic_identifier):
     store = get_topic_store()
 
-    collaboration_mode = None
-    is_map_owner = False
-    if current_user.is_authenticated:  # User is logged in
-        is_map_owner = store.is_map_owner(map_identifier, current_user.id)
-        if is_map_owner:
-            topic_map = store.get_map(map_identifier, current_user.id)
-        else:
-            topic_map = store.get_map(map_identifier)
-        if topic_map is None:
-            current_app.logger.warning(
-                f"Topic map not found: user identifier: [{current_user.id}], topic map identifier: [{map_identifier}]"
-            )
-            abort(404)
-        collaboration_mode = store.get_collaboration_mode(map_identifier, current_user.id)
-        if topic_map.published:
-            if not is_map_owner and topic_identifier == "home":
-                flash(
-                    "You are accessing a published topic map of another user.",
-                    "primary",
-                )
-        else:
-            if not is_map_owner:  # The map is private and doesn't belong to the user who is trying to access it
-                if not collaboration_mode:  # The user is not collaborating on the map
-                    abort(403)
-    else:  # User is not logged in
-        topic_map = store.get_map(map_identifier)
-        if topic_map is None:
-            current_app.logger.warning(
-                f"Topic map not found: user identifier: [N/A], topic map identifier: [{map_identifier}]"
-            )
-            abort(404)
-        if not topic_map.published:  # User is not logged in and the map is not published
-            abort(403)
+    map_access = get_map_access(map_identifier, current_user)
+    topic_map = map_access.topic_map
+    if topic_map is None:
+        current_app.logger.warning(
+            f"Topic map not found: user identifier: [{current_user.id if current_user.is_authenticated else 'N/A'}], "
+            f"topic map identifier: [{map_identifier}]"
+        )
+        abort(404)
+    # The map is private and the user is neither its owner nor collaborating on it
+    if not map_access.can_read:
+        abort(403)
+    is_map_owner = map_access.is_map_owner
+    collaboration_mode = map_access.collaboration_mode
+    if current_user.is_authenticated and topic_map.published and not is_map_owner and topic_identifier == "home":
+        flash(
+            "You are accessing a published topic map of another user.",
+            "primary",
+        )
 
     # Scope filtering, initially, can be in one of three states:
     #   - Unspecified (None)
@@ -168,15 +163,7 @@ def view(map_identifier, topic_identifier):
         match occurrence.instance_of:
             case "text":
                 if occurrence.scope == session["current_scope"] and occurrence.resource_data:
-                    markdown = mistune.create_markdown(
-                        renderer=HighlightRenderer(escape=False),
-                        plugins=[
-                            "strikethrough",
-                            "footnotes",
-                            "table",
-                        ],
-                    )
-                    occurrences["text"] = markdown(occurrence.resource_data.decode())
+                    occurrences["text"] = render_markdown(occurrence.resource_data)
             case "image":
                 occurrences["images"].append(
                     {
@@ -213,20 +200,12 @@ def view(map_identifier, topic_identifier):
                     }
                 )
             case "note" if occurrence.resource_data:
-                markdown = mistune.create_markdown(
-                    renderer=HighlightRenderer(escape=False),
-                    plugins=[
-                        "strikethrough",
-                        "footnotes",
-                        "table",
-                    ],
-                )
                 occurrences["notes"].append(
                     {
                         "identifier": occurrence.identifier,
                         "title": occurrence.get_attribute_by_name("title").value,
                         "timestamp": maya.parse(occurrence.get_attribute_by_name("modification-timestamp").value),
-                        "text": markdown(occurrence.resource_data.decode()),
+                        "text": render_markdown(occurrence.resource_data),
                     }
                 )
             case "temporal-event":
@@ -292,7 +271,13 @@ def view(map_identifier, topic_identifier):
     breadcrumbs.append(topic_identifier)
     session["breadcrumbs"] = list(breadcrumbs)
 
-    map_notes_count = store.get_topic_occurrences_statistics(map_identifier, "notes")["note"]
+    map_notes_count = get_notes_count(map_identifier)
+
+    tagged_topics = associations.dict.get("categorization", {}).get("member", [])
+    prefetch_topic_names(
+        map_identifier,
+        [topic.instance_of, session.get("current_scope", constants.UNIVERSAL_SCOPE), *breadcrumbs, *tagged_topics],
+    )
 
     return render_template(
         "topic/view.html",
@@ -316,7 +301,7 @@ def view(map_identifier, topic_identifier):
 def create(map_identifier, topic_identifier):
     store, topic_map, topic = initialize(map_identifier, topic_identifier, current_user)
 
-    map_notes_count = store.get_topic_occurrences_statistics(map_identifier, "notes")["note"]
+    map_notes_count = get_notes_count(map_identifier)
     error = 0
 
     if request.method == "POST":
@@ -390,6 +375,9 @@ def create(map_identifier, topic_identifier):
             store.create_occurrence(topic_map.identifier, text_occurrence)
             store.create_attribute(topic_map.identifier, modification_attribute)
 
+            # Render the topic's text ahead of the first view
+            warm_markdown(form_topic_text)
+
             # Persist temporal-related objects to the topic store
             if form_temporal_type == "event":
                 event_occurrence = Occurrence(
@@ -435,6 +423,11 @@ def create(map_identifier, topic_identifier):
                 store.create_occurrence(topic_map.identifier, era_occurrence, ontology_mode=OntologyMode.LENIENT)
                 store.create_attribute(topic_map.identifier, start_date_attribute)
                 store.create_attribute(topic_map.identifier, end_date_attribute)
+            if form_temporal_type in ("event", "era"):
+                timeline_cache.invalidate(topic_map.identifier)
+
+            update_search_index(topic_map.identifier, new_topic.identifier)
+            update_identifier_index(store, topic_map.identifier, new_topic.identifier)
 
             flash("Topic successfully created.", "success")
             return redirect(
@@ -490,7 +483,7 @@ def edit(map_identifier, topic_identifier):
     form_topic_instance_of = topic.instance_of
     form_topic_text_scope = texts[0].scope if len(texts) > 0 else session["current_scope"]
 
-    map_notes_count = store.get_topic_occurrences_statistics(map_identifier, "notes")["note"]
+    map_notes_count = get_notes_count(map_identifier)
     error = 0
 
     if request.method == "POST":
@@ -538,6 +531,8 @@ def edit(map_identifier, topic_identifier):
             # and persist it
             if len(texts) > 0 and form_topic_text_scope == session["current_scope"]:
                 store.update_occurrence_data(map_identifier, texts[0].identifier, form_topic_text)
+                if texts[0].resource_data:
+                    discard_markdown(texts[0].resource_data)
             else:
                 text_occurrence = Occurrence(
                     instance_of="text",
@@ -546,6 +541,7 @@ def edit(map_identifier, topic_identifier):
                     resource_data=form_topic_text,
                 )
                 store.create_occurrence(topic_map.identifier, text_occurrence)
+            warm_markdown(form_topic_text)
 
             # Update the topic's modification (timestamp) attribute
             timestamp = str(datetime.now())
@@ -564,6 +560,11 @@ def edit(map_identifier, topic_identifier):
                 )
                 store.create_attribute(topic_map.identifier, modification_attribute)
 
+            timeline_cache.invalidate(map_identifier)
+            location_cache.invalidate(map_identifier)
+            update_search_index(map_identifier, topic.identifier)
+            update_identifier_index(store, map_identifier, topic.identifier)
+
             flash("Topic successfully updated.", "success")
             return redirect(
                 url_for(
@@ -596,6 +597,12 @@ def delete(map_identifier, topic_identifier):
     try:
         # Remove the topic from the topic store
         store.delete_topic(map_identifier, topic_identifier)
+        # The topic's temporals, locations and associations (if any) were deleted with it
+        timeline_cache.invalidate(map_identifier)
+        location_cache.invalidate(map_identifier)
+        network_cache.invalidate(map_identifier)
+        update_search_index(map_identifier, topic_identifier)
+        update_identifier_index(store, map_identifier, topic_identifier)
 
         # Clear the breadcrumbs (of which this topic was part of)
         session["breadcrumbs"] = []
@@ -635,7 +642,7 @@ def delete(map_identifier, topic_identifier):
 def add_note(map_identifier, topic_identifier):
     store, topic_map, topic = initialize(map_identifier, topic_identifier, current_user)
 
-    map_notes_count = store.get_topic_occurrences_statistics(map_identifier, "notes")["note"]
+    map_notes_count = get_notes_count(map_identifier)
     error = 0
 
     if request.method == "POST":
@@ -685,6 +692,12 @@ def add_note(map_identifier, topic_identifier):
             store.create_occurrence(topic_map.identifier, note_occurrence)
             store.create_attribute(topic_map.identifier, title_attribute)
             store.create_attribute(topic_map.identifier, modification_attribute)
+            if topic.identifier == "notes":
+                update_notes_count(topic_map.identifier, 1)
+
+            # Render the note ahead of the first view
+            warm_markdown(form_note_text)
+            update_search_index(topic_map.identifier, topic.identifier)
 
             flash("Note successfully added.", "success")
             return redirect(
@@ -734,7 +747,7 @@ def edit_note(map_identifier, topic_identifier, note_identifier):
     form_note_text = note_occurrence.resource_data.decode()
     form_note_scope = note_occurrence.scope
 
-    map_notes_count = store.get_topic_occurrences_statistics(map_identifier, "notes")["note"]
+    map_notes_count = get_notes_count(map_identifier)
     error = 0
 
     if request.method == "POST":
@@ -776,13 +789,17 @@ def edit_note(map_identifier, topic_identifier, note_identifier):
                 timestamp,
             )
 
-            # Update note (occurrence)
+            # Update note (occurrence) and replace its previously rendered text
             store.update_occurrence_data(map_identifier, note_occurrence.identifier, form_note_text)
+            discard_markdown(note_occurrence.resource_data)
+            warm_markdown(form_note_text)
 
             # Update note's scope if it has changed
             if note_occurrence.scope != form_note_scope:
                 store.update_occurrence_scope(map_identifier, note_occurrence.identifier, form_note_scope)
 
+            update_search_index(map_identifier, topic.identifier)
+
             flash("Note successfully updated.", "success")
             return redirect(
                 url_for(
@@ -830,6 +847,10 @@ def delete_note(map_identifier, topic_identifier, note_identifier):
     else:
         try:
             store.delete_occurrence(map_identifier, note_occurrence.identifier)
+            if note_occurrence.topic_identifier == "notes":
+                update_notes_count(map_identifier, -1)
+
+            update_search_index(map_identifier, topic.identifier)
             flash("Note successfully deleted.", "success")
         except TopicDbError:
             flash(
@@ -848,12 +869,12 @@ def delete_note(map_identifier, topic_identifier, note_identifier):
 @bp.route("/topics/view-names/<map_identifier>/<topic_identifier>", methods=("GET", "POST"))
 @login_required
 def view_names(map_identifier, topic_identifier):
-    store, topic_map, topic = initialize(map_identifier, topic_identifier, current_user)
+    _, topic_map, topic = initialize(map_identifier, topic_identifier, current_user)
 
     creation_date_attribute = topic.get_attribute_by_name("creation-timestamp")
     creation_date = maya.parse(creation_date_attribute.value) if creation_date_attribute else "Undefined"
 
-    map_notes_count = store.get_topic_occurrences_statistics(map_identifier, "notes")["note"]
+    map_notes_count = get_notes_count(map_identifier)
 
     return render_template(
         "topic/view_names.html",
@@ -869,7 +890,7 @@ def view_names(map_identifier, topic_identifier):
 def add_name(map_identifier, topic_identifier):
     store, topic_map, topic = initialize(map_identifier, topic_identifier, current_user)
 
-    map_notes_count = store.get_topic_occurrences_statistics(map_identifier, "notes")["note"]
+    map_notes_count = get_notes_count(map_identifier)
     error = 0
 
     if request.method == "POST":
@@ -894,6 +915,10 @@ def add_name(map_identifier, topic_identifier):
         else:
             base_name = BaseName(form_topic_name, scope=form_topic_name_scope)
             store.create_base_name(map_identifier, topic.identifier, base_name)
+            timeline_cache.invalidate(map_identifier)
+            location_cache.invalidate(map_identifier)
+            update_search_index(map_identifier, topic.identifier)
+            update_identifier_index(store, map_identifier, topic.identifier)
 
             flash("Name successfully added.", "success")
             return redirect(
@@ -934,7 +959,7 @@ def edit_name(map_identifier, topic_identifier, name_identifier):
     form_topic_name = topic.get_base_name(name_identifier).name
     form_topic_name_scope = topic.get_base_name(name_identifier).scope
 
-    map_notes_count = store.get_topic_occurrences_statistics(map_identifier, "notes")["note"]
+    map_notes_count = get_notes_count(map_identifier)
     error = 0
 
     if request.method == "POST":
@@ -969,6 +994,11 @@ def edit_name(map_identifier, topic_identifier, name_identifier):
                     scope=form_topic_name_scope,
                 )
 
+            timeline_cache.invalidate(map_identifier)
+            location_cache.invalidate(map_identifier)
+            update_search_index(map_identifier, topic.identifier)
+            update_identifier_index(store, map_identifier, topic.identifier)
+
             flash("Name successfully updated.", "success")
             return redirect(
                 url_for(
@@ -1010,6 +1040,10 @@ def delete_name(map_identifier, topic_identifier, name_identifier):
     else:
         try:
             store.delete_base_name(map_identifier, name_identifier)
+            timeline_cache.invalidate(map_identifier)
+            location_cache.invalidate(map_identifier)
+            update_search_index(map_identifier, topic.identifier)
+            update_identifier_index(store, map_identifier, topic.identifier)
             flash("Topic name successfully deleted.", "success")
         except TopicDbError:
             flash(
@@ -1067,7 +1101,7 @@ def edit_identifier(map_identifier, topic_identifier):
     store, topic_map, topic = initialize(map_identifier, topic_identifier, current_user)
 
     form_topic_identifier = topic.identifier
-    map_notes_count = store.get_topic_occurrences_statistics(map_identifier, "notes")["note"]
+    map_notes_count = get_notes_count(map_identifier)
     error = 0
 
     if request.method == "POST":
@@ -1101,6 +1135,12 @@ def edit_identifier(map_identifier, topic_identifier):
                     )
                 )
 
+            timeline_cache.invalidate(map_identifier)
+            location_cache.invalidate(map_identifier)
+            network_cache.invalidate(map_identifier)
+            update_search_index(map_identifier, topic_identifier, form_topic_identifier)
+            update_identifier_index(store, map_identifier, topic_identifier, form_topic_identifier)
+
             flash("Identifier successfully updated.", "success")
             return redirect(
                 url_for(
@@ -1124,27 +1164,13 @@ def edit_identifier(map_identifier, topic_identifier):
 def index(map_identifier, topic_identifier):
     store = get_topic_store()
 
-    collaboration_mode = None
-    if current_user.is_authenticated:  # User is logged in
-        is_map_owner = store.is_map_owner(map_identifier, current_user.id)
-        if is_map_owner:
-            topic_map = store.get_map(map_identifier, current_user.id)
-        else:
-            topic_map = store.get_map(map_identifier)
-        if topic_map is None:
-            abort(404)
-        collaboration_mode = store.get_collaboration_mode(map_identifier, current_user.id)
-        # The map is private and doesn't belong to the user who is trying to
-        # access it
-        if not topic_map.published and not is_map_owner:
-            if not collaboration_mode:  # The user is not collaborating on the map
-                abort(403)
-    else:  # User is not logged in
-        topic_map = store.get_map(map_identifier)
-        if topic_map is None:
-            abort(404)
-        if not topic_map.published:  # User is not logged in and the map is not published
-            abort(403)
+    map_access = get_map_access(map_identifier, current_user)
+    topic_map = map_access.topic_map
+    if topic_map is None:
+        abort(404)
+    # The map is private and the user is neither its owner nor collaborating on it
+    if not map_access.can_read:
+        abort(403)
 
     topic = store.get_topic(
         map_identifier,
@@ -1189,6 +1215,8 @@ def index(map_identifier, topic_identifier):
     # Pagination
     total_pages = (topics_count + constants.TOPIC_ITEMS_PER_PAGE - 1) // constants.TOPIC_ITEMS_PER_PAGE
 
+    prefetch_topic_names(map_identifier, [index_topic.instance_of for index_topic in topics])
+
     return render_template(
         "topic/index.html",
         topic_map=topic_map,
@@ -5,25 +5,556 @@ March 5, 2019
 Brett Alistair Kromkamp (brettkromkamp@gmail.com)
 """
 
-from flask import current_app, g
-from topicdb.store.topicstore import TopicStore
+import os
+import sqlite3
+from collections.abc import Iterable
+from datetime import datetime
 
+from flask import current_app, g, has_request_context, request
+from flask_login import current_user  # type: ignore
+from topicdb.models.association import Association
+from topicdb.models.attribute import Attribute
+from topicdb.models.basename import BaseName
+from topicdb.models.datatype import DataType
+from topicdb.models.entity import Entity
+from topicdb.models.occurrence import Occurrence
+from topicdb.models.topic import Topic
+from topicdb.store import topicstore as topicdb_store
+from topicdb.store.topicstore import TopicStore as BaseTopicStore
+from topicdb.topicdberror import TopicDbError
 
-def get_topic_store():
+from .utilities.database import ConnectionPool, register_pool, route_connections
+from .utilities.read_replica import ReadReplica
+
+# SQLite's (default) limit on the number of host parameters in a single statement is 999 for older versions
+_MAX_BIND_VARIABLES = 500
+
+
+def _chunks(values: list, size: int = _MAX_BIND_VARIABLES) -> Iterable[list]:
+    for index in range(0, len(values), size):
+        yield values[index : index + size]
+
+
+# Keyset-paginated queries (over the tables' primary key or identifier indexes) for `get_map_records`
+_MAP_RECORD_QUERIES = {
+    "topic": """SELECT identifier, instance_of FROM topic
+        WHERE map_identifier = ? AND identifier > ? AND scope IS NULL
+        ORDER BY identifier LIMIT ?""",
+    "association": """SELECT topic.identifier AS identifier, topic.instance_of AS instance_of, topic.scope AS scope,
+        member.identifier AS member_identifier, member.src_topic_ref AS src_topic_ref,
+        member.src_role_spec AS src_role_spec, member.dest_topic_ref AS dest_topic_ref,
+        member.dest_role_spec AS dest_role_spec
+        FROM topic
+        LEFT JOIN member ON member.map_identifier = topic.map_identifier AND
+            member.association_identifier = topic.identifier
+        WHERE topic.map_identifier = ? AND topic.identifier > ? AND topic.scope IS NOT NULL
+        ORDER BY topic.identifier LIMIT ?""",
+    "base_name": """SELECT identifier, topic_identifier, name, scope, language FROM basename
+        WHERE map_identifier = ? AND identifier > ?
+        ORDER BY identifier LIMIT ?""",
+    "occurrence": """SELECT identifier, topic_identifier, instance_of, scope, language, resource_ref, {resource_data}
+        FROM occurrence
+        WHERE map_identifier = ? AND identifier > ?
+        ORDER BY identifier LIMIT ?""",
+    "attribute": """SELECT identifier, entity_identifier, name, value, data_type, scope, language FROM attribute
+        WHERE map_identifier = ? AND identifier > ?
+        ORDER BY identifier LIMIT ?""",
+}
+
+
+# TopicDB's store methods open (and close) a connection per call with `sqlite3.connect`; they check the connections out
+# of the store's pool instead (and the methods they call share them)
+route_connections(topicdb_store)
+
+
+class TopicStore(BaseTopicStore):
+    """
+    TopicDB's topic store extended with the (batched) queries Contextualise needs on top of the ones TopicDB provides.
+    """
+
+    def __init__(self, database_path: str, pool_size: int = 8, pool_timeout: float = 10.0) -> None:
+        """
+        :param database_path: The path of the database file.
+        :param pool_size: The maximum number of connections kept open.
+        :param pool_timeout: Seconds to wait for a connection when all of them are in use.
+        """
+        super().__init__(database_path=database_path)
+        self.pool = ConnectionPool(database_path, size=pool_size, timeout=pool_timeout)
+        register_pool(self.pool)  # For TopicDB's own methods as well; see below
+
+    def get_topic_base_names(
+        self, map_identifier: int, identifiers: Iterable[str], scope: str | None = None
+    ) -> dict[str, str]:
+        """
+        Resolve the (first) base name of several topics with a single query per batch of identifiers.
+        :param map_identifier: The topic map identifier.
+        :param identifiers: The topic identifiers to resolve.
+        :param scope: Only consider base names in this scope (like `get_topic` does).
+        :return: A dictionary mapping the identifier of every existing topic to its name. Topics without a (matching)
+        base name map to 'Undefined' (like `Topic.first_base_name` does).
+        """
+        result = {}
+
+        unique_identifiers = list(dict.fromkeys(identifiers))
+        if not unique_identifiers:
+            return result
+
+        with self.pool.connection() as connection:
+            connection.row_factory = sqlite3.Row
+            cursor = connection.cursor()
+            try:
+                for chunk in _chunks(unique_identifiers):
+                    sql = """SELECT topic.identifier AS identifier,
+                        (SELECT name FROM basename
+                            WHERE basename.map_identifier = topic.map_identifier AND
+                            basename.topic_identifier = topic.identifier{}
+                            ORDER BY basename.rowid
+                            LIMIT 1) AS name
+                        FROM topic
+                        WHERE topic.map_identifier = ? AND
+                        topic.identifier IN ({})""".format(
+                        " AND basename.scope = ?" if scope else "", ", ".join("?" * len(chunk))
+                    )
+                    bind_variables = (scope, map_identifier, *chunk) if scope else (map_identifier, *chunk)
+                    cursor.execute(sql, bind_variables)
+                    for record in cursor.fetchall():
+                        result[record["identifier"]] = record["name"] if record["name"] is not None else "Undefined"
+            except sqlite3.Error as error:
+                raise TopicDbError(f"Error retrieving topic base names: {error}")
+            finally:
+                cursor.close()
+        return result
+
+    def get_topic_instance_ofs(self, map_identifier: int, identifiers: Iterable[str]) -> dict[str, str]:
+        """
+        Retrieve the types of several topics with a single query per batch of identifiers.
+        :param map_identifier: The topic map identifier.
+        :param identifiers: The topic identifiers.
+        :return: A dictionary mapping the identifier of every existing topic to its type.
+        """
+        result = {}
+
+        unique_identifiers = list(dict.fromkeys(identifiers))
+        if not unique_identifiers:
+            return result
+
+        with self.pool.connection() as connection:
+            connection.row_factory = sqlite3.Row
+            cursor = connection.cursor()
+            try:
+                for chunk in _chunks(unique_identifiers):
+                    sql = """SELECT identifier, instance_of FROM topic
+                        WHERE map_identifier = ? AND
+                        identifier IN ({})""".format(", ".join("?" * len(chunk)))
+                    cursor.execute(sql, (map_identifier, *chunk))
+                    for record in cursor.fetchall():
+                        result[record["identifier"]] = record["instance_of"]
+            except sqlite3.Error as error:
+                raise TopicDbError(f"Error retrieving topic types: {error}")
+            finally:
+                cursor.close()
+        return result
+
+    def get_topic_name_records(
+        self, map_identifier: int, identifiers: Iterable[str] | None = None
+    ) -> list[tuple[str, str, str | None]]:
+        """
+        Retrieve the types and base names of (all of) a topic map's topics, excluding associations.
+        :param map_identifier: The topic map identifier.
+        :param identifiers: Only retrieve these topics.
+        :return: A list of (topic identifier, topic type, base name) tuples, one for each of a topic's base names (the
+        base name is `None` for topics without any).
+        """
+        result = []
+
+        sql = """SELECT topic.identifier AS identifier, topic.instance_of AS instance_of, basename.name AS name
+            FROM topic
+            LEFT JOIN basename ON basename.map_identifier = topic.map_identifier AND
+                basename.topic_identifier = topic.identifier
+            WHERE topic.map_identifier = ? AND
+            topic.scope IS NULL{0}"""
+        if identifiers is None:
+            statements = [(sql.format(""), (map_identifier,))]
+        else:
+            statements = [
+                (sql.format(f" AND topic.identifier IN ({', '.join('?' * len(chunk))})"), (map_identifier, *chunk))
+                for chunk in _chunks(list(dict.fromkeys(identifiers)))
+            ]
+
+        with self.pool.connection() as connection:
+            connection.row_factory = sqlite3.Row
+            cursor = connection.cursor()
+            try:
+                for statement, bind_variables in statements:
+                    cursor.execute(statement, bind_variables)
+                    for record in cursor.fetchall():
+                        result.append((record["identifier"], record["instance_of"], record["name"]))
+            except sqlite3.Error as error:
+                raise TopicDbError(f"Error retrieving topic names: {error}")
+            finally:
+                cursor.close()
+        return result
+
+    def get_association_members(self, map_identifier: int) -> list[tuple[str, str, str, str, str]]:
+        """
+        Retrieve the members of all of a topic map's associations in a single query.
+        :param map_identifier: The topic map identifier.
+        :return: A list of (association identifier, association type, association scope, source topic reference,
+        destination topic reference) tuples, ordered by association identifier.
+        """
+        result = []
+
+        with self.pool.connection() as connection:
+            connection.row_factory = sqlite3.Row
+            cursor = connection.cursor()
+            try:
+                cursor.execute(
+                    """SELECT topic.identifier AS identifier, topic.instance_of AS instance_of, topic.scope AS scope,
+                    member.src_topic_ref AS src_topic_ref, member.dest_topic_ref AS dest_topic_ref
+                    FROM member
+                    JOIN topic ON topic.map_identifier = member.map_identifier AND
+                        topic.identifier = member.association_identifier AND
+                        topic.scope IS NOT NULL
+                    WHERE member.map_identifier = ?
+                    ORDER BY topic.identifier""",
+                    (map_identifier,),
+                )
+                for record in cursor.fetchall():
+                    result.append(
+                        (
+                            record["identifier"],
+                            record["instance_of"],
+                            record["scope"],
+                            record["src_topic_ref"],
+                            record["dest_topic_ref"],
+                        )
+                    )
+            except sqlite3.Error as error:
+                raise TopicDbError(f"Error retrieving association members: {error}")
+            finally:
+                cursor.close()
+        return result
+
+    def get_occurrence_records(
+        self, map_identifier: int, instance_of: str, attribute_names: Iterable[str], scope: str | None = None
+    ) -> list[dict]:
+        """
+        Retrieve the occurrences of one type together with the values of some of their attributes in a single query
+        (`get_occurrences` with `RetrievalMode.RESOLVE_ATTRIBUTES` queries the attributes of each occurrence
+        separately).
+        :param map_identifier: The topic map identifier.
+        :param instance_of: The type of the occurrences.
+        :param attribute_names: The names of the attributes to include (`None` if the occurrence doesn't have it).
+        :param scope: Only retrieve the occurrences in this scope.
+        :return: A list of dictionaries with the occurrences' 'identifier', 'topic_identifier', 'scope' and
+        'resource_data' together with the requested attribute values keyed by attribute name.
+        """
+        result = []
+
+        attribute_names = list(attribute_names)
+        attribute_columns = "".join(
+            f""",
+                (SELECT value FROM attribute
+                    WHERE attribute.map_identifier = occurrence.map_identifier AND
+                    attribute.entity_identifier = occurrence.identifier AND
+                    attribute.name = ?
+                    LIMIT 1) AS attribute_{index}"""
+            for index in range(len(attribute_names))
+        )
+        sql = f"""SELECT identifier, topic_identifier, scope, resource_data{attribute_columns}
+            FROM occurrence
+            WHERE map_identifier = ? AND
+            instance_of = ?{" AND scope = ?" if scope else ""}
+            ORDER BY topic_identifier, identifier"""
+        bind_variables = (*attribute_names, map_identifier, instance_of, *((scope,) if scope else ()))
+
+        with self.pool.connection() as connection:
+            connection.row_factory = sqlite3.Row
+            cursor = connection.cursor()
+            try:
+                cursor.execute(sql, bind_variables)
+                for record in cursor.fetchall():
+                    occurrence = {
+                        "identifier": record["identifier"],
+                        "topic_identifier": record["topic_identifier"],
+                        "scope": record["scope"],
+                        "resource_data": record["resource_data"],
+                    }
+                    for index, attribute_name in enumerate(attribute_names):
+                        occurrence[attribute_name] = record[f"attribute_{index}"]
+                    result.append(occurrence)
+            except sqlite3.Error as error:
+                raise TopicDbError(f"Error retrieving occurrences: {error}")
+            finally:
+                cursor.close()
+        return result
+
+    def get_resource_reference_counts(
+        self, map_identifier: int, resource_refs: Iterable[str] | None = None
+    ) -> dict[str, int]:
+        """
+        Count the occurrences (and the map's image) referring to each (uploaded) file of a topic map.
+        :param map_identifier: The topic map identifier.
+        :param resource_refs: Only count the references to these files.
+        :return: A dictionary of reference counts keyed by resource reference.
+        """
+        result = {}
+
+        resource_refs = None if resource_refs is None else list(resource_refs)
+        sql = """SELECT resource_ref, COUNT(*) FROM occurrence
+            WHERE map_identifier = ? AND
+            resource_ref IS NOT NULL AND resource_ref != ''{}
+            GROUP BY resource_ref"""
+
+        with self.pool.connection() as connection:
+            cursor = connection.cursor()
+            try:
+                if resource_refs is None:
+                    cursor.execute(sql.format(""), (map_identifier,))
+                    result.update(cursor.fetchall())
+                else:
+                    for chunk in _chunks(resource_refs, _MAX_BIND_VARIABLES - 1):
+                        placeholders = ", ".join("?" * len(chunk))
+                        cursor.execute(sql.format(f" AND resource_ref IN ({placeholders})"), (map_identifier, *chunk))
+                        result.update(cursor.fetchall())
+                cursor.execute("SELECT image_path FROM map WHERE identifier = ?", (map_identifier,))
+                record = cursor.fetchone()
+                if record and record[0] and (resource_refs is None or record[0] in resource_refs):
+                    result[record[0]] = result.get(record[0], 0) + 1
+            except sqlite3.Error as error:
+                raise TopicDbError(f"Error retrieving resource reference counts: {error}")
+            finally:
+                cursor.close()
+        return result
+
+    def get_map_records(
+        self,
+        map_identifier: int,
+        record_type: str,
+        after: str = "",
+        limit: int = 1000,
+        resolve_resource_data: bool = False,
+    ) -> list[dict]:
+        """
+        Retrieve one page of a topic map's topics, associations, base names, occurrences or attributes (ordered by
+        identifier) for exporting the map without having to hold all of it in memory.
+        :param map_identifier: The topic map identifier.
+        :param record_type: One of 'topic', 'association', 'base_name', 'occurrence' or 'attribute'.
+        :param after: Only retrieve the records whose identifier comes after this one (keyset pagination, that is,
+        pass the identifier of the last record of the previous page).
+        :param limit: The maximum number of records to retrieve.
+        :param resolve_resource_data: Include the occurrences' resource data.
+        :return: A list of dictionaries keyed by column name.
+        """
+        result = []
+
+        sql = _MAP_RECORD_QUERIES[record_type].format(
+            resource_data="resource_data" if resolve_resource_data else "NULL AS resource_data"
+        )
+
+        with self.pool.connection() as connection:
+            connection.row_factory = sqlite3.Row
+            cursor = connection.cursor()
+            try:
+                cursor.execute(sql, (map_identifier, after, limit))
+                for record in cursor.fetchall():
+                    result.append(dict(record))
+            except sqlite3.Error as error:
+                raise TopicDbError(f"Error retrieving map records: {error}")
+            finally:
+                cursor.close()
+        return result
+
+    def create_entities(
+        self,
+        map_identifier: int,
+        topics: Iterable[Topic] = (),
+        occurrences: Iterable[Occurrence] = (),
+        associations: Iterable[Association] = (),
+        base_names: Iterable[tuple[str, BaseName]] = (),
+        attributes: Iterable[Attribute] = (),
+        replace_attributes: bool = False,
+        creation_timestamps: bool = True,
+    ) -> None:
+        """
+        Persist topics, occurrences and associations (with their base names, members and attributes) in a single
+        transaction: either all of them are created or, if any of the inserts fails, none of them. Like the
+        `create_topic`, `create_occurrence` and `create_association` methods (in lenient ontology mode) the entities
+        are given a 'creation-timestamp' attribute if they don't have one already. Validating the entities' references
+        is up to the caller.
+        :param map_identifier: The topic map identifier.
+        :param topics: The topics to create.
+        :param occurrences: The occurrences to create.
+        :param associations: The associations to create.
+        :param base_names: Additional base names of existing topics, as (topic identifier, base name) tuples.
+        :param attributes: Additional attributes of existing entities.
+        :param replace_attributes: Replace (rather than fail on) existing attributes with the same entity, name, scope
+        and language.
+        :param creation_timestamps: Add the missing 'creation-timestamp' attributes. Pass `False` if they are created
+        separately (as `attributes`).
+        """
+        topic_rows = []
+        base_name_rows = [
+            _base_name_row(map_identifier, topic_identifier, base_name) for topic_identifier, base_name in base_names
+        ]
+        occurrence_rows = []
+        member_rows = []
+        attribute_rows = [_attribute_row(map_identifier, attribute) for attribute in attributes]
+
+        timestamp = str(datetime.now()) if creation_timestamps else None
+        for topic in topics:
+            topic_rows.append((map_identifier, topic.identifier, topic.instance_of, None))
+            base_name_rows.extend(
+                _base_name_row(map_identifier, topic.identifier, base_name) for base_name in topic.base_names
+            )
+            attribute_rows.extend(
+                _attribute_row(map_identifier, attribute) for attribute in _attributes(topic, timestamp)
+            )
+        for occurrence in occurrences:
+            occurrence_rows.append(
+                (
+                    map_identifier,
+                    occurrence.identifier,
+                    occurrence.instance_of,
+                    occurrence.scope,
+                    occurrence.resource_ref,
+                    occurrence.resource_data,  # Type: bytes (the occurrence model encodes string data)
+                    occurrence.topic_identifier,
+                    occurrence.language.name.lower(),
+                )
+            )
+            attribute_rows.extend(
+                _attribute_row(map_identifier, attribute) for attribute in _attributes(occurrence, timestamp)
+            )
+        for association in associations:
+            topic_rows.append((map_identifier, association.identifier, association.instance_of, association.scope))
+            base_name_rows.extend(
+                _base_name_row(map_identifier, association.identifier, base_name)
+                for base_name in association.base_names
+            )
+            member = association.member
+            member_rows.append(
+                (
+                    map_identifier,
+                    member.identifier,
+                    member.src_topic_ref,
+                    member.src_role_spec,
+                    member.dest_topic_ref,
+                    member.dest_role_spec,
+                    association.identifier,
+                )
+            )
+            attribute_rows.extend(
+                _attribute_row(map_identifier, attribute) for attribute in _attributes(association, timestamp)
+            )
+        attribute_insert = "INSERT OR REPLACE" if replace_attributes else "INSERT"
+
+        with self.pool.connection() as connection:
+            try:
+                with connection:
+                    connection.executemany(
+                        "INSERT INTO topic (map_identifier, identifier, instance_of, scope) VALUES (?, ?, ?, ?)",
+                        topic_rows,
+                    )
+                    connection.executemany(
+                        """INSERT INTO basename (map_identifier, identifier, name, topic_identifier, scope, language)
+                        VALUES (?, ?, ?, ?, ?, ?)""",
+                        base_name_rows,
+                    )
+                    connection.executemany(
+                        """INSERT INTO occurrence (map_identifier, identifier, instance_of, scope, resource_ref,
+                        resource_data, topic_identifier, language)
+                        VALUES (?, ?, ?, ?, ?, ?, ?, ?)""",
+                        occurrence_rows,
+                    )
+                    connection.executemany(
+                        """INSERT INTO member (map_identifier, identifier, src_topic_ref, src_role_spec, dest_topic_ref,
+                        dest_role_spec, association_identifier)
+                        VALUES (?, ?, ?, ?, ?, ?, ?)""",
+                        member_rows,
+                    )
+                    connection.executemany(
+                        f"""{attribute_insert} INTO attribute (map_identifier, identifier, entity_identifier, name,
+                        value, data_type, scope, language)
+                        VALUES (?, ?, ?, ?, ?, ?, ?, ?)""",
+                        attribute_rows,
+                    )
+            except sqlite3.Error as error:
+                raise TopicDbError(f"Error creating entities: {error}")
+
+
+def _base_name_row(map_identifier: int, topic_identifier: str, base_name: BaseName) -> tuple:
+    return (
+        map_identifier,
+        base_name.identifier,
+        base_name.name,
+        topic_identifier,
+        base_name.scope,
+        base_name.language.name.lower(),
+    )
+
+
+def _attribute_row(map_identifier: int, attribute: Attribute) -> tuple:
+    return (
+        map_identifier,
+        attribute.identifier,
+        attribute.entity_identifier,
+        attribute.name,
+        attribute.value,
+        attribute.data_type.name.lower(),
+        attribute.scope,
+        attribute.language.name.lower(),
+    )
+
+
+def _attributes(entity: Entity, timestamp: str | None) -> list[Attribute]:
+    if timestamp is None or entity.get_attribute_by_name("creation-timestamp"):
+        return entity.attributes
+    return [
+        *entity.attributes,
+        Attribute("creation-timestamp", timestamp, entity.identifier, data_type=DataType.TIMESTAMP),
+    ]
+
+
+def _is_anonymous_read() -> bool:
+    return has_request_context() and request.method in ("GET", "HEAD") and not current_user.is_authenticated
+
+
+def get_topic_store(primary: bool = False) -> TopicStore:
+    """
+    The topic store for the current request: anonymous visitors' GET requests (to published maps, the only ones they
+    can access) read from the read replica, if enabled, so that bursts of visitors don't hold up the maps' editors.
+    :param primary: Use the primary database, for example for (the occasional) writes of otherwise read-only requests.
+    :return: The topic store.
+    """
+    if primary:
+        return current_app.extensions["topic_store"]
     if "topic_store" not in g:
-        g.topic_store = TopicStore(database_path=current_app.config["DATABASE_PATH"])
+        # The same store for the whole request, even when the replica is refreshed in the meantime
+        read_replica = current_app.extensions.get("read_replica")
+        store = read_replica.get_store() if read_replica is not None and _is_anonymous_read() else None
+        g.topic_store = store or current_app.extensions["topic_store"]
     return g.topic_store
 
 
-# Explicitly closing the connection at the end of each request is unnecessary
-# as the topic store manages its own connections
+def _create_topic_store(app, database_path: str) -> TopicStore:
+    return TopicStore(
+        database_path=database_path,
+        pool_size=int(app.config["TOPIC_STORE_POOL_SIZE"]),
+        pool_timeout=float(app.config["TOPIC_STORE_POOL_TIMEOUT"]),
+    )
 
-# def close_topic_store(e=None):
-#     topic_store = g.pop("topic_store", None)
-#     if topic_store is not None:
-#         topic_store.close()  # Close all the connections
-#         current_app.logger.warning(f"Topic store has been closed")
 
+def init_app(app) -> None:
+    # One (thread-safe) topic store per process instead of one per request; see 'TOPIC_STORE_POOL_SIZE'
+    app.extensions["topic_store"] = _create_topic_store(app, app.config["DATABASE_PATH"])
 
-# def init_app(app):
-#     app.teardown_appcontext(close_topic_store)
+    if app.config["READ_REPLICA_INTERVAL"]:
+        root, extension = os.path.splitext(app.config["DATABASE_PATH"])
+        app.extensions["read_replica"] = ReadReplica(
+            app.config["DATABASE_PATH"],
+            f"{root}-replica{extension}",
+            float(app.config["READ_REPLICA_INTERVAL"]),
+            lambda database_path: _create_topic_store(app, database_path),
+            logger=app.logger,
+        )
@@ -0,0 +1,132 @@
+"""
+adjacency.py file. Part of the Contextualise project.
+
+October 18, 2026
+Brett Alistair Kromkamp (brettkromkamp@gmail.com)
+"""
+
+from array import array
+from collections.abc import Iterable
+
+
+class AdjacencySnapshot:
+    """
+    A compact, read-only copy of the associations of a topic map. Topic identifiers, association types and scopes
+    are interned as integers and each topic's associations are kept in (parallel) arrays in association order.
+    """
+
+    def __init__(self, members: Iterable[tuple[str, str, str, str, str]]) -> None:
+        """
+        :param members: The (association identifier, association type, association scope, source topic reference,
+        destination topic reference) tuples of the map's associations, ordered by association identifier.
+        """
+        self._identifiers: list[str] = []
+        self._indexes: dict[str, int] = {}
+        self._values: list[str] = []  # Interned association types and scopes
+        self._value_indexes: dict[str, int] = {}
+
+        self._neighbours: list[array] = []
+        self._types: list[array] = []
+        self._scopes: list[array] = []
+        self._associations_counts = array("i")
+        self._neighbours_cache: dict[tuple[int, int | None], tuple[array, array]] = {}
+
+        for _, instance_of, scope, src_topic_ref, dest_topic_ref in members:
+            src = self._intern(src_topic_ref)
+            dest = self._intern(dest_topic_ref)
+            instance_of_value = self._intern_value(instance_of)
+            scope_value = self._intern_value(scope)
+
+            self._associations_counts[src] += 1
+            if dest != src:
+                self._associations_counts[dest] += 1
+                self._add_edge(src, dest, instance_of_value, scope_value)
+                self._add_edge(dest, src, instance_of_value, scope_value)
+
+    def __len__(self) -> int:
+        return len(self._identifiers)
+
+    def neighbours(
+        self, identifier: str, scope: str | None = None, offset: int = 0, limit: int | None = None
+    ) -> list[tuple[str, str]]:
+        """
+        Retrieve (a slice of) the topics a topic is associated with.
+        :param identifier: The topic identifier.
+        :param scope: Only follow associations in this scope.
+        :param offset: The number of associated topics to skip.
+        :param limit: The maximum number of associated topics to return.
+        :return: A list of (topic identifier, association type) tuples, ordered by association and with each
+        associated topic listed once (for the first association it takes part in).
+        """
+        neighbours, types = self._get_neighbours(identifier, scope)
+        end = len(neighbours) if limit is None else offset + limit
+        return [
+            (self._identifiers[neighbour], self._values[instance_of_value])
+            for neighbour, instance_of_value in zip(neighbours[offset:end], types[offset:end])
+        ]
+
+    def neighbours_count(self, identifier: str, scope: str | None = None) -> int:
+        return len(self._get_neighbours(identifier, scope)[0])
+
+    def associations_counts(self, identifiers: Iterable[str]) -> dict[str, int]:
+        """
+        Count the associations of several topics.
+        :param identifiers: The topic identifiers.
+        :return: A dictionary mapping each identifier to the number of associations the topic is a member of.
+        """
+        result = {}
+        for identifier in identifiers:
+            index = self._indexes.get(identifier)
+            result[identifier] = self._associations_counts[index] if index is not None else 0
+        return result
+
+    def _get_neighbours(self, identifier: str, scope: str | None) -> tuple[array, array]:
+        index = self._indexes.get(identifier)
+        if index is None:
+            return array("i"), array("i")
+        scope_value = self._value_indexes.get(scope, -1) if scope else None
+
+        # The (deduplicated) neighbours are derived from the topic's edges on first use
+        key = (index, scope_value)
+        result = self._neighbours_cache.get(key)
+        if result is None:
+            neighbours = array("i")
+            types = array("i")
+            seen = set()
+            for neighbour, instance_of_value, edge_scope_value in zip(
+                self._neighbours[index], self._types[index], self._scopes[index]
+            ):
+                if scope_value is not None and edge_scope_value != scope_value:
+                    continue
+                if neighbour not in seen:
+                    seen.add(neighbour)
+                    neighbours.append(neighbour)
+                    types.append(instance_of_value)
+            result = (neighbours, types)
+            self._neighbours_cache[key] = result
+        return result
+
+    def _intern(self, identifier: str) -> int:
+        index = self._indexes.get(identifier)
+        if index is None:
+            index = len(self._identifiers)
+            self._indexes[identifier] = index
+            self._identifiers.append(identifier)
+            self._neighbours.append(array("i"))
+            self._types.append(array("i"))
+            self._scopes.append(array("i"))
+            self._associations_counts.append(0)
+        return index
+
+    def _intern_value(self, value: str) -> int:
+        index = self._value_indexes.get(value)
+        if index is None:
+            index = len(self._values)
+            self._value_indexes[value] = index
+            self._values.append(value)
+        return index
+
+    def _add_edge(self, index: int, neighbour: int, instance_of_value: int, scope_value: int) -> None:
+        self._neighbours[index].append(neighbour)
+        self._types[index].append(instance_of_value)
+        self._scopes[index].append(scope_value)
@@ -0,0 +1,371 @@
+"""
+database.py file. Part of the Contextualise project.
+
+October 18, 2026
+Brett Alistair Kromkamp (brettkromkamp@gmail.com)
+"""
+
+import os
+import sqlite3
+import threading
+import time
+import weakref
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager
+from typing import NamedTuple
+
+from sqlalchemy import event
+
+AUTH_TABLES = ("role", "user", "roles_users")  # Flask-Security's tables, referenced tables first
+
+# The per-connection settings (see the 'SQLITE_*' settings), applied to every connection opened through `connect` and
+# to the connections of the SQLAlchemy engines passed to `tune_engine`
+_pragmas: dict[str, object] = {
+    "synchronous": "NORMAL",
+    "busy_timeout": 5000,
+    "cache_size": -16384,
+    "mmap_size": 268435456,
+    "temp_store": "MEMORY",
+}
+
+
+def apply_pragmas(connection) -> None:
+    """
+    Apply the configured (per-connection) PRAGMAs to a DB-API connection.
+    :param connection: A `sqlite3` connection.
+    """
+    cursor = connection.cursor()
+    try:
+        for name, value in _pragmas.items():
+            cursor.execute(f"PRAGMA {name} = {value}")
+    finally:
+        cursor.close()
+
+
+def connect(database_path: str, **kwargs) -> sqlite3.Connection:
+    """
+    Open a connection to one of Contextualise's SQLite databases with the configured PRAGMAs applied.
+    :param database_path: The path of the database file.
+    :param kwargs: Any of `sqlite3.connect`'s other (keyword) arguments.
+    :return: The connection.
+    """
+    # Python's `timeout` is SQLite's busy timeout (in seconds)
+    kwargs.setdefault("timeout", _pragmas["busy_timeout"] / 1000)
+    connection = sqlite3.connect(database_path, **kwargs)
+    apply_pragmas(connection)
+    return connection
+
+
+def tune_engine(engine) -> None:
+    # SQLAlchemy opens (and pools) its own connections
+    event.listen(engine, "connect", lambda dbapi_connection, connection_record: apply_pragmas(dbapi_connection))
+
+
+def set_journal_mode(database_path: str, journal_mode: str) -> None:
+    # Unlike the other settings the journal mode is stored in the database file itself so that it also applies to the
+    # connections that TopicDB's own store methods open
+    connection = connect(database_path)
+    try:
+        connection.execute(f"PRAGMA journal_mode = {journal_mode}")
+    finally:
+        connection.close()
+
+
+class PoolTimeoutError(sqlite3.OperationalError):
+    pass
+
+
+class PoolMetrics(NamedTuple):
+    size: int  # The maximum number of connections
+    open: int  # Idle and checked out connections
+    idle: int
+    checkouts: int
+    waits: int  # Checkouts that had to wait for a connection to be returned
+    wait_seconds: float
+    max_wait_seconds: float
+    timeouts: int
+
+
+# The pools of this process, reset in the child process after a `fork()` (of a Gunicorn worker with '--preload', for
+# example)
+_pools: "weakref.WeakSet[ConnectionPool]" = weakref.WeakSet()
+
+# Database path -> the pool that the modules passed to `route_connections` check their connections out of
+_registered_pools: "weakref.WeakValueDictionary[str, ConnectionPool]" = weakref.WeakValueDictionary()
+
+
+class ConnectionPool:
+    """
+    A bounded, thread-safe pool of (long-lived, tuned) connections to an SQLite database.
+    """
+
+    def __init__(self, database_path: str, size: int = 8, timeout: float = 10.0) -> None:
+        """
+        :param database_path: The path of the database file.
+        :param size: The maximum number of (idle and checked out) connections.
+        :param timeout: Seconds to wait for a connection to be returned when all of them are checked out.
+        """
+        self.database_path = database_path
+        self.size = size
+        self.timeout = timeout
+        self.reset()
+        _pools.add(self)
+
+    def reset(self) -> None:
+        """
+        Forget all connections without closing them, for example in a forked process where they belong to the parent.
+        """
+        self._condition = threading.Condition()
+        self._idle: list[sqlite3.Connection] = []  # Used last in, first out
+        self._open = 0
+        self._checkouts = 0
+        self._waits = 0
+        self._wait_seconds = 0.0
+        self._max_wait_seconds = 0.0
+        self._timeouts = 0
+        self._closed = False
+        self._local = threading.local()  # The connection checked out by the thread and the depth of its `with` blocks
+
+    def close(self) -> None:
+        """
+        Close the idle connections. The checked out connections are closed when they are returned (instead of being
+        kept for reuse).
+        """
+        with self._condition:
+            self._closed = True
+            for connection in self._idle:
+                connection.close()
+            self._open -= len(self._idle)
+            self._idle.clear()
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def metrics(self) -> PoolMetrics:
+        with self._condition:
+            return PoolMetrics(
+                self.size,
+                self._open,
+                len(self._idle),
+                self._checkouts,
+                self._waits,
+                round(self._wait_seconds, 6),
+                round(self._max_wait_seconds, 6),
+                self._timeouts,
+            )
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        """
+        Check out a connection for the duration of the `with` block. Nested blocks (of the same thread) share the
+        connection of the outermost one instead of checking out another one. A transaction that is still open at the end
+        of the outermost block is rolled back.
+        """
+        local = self._local
+        if not getattr(local, "depth", 0):
+            local.connection = self._checkout()
+            local.depth = 0
+        local.depth += 1
+        connection = local.connection
+        try:
+            yield connection
+        finally:
+            local.depth -= 1
+            if not local.depth:
+                local.connection = None
+                self._checkin(connection)
+
+    def _checkout(self) -> sqlite3.Connection:
+        start = time.perf_counter()
+        with self._condition:
+            while not self._idle and self._open >= self.size:
+                remaining = self.timeout - (time.perf_counter() - start)
+                if remaining <= 0:
+                    self._timeouts += 1
+                    raise PoolTimeoutError(f"No database connection became available within {self.timeout} seconds")
+                self._condition.wait(remaining)
+            connection = self._idle.pop() if self._idle else None
+            if connection is None:
+                self._open += 1
+
+            wait_seconds = time.perf_counter() - start
+            self._checkouts += 1
+            if wait_seconds > 0.001:
+                self._waits += 1
+            self._wait_seconds += wait_seconds
+            self._max_wait_seconds = max(self._max_wait_seconds, wait_seconds)
+
+        if connection is None:
+            try:
+                # Threads take turns using the connection
+                connection = connect(self.database_path, check_same_thread=False)
+            except sqlite3.Error:
+                with self._condition:
+                    self._open -= 1
+                    self._condition.notify()
+                raise
+        return connection
+
+    def _checkin(self, connection: sqlite3.Connection) -> None:
+        try:
+            if connection.in_transaction:
+                connection.rollback()
+            connection.row_factory = None
+            connection.isolation_level = ""
+        except sqlite3.Error:
+            connection.close()
+            connection = None
+        with self._condition:
+            if connection is not None and self._closed:
+                connection.close()
+                connection = None
+            if connection is None:
+                self._open -= 1
+            else:
+                self._idle.append(connection)
+            self._condition.notify()
+
+
+def _reset_pools() -> None:
+    for pool in list(_pools):
+        pool.reset()
+
+
+class PooledConnection:
+    """
+    A connection checked out of a pool that code written for `sqlite3.connect` (TopicDB's store methods) can use like a
+    `sqlite3` connection. Closing it returns the connection to the pool.
+    """
+
+    def __init__(self, pool: ConnectionPool) -> None:
+        self._context = pool.connection()
+        self._connection = self._context.__enter__()
+        # Set on the cursors rather than on the (shared) connection, like every connection of its own would have it
+        self.row_factory = None
+
+    def cursor(self) -> sqlite3.Cursor:
+        cursor = self._connection.cursor()
+        cursor.row_factory = self.row_factory
+        return cursor
+
+    def execute(self, sql: str, parameters=()) -> sqlite3.Cursor:
+        return self.cursor().execute(sql, parameters)
+
+    def commit(self) -> None:
+        self._connection.commit()
+
+    def rollback(self) -> None:
+        self._connection.rollback()
+
+    def close(self) -> None:
+        if self._context is not None:
+            context, self._context = self._context, None
+            context.__exit__(None, None, None)
+
+    def __enter__(self):
+        self._connection.__enter__()  # Commits or rolls back (the transaction) at the end of the `with` block
+        return self
+
+    def __exit__(self, exception_type, exception, traceback) -> bool:
+        return self._connection.__exit__(exception_type, exception, traceback)
+
+
+class _PooledSqlite3:
+    # Stands in for the `sqlite3` module: connections to a database with a registered (open) pool are checked out of it
+    def __getattr__(self, name: str):
+        return getattr(sqlite3, name)
+
+    def connect(self, database, *args, **kwargs):
+        pool = _registered_pools.get(database)
+        if pool is None or pool.closed or args or kwargs:
+            return sqlite3.connect(database, *args, **kwargs)
+        return PooledConnection(pool)
+
+
+def register_pool(pool: ConnectionPool) -> None:
+    """
+    Let the modules passed to `route_connections` check their connections to the pool's database out of the pool.
+    :param pool: The connection pool.
+    """
+    _registered_pools[pool.database_path] = pool
+
+
+def route_connections(module) -> None:
+    """
+    Route the connections a module opens with `sqlite3.connect` (per call, like TopicDB's store methods) through the
+    registered connection pools. The connections to other databases are opened as before.
+    :param module: The module (that imports `sqlite3`).
+    """
+    module.sqlite3 = _PooledSqlite3()
+
+
+os.register_at_fork(after_in_child=_reset_pools)
+
+
+def move_tables(source_path: str, target_path: str, table_names: Iterable[str], keep_source: bool = False) -> dict:
+    """
+    Move tables' rows (including their identifiers) from one database to the (existing) tables of another one. Rows that
+    are already in the target tables are replaced.
+    :param source_path: The path of the database file to move the rows from.
+    :param target_path: The path of the database file to move the rows to.
+    :param table_names: The tables, referenced tables first.
+    :param keep_source: Copy the rows instead of dropping the tables from the source database afterwards.
+    :return: The number of moved rows, per table.
+    """
+    table_names = list(table_names)
+    result = {}
+
+    connection = connect(target_path, isolation_level=None)
+    try:
+        connection.execute("ATTACH DATABASE ? AS source", (source_path,))
+        for name in table_names:
+            for schema in ("main", "source"):
+                if not connection.execute(
+                    f"SELECT 1 FROM {schema}.sqlite_master WHERE type = 'table' AND name = ?", (name,)
+                ).fetchone():
+                    raise ValueError(
+                        f"There is no '{name}' table in {source_path if schema == 'source' else target_path}"
+                    )
+
+        # In WAL mode a transaction is only atomic per database; the rows are copied first so that moving them again
+        # after a failure is safe
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            for name in reversed(table_names):
+                connection.execute(f'DELETE FROM main."{name}"')
+            for name in table_names:
+                columns = ", ".join(f'"{row[1]}"' for row in connection.execute(f'PRAGMA main.table_info("{name}")'))
+                cursor = connection.execute(
+                    f'INSERT INTO main."{name}" ({columns}) SELECT {columns} FROM source."{name}"'
+                )
+                result[name] = cursor.rowcount
+            connection.execute("COMMIT")
+        except sqlite3.Error:
+            connection.execute("ROLLBACK")
+            raise
+
+        if not keep_source:
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                for name in reversed(table_names):
+                    connection.execute(f'DROP TABLE source."{name}"')
+                connection.execute("COMMIT")
+            except sqlite3.Error:
+                connection.execute("ROLLBACK")
+                raise
+    finally:
+        connection.close()
+    return result
+
+
+def init_app(app) -> None:
+    _pragmas.update(
+        synchronous=app.config["SQLITE_SYNCHRONOUS"],
+        busy_timeout=int(app.config["SQLITE_BUSY_TIMEOUT"]),
+        cache_size=int(app.config["SQLITE_CACHE_SIZE"]),
+        mmap_size=int(app.config["SQLITE_MMAP_SIZE"]),
+        temp_store=app.config["SQLITE_TEMP_STORE"],
+    )
+    for database_path in {app.config["DATABASE_PATH"], app.config["AUTH_DATABASE_PATH"]}:
+        set_journal_mode(database_path, app.config["SQLITE_JOURNAL_MODE"])
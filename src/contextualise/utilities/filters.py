@@ -5,14 +5,49 @@ February 13, 2022
 Brett Alistair Kromkamp (brettkromkamp@gmail.com)
 """
 
+from collections.abc import Iterable
+
+from flask import g
+
 from ..topic_store import get_topic_store
 
 
+def _topic_names(topic_map_identifier: int) -> dict[str, str | None]:
+    # Request-scoped: topic names can change between requests but not during the rendering of a page
+    if "topic_names" not in g:
+        g.topic_names = {}
+    return g.topic_names.setdefault(str(topic_map_identifier), {})
+
+
+def prefetch_topic_names(topic_map_identifier: int, topic_identifiers: Iterable[str]) -> None:
+    """
+    Resolve the names of several topics with a single (batched) query so that the `topic_name` filter doesn't have to
+    query the topic store for each topic when the page is rendered. Views call this before `render_template`.
+    :param topic_map_identifier: The topic map identifier.
+    :param topic_identifiers: The identifiers of the topics the page displays the names of.
+    """
+    names = _topic_names(topic_map_identifier)
+    unresolved = [
+        identifier for identifier in dict.fromkeys(topic_identifiers) if identifier and identifier not in names
+    ]
+    if not unresolved:
+        return
+
+    resolved = get_topic_store().get_topic_base_names(topic_map_identifier, unresolved)
+    for identifier in unresolved:
+        names[identifier] = resolved.get(identifier)  # Unknown topics are remembered as `None`
+
+
 def topic_name(topic_identifier: str, topic_map_identifier: int) -> str:
-    topic_store = get_topic_store()
-    topic = topic_store.get_topic(topic_map_identifier, topic_identifier)
-    if topic:
-        return topic.first_base_name.name
+    names = _topic_names(topic_map_identifier)
+    if topic_identifier not in names:
+        topic_store = get_topic_store()
+        topic = topic_store.get_topic(topic_map_identifier, topic_identifier)
+        names[topic_identifier] = topic.first_base_name.name if topic else None
+
+    name = names[topic_identifier]
+    if name is not None:
+        return name
 
     parts = [part.capitalize() for part in topic_identifier.split("-")]
     return " ".join(parts)
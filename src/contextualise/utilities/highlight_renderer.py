@@ -5,20 +5,42 @@ February 13, 2022
 Brett Alistair Kromkamp (brettkromkamp@gmail.com)
 """
 
+from functools import lru_cache
+
 import mistune
 from pygments import highlight
 from pygments.formatters import html
+from pygments.lexer import Lexer
 from pygments.lexers import get_lexer_by_name
+from pygments.util import ClassNotFound
+
+# Formatters and lexers don't keep any state between calls to `highlight` so they can be shared
+_formatter = html.HtmlFormatter()
+
+
+@lru_cache(maxsize=256)
+def get_lexer(language: str) -> Lexer | None:
+    """
+    Look up (and memoize) the lexer for a language name. Unknown names are cached as well (as `None`) so that
+    repeatedly rendering the same text doesn't repeat the failed lookup.
+    :param language: The language name taken from the code block's info string.
+    :return: The lexer or `None` if Pygments doesn't know the language.
+    """
+    try:
+        return get_lexer_by_name(language, stripall=True)
+    except ClassNotFound:
+        return None
 
 
 class HighlightRenderer(mistune.HTMLRenderer):
-    def __init__(self, escape=True, allow_harmful_protocols=None):
+    def __init__(self, escape=True, allow_harmful_protocols=None, max_highlight_size=None):
         super().__init__(escape, allow_harmful_protocols)
+        self.max_highlight_size = max_highlight_size
 
     def block_code(self, code, **kwargs):
-        language = kwargs.get("info")
-        if language:
-            lexer = get_lexer_by_name(language, stripall=True)
-            formatter = html.HtmlFormatter()
-            return highlight(code, lexer, formatter)
+        info = kwargs.get("info")
+        if info and (self.max_highlight_size is None or len(code) <= self.max_highlight_size):
+            lexer = get_lexer(info.split(None, 1)[0].lower())
+            if lexer:
+                return highlight(code, lexer, _formatter)
         return "<pre><code>" + mistune.escape(code) + "</code></pre>"
@@ -0,0 +1,153 @@
+"""
+identifier_index.py file. Part of the Contextualise project.
+
+October 18, 2026
+Brett Alistair Kromkamp (brettkromkamp@gmail.com)
+"""
+
+import threading
+from bisect import bisect_left, insort
+from collections import defaultdict
+from collections.abc import Iterable, Iterator
+from heapq import merge
+
+from contextualise.topic_store import get_topic_store
+
+from .map_cache import identifier_cache
+from .trigram_index import TrigramIndex
+
+Entry = tuple[str, str]  # (Lower-cased) key, topic identifier
+
+
+def _prefix_range(entries: list[Entry], prefix: str) -> Iterator[Entry]:
+    index = bisect_left(entries, (prefix,))
+    while index < len(entries) and entries[index][0].startswith(prefix):
+        yield entries[index]
+        index += 1
+
+
+def _remove(entries: list[Entry], entry: Entry) -> None:
+    index = bisect_left(entries, entry)
+    if index < len(entries) and entries[index] == entry:
+        del entries[index]
+
+
+class IdentifierIndex:
+    """
+    Sorted arrays of a topic map's (lower-cased) topic identifiers and base names, partitioned by topic type, for prefix
+    lookups with bisect.
+    """
+
+    def __init__(self, records: Iterable[tuple[str, str, str | None]]) -> None:
+        """
+        :param records: The (topic identifier, topic type, base name) tuples of the map's topics, one per base name.
+        """
+        self._identifiers: dict[str, list[Entry]] = defaultdict(list)  # Keyed by topic type
+        self._names: dict[str, list[Entry]] = defaultdict(list)  # Keyed by topic type
+        self._topics: dict[str, tuple[str, set[str]]] = {}  # Topic identifier -> (topic type, lower-cased names)
+        self._lock = threading.Lock()
+
+        for identifier, instance_of, name in records:
+            if identifier not in self._topics:
+                self._topics[identifier] = (instance_of, set())
+                self._identifiers[instance_of].append((identifier.lower(), identifier))
+            if name:
+                self._topics[identifier][1].add(name.lower())
+        for identifier, (instance_of, names) in self._topics.items():
+            self._names[instance_of].extend((name, identifier) for name in names)
+        for entries in (*self._identifiers.values(), *self._names.values()):
+            entries.sort()
+
+    def __len__(self) -> int:
+        return len(self._topics)
+
+    def lookup(self, query: str, instance_ofs: list[str] | None = None, limit: int = 10) -> list[str]:
+        """
+        Look up the topics whose identifier or one of whose names starts with the query (case-insensitively).
+        :param query: The prefix.
+        :param instance_ofs: Only look up topics of these types.
+        :param limit: The maximum number of identifiers to return.
+        :return: The matching identifiers. Identifier matches come first (ordered by identifier, like
+        `get_topic_identifiers`), followed by the topics that only match by name.
+        """
+        result = []
+        seen = set()
+
+        prefix = query.lower()
+        with self._lock:
+            instance_ofs = list(self._identifiers.keys()) if instance_ofs is None else instance_ofs
+            for partition in (self._identifiers, self._names):
+                ranges = [_prefix_range(partition.get(instance_of, []), prefix) for instance_of in instance_ofs]
+                for _, identifier in merge(*ranges):
+                    if identifier not in seen:
+                        seen.add(identifier)
+                        result.append(identifier)
+                        if len(result) == limit:
+                            return result
+        return result
+
+    def update(self, identifier: str, records: Iterable[tuple[str, str, str | None]]) -> None:
+        """
+        Replace a topic's entries.
+        :param identifier: The topic identifier.
+        :param records: The topic's current (topic identifier, topic type, base name) tuples. None if the topic no
+        longer exists.
+        """
+        records = list(records)
+        with self._lock:
+            topic = self._topics.pop(identifier, None)
+            if topic is not None:
+                instance_of, names = topic
+                _remove(self._identifiers[instance_of], (identifier.lower(), identifier))
+                for name in names:
+                    _remove(self._names[instance_of], (name, identifier))
+
+            if records:
+                instance_of = records[0][1]
+                names = {name.lower() for _, _, name in records if name}
+                self._topics[identifier] = (instance_of, names)
+                insort(self._identifiers[instance_of], (identifier.lower(), identifier))
+                for name in names:
+                    insort(self._names[instance_of], (name, identifier))
+
+
+def get_identifier_index(map_identifier: int) -> IdentifierIndex:
+    # The index is loaded (from the primary database, as it is shared by all requests) on first use and kept current
+    # by the views that create, rename or delete topics
+    index = identifier_cache.get(map_identifier)
+    if index is None:
+        index = IdentifierIndex(get_topic_store(primary=True).get_topic_name_records(map_identifier))
+        identifier_cache.set(map_identifier, None, index)
+    return index
+
+
+def get_trigram_index(map_identifier: int) -> TrigramIndex:
+    # Kept next to (and updated together with) the map's identifier index
+    index = identifier_cache.get(map_identifier, "trigrams")
+    if index is None:
+        index = TrigramIndex(get_topic_store(primary=True).get_topic_name_records(map_identifier))
+        identifier_cache.set(map_identifier, "trigrams", index)
+    return index
+
+
+def update_identifier_index(store, map_identifier: int, *topic_identifiers: str) -> None:
+    """
+    Bring a topic map's (loaded) identifier and trigram indexes up to date after topics were created, renamed or
+    deleted or had their type or base names changed.
+    :param store: The topic store.
+    :param map_identifier: The topic map identifier.
+    :param topic_identifiers: The identifiers of the changed topics.
+    """
+    indexes = [
+        index
+        for index in (identifier_cache.get(map_identifier), identifier_cache.get(map_identifier, "trigrams"))
+        if index is not None
+    ]
+    if not indexes or not topic_identifiers:
+        return
+    records = defaultdict(list)
+    for record in store.get_topic_name_records(map_identifier, topic_identifiers):
+        records[record[0]].append(record)
+    for index in indexes:
+        for identifier in topic_identifiers:
+            index.update(identifier, records[identifier])
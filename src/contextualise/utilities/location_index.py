@@ -0,0 +1,160 @@
+"""
+location_index.py file. Part of the Contextualise project.
+
+October 18, 2026
+Brett Alistair Kromkamp (brettkromkamp@gmail.com)
+"""
+
+import math
+import threading
+from collections import defaultdict
+from collections.abc import Iterable
+from typing import NamedTuple
+
+CELL_SIZE = 1.0  # Size (in degrees) of the cells of the grid the locations are indexed by
+CLUSTER_CELL_SIZE = 90.0  # Size (in degrees) of the cluster cells at zoom level 0, halved with every zoom level
+
+
+class Location(NamedTuple):
+    occurrence_identifier: str
+    topic_identifier: str
+    base_name: str
+    description: str
+    latitude: float
+    longitude: float
+    label: str
+
+
+class Cluster(NamedTuple):
+    latitude: float  # Mean latitude of the clustered locations
+    longitude: float  # Mean longitude of the clustered locations
+    count: int
+    south: float
+    west: float
+    north: float
+    east: float
+
+
+def _longitude_ranges(west: float, east: float) -> list[tuple[float, float]]:
+    # Viewports can span (or wrap around) the antimeridian
+    if east - west >= 360.0:
+        return [(-180.0, 180.0)]
+    west = (west + 180.0) % 360.0 - 180.0
+    east = (east + 180.0) % 360.0 - 180.0
+    if west <= east:
+        return [(west, east)]
+    return [(west, 180.0), (-180.0, east)]
+
+
+class LocationIndex:
+    """
+    A (uniform) grid over a topic map's locations for bounding box queries together with per-zoom level cluster
+    aggregates that are computed on first use.
+    """
+
+    def __init__(self, locations: list[Location], cell_size: float = CELL_SIZE) -> None:
+        self.locations = locations
+        self.cell_size = cell_size
+        self._locations_by_identifier = {location.occurrence_identifier: location for location in locations}
+        self._cells: dict[tuple[int, int], list[Location]] = defaultdict(list)
+        for location in locations:
+            self._cells[self._cell(location.longitude, location.latitude, cell_size)].append(location)
+        self._clusters: dict[int, dict[tuple[int, int], tuple[Cluster, Location]]] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.locations)
+
+    def get(self, occurrence_identifier: str) -> Location | None:
+        return self._locations_by_identifier.get(occurrence_identifier)
+
+    def within(self, west: float, south: float, east: float, north: float) -> list[Location]:
+        """
+        Retrieve the locations inside a bounding box.
+        :return: The locations inside the bounding box.
+        """
+        result = []
+        for range_west, range_east in _longitude_ranges(west, east):
+            for locations in self._select(self._cells, self.cell_size, range_west, south, range_east, north):
+                result.extend(
+                    location
+                    for location in locations
+                    if range_west <= location.longitude <= range_east and south <= location.latitude <= north
+                )
+        return result
+
+    def clusters(
+        self, west: float, south: float, east: float, north: float, zoom: int
+    ) -> tuple[list[Location], list[Cluster]]:
+        """
+        Aggregate the locations inside a bounding box into the (grid) clusters of a zoom level.
+        :return: A tuple with the locations that aren't clustered with any other location and the clusters.
+        """
+        cells = self._get_cluster_cells(zoom)
+        cell_size = CLUSTER_CELL_SIZE / 2**zoom
+
+        locations = []
+        clusters = []
+        for range_west, range_east in _longitude_ranges(west, east):
+            for cluster, location in self._select(cells, cell_size, range_west, south, range_east, north):
+                if cluster.count == 1:
+                    locations.append(location)
+                else:
+                    clusters.append(cluster)
+        return locations, clusters
+
+    def _get_cluster_cells(self, zoom: int) -> dict[tuple[int, int], tuple[Cluster, Location]]:
+        cells = self._clusters.get(zoom)
+        if cells is None:
+            with self._lock:
+                cells = self._clusters.get(zoom)
+                if cells is None:
+                    cells = self._build_cluster_cells(CLUSTER_CELL_SIZE / 2**zoom)
+                    self._clusters[zoom] = cells
+        return cells
+
+    def _build_cluster_cells(self, cell_size: float) -> dict[tuple[int, int], tuple[Cluster, Location]]:
+        grouped_locations = defaultdict(list)
+        for location in self.locations:
+            grouped_locations[self._cell(location.longitude, location.latitude, cell_size)].append(location)
+
+        result = {}
+        for cell, locations in grouped_locations.items():
+            latitudes = [location.latitude for location in locations]
+            longitudes = [location.longitude for location in locations]
+            cluster = Cluster(
+                sum(latitudes) / len(locations),
+                sum(longitudes) / len(locations),
+                len(locations),
+                min(latitudes),
+                min(longitudes),
+                max(latitudes),
+                max(longitudes),
+            )
+            result[cell] = (cluster, locations[0])  # The location stands in for single-location clusters
+        return result
+
+    @staticmethod
+    def _cell(longitude: float, latitude: float, cell_size: float) -> tuple[int, int]:
+        return math.floor(longitude / cell_size), math.floor(latitude / cell_size)
+
+    def _select(
+        self,
+        cells: dict[tuple[int, int], object],
+        cell_size: float,
+        west: float,
+        south: float,
+        east: float,
+        north: float,
+    ) -> Iterable:
+        min_x, min_y = self._cell(west, south, cell_size)
+        max_x, max_y = self._cell(east, north, cell_size)
+        if (max_x - min_x + 1) * (max_y - min_y + 1) <= len(cells):
+            for x in range(min_x, max_x + 1):
+                for y in range(min_y, max_y + 1):
+                    if (x, y) in cells:
+                        yield cells[x, y]
+        else:  # Fewer occupied cells than cells in the bounding box
+            for (x, y), value in cells.items():
+                if min_x <= x <= max_x and min_y <= y <= max_y:
+                    yield value
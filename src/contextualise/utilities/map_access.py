@@ -0,0 +1,69 @@
+"""
+map_access.py file. Part of the Contextualise project.
+
+October 18, 2026
+Brett Alistair Kromkamp (brettkromkamp@gmail.com)
+"""
+
+from typing import NamedTuple
+
+from flask import g
+from topicdb.models.collaborationmode import CollaborationMode
+from topicdb.models.map import Map
+
+from contextualise.topic_store import get_topic_store
+
+from .map_cache import map_access_cache
+
+
+class MapAccess(NamedTuple):
+    topic_map: Map | None  # The user's view of the map if they own it, the map itself otherwise
+    is_map_owner: bool
+    collaboration_mode: CollaborationMode | None
+    can_read: bool
+    can_write: bool
+
+
+def _resolve_map_access(store, map_identifier: int, user_identifier: int | None) -> MapAccess:
+    is_map_owner = False
+    collaboration_mode = None
+    topic_map = None
+    if user_identifier is not None:
+        user_map = store.get_map(map_identifier, user_identifier)
+        if user_map:
+            is_map_owner = bool(user_map.owner)
+            collaboration_mode = user_map.collaboration_mode
+            if is_map_owner:
+                topic_map = user_map
+    if topic_map is None:
+        topic_map = store.get_map(map_identifier)
+
+    if topic_map is None:
+        return MapAccess(None, False, None, False, False)
+    can_read = bool(topic_map.published) or is_map_owner or collaboration_mode is not None
+    can_write = is_map_owner or collaboration_mode is CollaborationMode.EDIT
+    return MapAccess(topic_map, is_map_owner, collaboration_mode, can_read, can_write)
+
+
+def get_map_access(map_identifier: int, current_user) -> MapAccess:
+    """
+    Resolve what the current user can do with a topic map. The result is kept for the rest of the request and, per
+    user, in a (short-lived) cache that the views changing a map or its collaborators invalidate.
+    :param map_identifier: The topic map identifier.
+    :param current_user: The (possibly anonymous) current user.
+    :return: The map together with the user's access to it. The map is `None` if it doesn't exist.
+    """
+    if "map_access" not in g:
+        g.map_access = {}
+    key = str(map_identifier)
+    result = g.map_access.get(key)
+    if result is None:
+        user_identifier = current_user.id if current_user.is_authenticated else None
+        result = map_access_cache.get(map_identifier, user_identifier)
+        if result is None:
+            # Resolved on the primary database: the result is shared by the user's requests, and a map that has just
+            # been unpublished mustn't stay readable because the read replica's snapshot is older
+            result = _resolve_map_access(get_topic_store(primary=True), map_identifier, user_identifier)
+            map_access_cache.set(map_identifier, user_identifier, result)
+        g.map_access[key] = result
+    return result
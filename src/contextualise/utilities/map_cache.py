@@ -0,0 +1,90 @@
+"""
+map_cache.py file. Part of the Contextualise project.
+
+October 18, 2026
+Brett Alistair Kromkamp (brettkromkamp@gmail.com)
+"""
+
+import threading
+import time
+from collections.abc import Callable, Hashable
+from typing import Any
+
+from contextualise.topic_store import get_topic_store
+
+
+class MapCache:
+    """
+    Derived (per-process) data partitioned by topic map. The views that change the underlying topic map data invalidate
+    the map's entries; the (optional) time-to-live bounds how long other worker processes can serve stale entries.
+    """
+
+    def __init__(self, ttl: float | None = None) -> None:
+        self.ttl = ttl
+        self._entries: dict = {}
+        self._lock = threading.Lock()
+
+    def get(self, map_identifier: int, key: Hashable = None) -> Any | None:
+        with self._lock:
+            entry = self._entries.get(str(map_identifier), {}).get(key)
+        if entry is None:
+            return None
+        value, timestamp = entry
+        if self.ttl is not None and time.monotonic() - timestamp > self.ttl:
+            return None
+        return value
+
+    def set(self, map_identifier: int, key: Hashable, value: Any) -> None:
+        with self._lock:
+            self._entries.setdefault(str(map_identifier), {})[key] = (value, time.monotonic())
+
+    def update(self, map_identifier: int, key: Hashable, function: Callable[[Any], Any]) -> None:
+        # Entries that aren't cached (anymore) are left alone; they are recomputed on first use
+        with self._lock:
+            entries = self._entries.get(str(map_identifier))
+            if entries and key in entries:
+                value, timestamp = entries[key]
+                entries[key] = (function(value), timestamp)
+
+    def invalidate(self, map_identifier: int) -> None:
+        with self._lock:
+            self._entries.pop(str(map_identifier), None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+timeline_cache = MapCache()
+location_cache = MapCache()
+network_cache = MapCache()
+identifier_cache = MapCache()
+notes_count_cache = MapCache()
+map_access_cache = MapCache()
+
+
+def init_app(app) -> None:
+    for cache in (timeline_cache, location_cache, network_cache, identifier_cache, notes_count_cache):
+        cache.ttl = app.config["MAP_CACHE_TTL"]
+        cache.clear()
+    map_access_cache.ttl = app.config["MAP_ACCESS_CACHE_TTL"]
+    map_access_cache.clear()
+
+
+def get_notes_count(map_identifier: int) -> int:
+    """
+    The number of (unattached) notes of a topic map as shown by the notes badge in the header of (almost) every page.
+    :param map_identifier: The topic map identifier.
+    :return: The number of notes.
+    """
+    count = notes_count_cache.get(map_identifier)
+    if count is None:
+        # Counted on the primary database: the count is shared by all requests (and then kept current with deltas),
+        # so it mustn't come from the read replica's older snapshot
+        count = get_topic_store(primary=True).get_topic_occurrences_statistics(map_identifier, "notes")["note"]
+        notes_count_cache.set(map_identifier, None, count)
+    return count
+
+
+def update_notes_count(map_identifier: int, delta: int) -> None:
+    notes_count_cache.update(map_identifier, None, lambda count: max(count + delta, 0))
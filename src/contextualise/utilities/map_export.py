@@ -0,0 +1,78 @@
+"""
+map_export.py file. Part of the Contextualise project.
+
+October 18, 2026
+Brett Alistair Kromkamp (brettkromkamp@gmail.com)
+"""
+
+import base64
+import json
+from collections.abc import Iterator
+
+from contextualise import constants
+
+EXPORT_FORMAT_VERSION = 1
+
+# The order in which the records are exported: topics (and associations) come before the names, occurrences and
+# attributes that refer to them so that an export can be imported again in a single pass
+RECORD_TYPES = ("topic", "association", "base_name", "occurrence", "attribute")
+
+_encoder = json.JSONEncoder(ensure_ascii=False)
+
+
+def _camel_case(key: str) -> str:
+    head, *tail = key.split("_")
+    return head + "".join(word.capitalize() for word in tail)
+
+
+def _to_json(record_type: str, keys: list[str], record: dict) -> str:
+    result = {"type": record_type}
+    result.update(zip(keys, record.values()))
+    resource_data = result.pop("resourceData", None)
+    if resource_data is not None:
+        try:
+            result["resourceData"] = resource_data.decode("utf-8")
+        except UnicodeDecodeError:
+            result["resourceData"] = base64.b64encode(resource_data).decode("ascii")
+            result["resourceDataEncoding"] = "base64"
+    return _encoder.encode(result)
+
+
+def export_records(
+    store, topic_map, resolve_resource_data: bool = False, page_size: int = constants.EXPORT_PAGE_SIZE
+) -> Iterator[str]:
+    """
+    Export a topic map as newline-delimited JSON, one page of records at a time.
+    :param store: The topic store.
+    :param topic_map: The topic map.
+    :param resolve_resource_data: Include the occurrences' resource data (UTF-8 text as is, anything else base64
+    encoded).
+    :param page_size: The number of records to retrieve (and yield) at a time.
+    :return: A generator of chunks of NDJSON lines, starting with a line describing the map.
+    """
+    header = {
+        "type": "map",
+        "version": EXPORT_FORMAT_VERSION,
+        "identifier": topic_map.identifier,
+        "name": topic_map.name,
+        "description": topic_map.description,
+    }
+    yield _encoder.encode(header) + "\n"
+
+    for record_type in RECORD_TYPES:
+        after = ""
+        while True:
+            records = store.get_map_records(
+                topic_map.identifier,
+                record_type,
+                after=after,
+                limit=page_size,
+                resolve_resource_data=resolve_resource_data,
+            )
+            if records:
+                keys = [_camel_case(key) for key in records[0]]  # The same columns for every record of a type
+                json_type = _camel_case(record_type)
+                yield "".join(_to_json(json_type, keys, record) + "\n" for record in records)
+            if len(records) < page_size:
+                break
+            after = records[-1]["identifier"]
@@ -0,0 +1,307 @@
+"""
+map_import.py file. Part of the Contextualise project.
+
+October 18, 2026
+Brett Alistair Kromkamp (brettkromkamp@gmail.com)
+"""
+
+import base64
+import csv
+import json
+import tempfile
+import time
+from collections.abc import Callable, Iterable, Iterator
+from typing import NamedTuple
+
+from topicdb.models.association import Association
+from topicdb.models.attribute import Attribute
+from topicdb.models.basename import BaseName
+from topicdb.models.datatype import DataType
+from topicdb.models.language import Language
+from topicdb.models.member import Member
+from topicdb.models.occurrence import Occurrence
+from topicdb.models.topic import Topic
+from topicdb.topicdberror import TopicDbError
+
+from contextualise import constants
+
+MAX_REPORTED_REJECTIONS = 20
+
+
+class ImportProgress(NamedTuple):
+    records: int  # Read so far
+    created: int  # Topics, associations, base names, occurrences and attributes
+    skipped: int  # Topics and associations that already existed (together with their names, occurrences, etc.)
+    rejected: int
+    seconds: float
+
+
+def read_ndjson(file) -> Iterator[tuple[int, dict]]:
+    # The format of '/api/export': one JSON object per line with a 'type' key
+    for line_number, line in enumerate(file, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as error:
+            raise ValueError(f"Line {line_number}: invalid JSON ({error})")
+        yield line_number, record
+
+
+def read_csv(file) -> Iterator[tuple[int, dict]]:
+    # The columns are named like the NDJSON keys. Rows without a 'type' are topics which can also have a 'name' and a
+    # 'text' column
+    reader = csv.DictReader(file)
+    for record in reader:
+        yield reader.line_num, {key: value for key, value in record.items() if key and value}
+
+
+def _language(record: dict) -> Language:
+    return Language[record.get("language", "eng").upper()]
+
+
+class MapImporter:
+    """
+    Loads a stream of topic map records (as read by `read_ndjson` or `read_csv`) into a topic map. The records are
+    written in batches, each in a single transaction. Attributes are spooled to a temporary file and written at the
+    end (replacing the 'creation-timestamp' attributes that the topic store adds to the entities it creates, unless
+    `creation_timestamps` is `False` because the records already include them).
+
+    Topics and associations that already exist in the map are skipped together with the base names, occurrences and
+    attributes that refer to them. When a batch can't be written (because one of its records has the identifier of an
+    existing occurrence, for example) its records are written one at a time and only the failing ones are rejected.
+    """
+
+    def __init__(
+        self,
+        store,
+        map_identifier: int,
+        batch_size: int = constants.IMPORT_BATCH_SIZE,
+        progress: Callable[[ImportProgress], None] | None = None,
+        creation_timestamps: bool = True,
+    ) -> None:
+        self.store = store
+        self.map_identifier = map_identifier
+        self.batch_size = batch_size
+        self.creation_timestamps = creation_timestamps
+        self.progress = progress
+        self.rejections: list[tuple[int, str]] = []  # (Line number, error); only the first ones are kept
+
+        # The batch's records as (line number, entity) tuples; base names are (line number, (topic identifier, name))
+        self._topics: list[tuple[int, Topic]] = []
+        self._associations: list[tuple[int, Association]] = []
+        self._base_names: list[tuple[int, tuple[str, BaseName]]] = []
+        self._occurrences: list[tuple[int, Occurrence]] = []
+        self._batch_identifiers: set[str] = set()
+        # Existing (and rejected) topics and associations and the occurrences dropped with them
+        self._skipped: set[str] = set()
+
+        self._records = 0
+        self._created = 0
+        self._skipped_count = 0
+        self._rejected = 0
+        self._start = 0.0
+
+    def import_records(self, records: Iterable[tuple[int, dict]]) -> ImportProgress:
+        """
+        Import the records.
+        :param records: (Line number, record) tuples.
+        :return: The final counts.
+        """
+        self._start = time.perf_counter()
+        with tempfile.TemporaryFile(mode="w+", encoding="utf-8") as attributes_file:
+            for line_number, record in records:
+                self._records += 1
+                try:
+                    if record.get("type") == "attribute":
+                        attributes_file.write(json.dumps([line_number, record]) + "\n")
+                    else:
+                        self._add(line_number, record)
+                except (TopicDbError, KeyError, ValueError, TypeError) as error:
+                    self._reject(line_number, error)
+                if self._batch_length() >= self.batch_size:
+                    self._flush()
+            self._flush()
+
+            attributes_file.seek(0)
+            attributes = []
+            for line in attributes_file:
+                line_number, record = json.loads(line)
+                try:
+                    attribute = Attribute(
+                        record["name"],
+                        record["value"],
+                        record["entityIdentifier"],
+                        identifier=record.get("identifier", ""),
+                        data_type=DataType[record.get("dataType", "string").upper()],
+                        scope=record.get("scope", constants.UNIVERSAL_SCOPE),
+                        language=_language(record),
+                    )
+                except (TopicDbError, KeyError, ValueError, TypeError) as error:
+                    self._reject(line_number, error)
+                    continue
+                if attribute.entity_identifier in self._skipped:
+                    continue
+                attributes.append((line_number, attribute))
+                if len(attributes) >= self.batch_size:
+                    self._flush_attributes(attributes)
+                    attributes = []
+            self._flush_attributes(attributes)
+        return self._current_progress()
+
+    def _add(self, line_number: int, record: dict) -> None:
+        record_type = record.get("type", "topic")
+        if record_type == "topic":
+            if not record.get("identifier"):
+                raise ValueError("Missing topic identifier")
+            topic = Topic(record["identifier"], record.get("instanceOf", "topic"), record.get("name", "Undefined"))
+            if "name" not in record:
+                topic.clear_base_names()  # The topic's names are separate 'baseName' records
+            self._add_topic(line_number, topic, self._topics)
+            if record.get("text"):
+                self._occurrences.append(
+                    (
+                        line_number,
+                        Occurrence(instance_of="text", topic_identifier=topic.identifier, resource_data=record["text"]),
+                    )
+                )
+        elif record_type == "association":
+            association = Association(
+                identifier=record.get("identifier", ""),
+                instance_of=record.get("instanceOf", "association"),
+                name=record.get("name", "Undefined"),
+                scope=record.get("scope", constants.UNIVERSAL_SCOPE),
+            )
+            if "name" not in record:
+                association.clear_base_names()
+            association.member = Member(
+                record["srcTopicRef"],
+                record.get("srcRoleSpec", "related"),
+                record["destTopicRef"],
+                record.get("destRoleSpec", "related"),
+                identifier=record.get("memberIdentifier", ""),
+            )
+            self._add_topic(line_number, association, self._associations)
+        elif record_type == "baseName":
+            base_name = BaseName(
+                record["name"],
+                scope=record.get("scope", constants.UNIVERSAL_SCOPE),
+                language=_language(record),
+                identifier=record.get("identifier", ""),
+            )
+            self._base_names.append((line_number, (record["topicIdentifier"], base_name)))
+        elif record_type == "occurrence":
+            resource_data = record.get("resourceData")
+            if resource_data is not None and record.get("resourceDataEncoding") == "base64":
+                resource_data = base64.b64decode(resource_data)
+            occurrence = Occurrence(
+                identifier=record.get("identifier", ""),
+                instance_of=record.get("instanceOf", "occurrence"),
+                topic_identifier=record["topicIdentifier"],
+                scope=record.get("scope", constants.UNIVERSAL_SCOPE),
+                resource_ref=record.get("resourceRef", ""),
+                resource_data=resource_data,
+                language=_language(record),
+            )
+            self._occurrences.append((line_number, occurrence))
+        elif record_type != "map":  # The (NDJSON) header is handled by the caller
+            raise ValueError(f"Unknown record type '{record_type}'")
+
+    def _add_topic(self, line_number: int, topic: Topic, batch: list) -> None:
+        if topic.identifier in self._batch_identifiers:
+            raise ValueError(f"Duplicate identifier '{topic.identifier}'")
+        self._batch_identifiers.add(topic.identifier)
+        batch.append((line_number, topic))
+
+    def _batch_length(self) -> int:
+        return len(self._topics) + len(self._associations) + len(self._base_names) + len(self._occurrences)
+
+    def _flush(self) -> None:
+        if self._batch_length() == 0:
+            return
+
+        # Skip the topics and associations that already exist with a single (batched) query
+        existing_identifiers = self.store.get_topic_instance_ofs(self.map_identifier, self._batch_identifiers).keys()
+        self._skipped.update(existing_identifiers)
+        self._skipped_count += len(existing_identifiers)
+        topics = [topic for topic in self._topics if topic[1].identifier not in self._skipped]
+        associations = [
+            association for association in self._associations if association[1].identifier not in self._skipped
+        ]
+        base_names = [base_name for base_name in self._base_names if base_name[1][0] not in self._skipped]
+        occurrences = self._remaining_occurrences(self._occurrences)
+
+        try:
+            self._create(topics=topics, associations=associations, base_names=base_names, occurrences=occurrences)
+        except TopicDbError:
+            # One failing record fails the batch's whole transaction. The topics and associations go first so that the
+            # base names and occurrences of the ones that are rejected can be dropped with them
+            for key, entities in (("topics", topics), ("associations", associations)):
+                for line_number, entity in entities:
+                    if not self._create_one(line_number, key, entity):
+                        self._skipped.add(entity.identifier)
+            for line_number, base_name in base_names:
+                if base_name[0] not in self._skipped:
+                    self._create_one(line_number, "base_names", base_name)
+            for line_number, occurrence in self._remaining_occurrences(occurrences):
+                if not self._create_one(line_number, "occurrences", occurrence):
+                    self._skipped.add(occurrence.identifier)
+
+        self._topics = []
+        self._associations = []
+        self._base_names = []
+        self._occurrences = []
+        self._batch_identifiers = set()
+        self._report()
+
+    def _flush_attributes(self, attributes: list[tuple[int, Attribute]]) -> None:
+        if not attributes:
+            return
+        try:
+            self._create(attributes=attributes)
+        except TopicDbError:
+            for line_number, attribute in attributes:
+                self._create_one(line_number, "attributes", attribute)
+        self._report()
+
+    def _remaining_occurrences(self, occurrences: list[tuple[int, Occurrence]]) -> list[tuple[int, Occurrence]]:
+        result = []
+        for line_number, occurrence in occurrences:
+            if occurrence.topic_identifier in self._skipped:
+                self._skipped.add(occurrence.identifier)  # So that its attributes are skipped as well
+            else:
+                result.append((line_number, occurrence))
+        return result
+
+    def _create(self, **entities: list[tuple[int, object]]) -> None:
+        # Writes the entities (passed to `create_entities` by keyword, without their line numbers) in one transaction
+        self.store.create_entities(
+            self.map_identifier,
+            creation_timestamps=self.creation_timestamps,
+            replace_attributes="attributes" in entities,
+            **{key: [entity for _, entity in values] for key, values in entities.items()},
+        )
+        self._created += sum(len(values) for values in entities.values())
+
+    def _create_one(self, line_number: int, key: str, entity) -> bool:
+        try:
+            self._create(**{key: [(line_number, entity)]})
+        except TopicDbError as error:
+            self._reject(line_number, error)
+            return False
+        return True
+
+    def _reject(self, line_number: int, error: Exception) -> None:
+        self._rejected += 1
+        if len(self.rejections) < MAX_REPORTED_REJECTIONS:
+            self.rejections.append((line_number, str(error)))
+
+    def _current_progress(self) -> ImportProgress:
+        return ImportProgress(
+            self._records, self._created, self._skipped_count, self._rejected, time.perf_counter() - self._start
+        )
+
+    def _report(self) -> None:
+        if self.progress:
+            self.progress(self._current_progress())
@@ -0,0 +1,166 @@
+"""
+markdown.py file. Part of the Contextualise project.
+
+October 18, 2026
+Brett Alistair Kromkamp (brettkromkamp@gmail.com)
+"""
+
+import hashlib
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+
+import mistune
+
+from .highlight_renderer import HighlightRenderer
+
+DEFAULT_PLUGINS = ("strikethrough", "footnotes", "table")
+DEFAULT_CACHE_SIZE = 1024
+RENDERER_VERSION = "1"  # Bump whenever the generated HTML changes for the same markdown
+
+_parsers: dict = {}
+_parsers_lock = threading.Lock()
+_max_highlight_size: int | None = None
+
+
+class RenderedMarkdownCache:
+    """
+    Rendered HTML keyed by a hash of the raw markdown and the renderer configuration. Entries are kept in a bounded
+    (in-process) LRU and, optionally, in a directory shared by all worker processes.
+    """
+
+    def __init__(self, size: int = DEFAULT_CACHE_SIZE, directory: str | None = None) -> None:
+        self.size = size
+        self.directory = directory
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> str | None:
+        with self._lock:
+            html = self._entries.get(key)
+            if html is not None:
+                self._entries.move_to_end(key)
+                return html
+
+        if self.directory:
+            try:
+                with open(self._path(key), encoding="utf-8") as file:
+                    html = file.read()
+            except OSError:
+                return None
+            self._remember(key, html)
+        return html
+
+    def set(self, key: str, html: str) -> None:
+        self._remember(key, html)
+
+        if self.directory:
+            path = self._path(key)
+            try:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                # Write to a temporary file first so that concurrent readers never see a partial entry
+                file_descriptor, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+                with os.fdopen(file_descriptor, "w", encoding="utf-8") as file:
+                    file.write(html)
+                os.replace(temp_path, path)
+            except OSError:
+                pass  # The disk tier is best-effort; the in-process tier still holds the entry
+
+    def discard(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+        if self.directory:
+            try:
+                os.remove(self._path(key))
+            except OSError:
+                pass
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def _remember(self, key: str, html: str) -> None:
+        if self.size <= 0:
+            return
+        with self._lock:
+            self._entries[key] = html
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.size:
+                self._entries.popitem(last=False)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], f"{key}.html")
+
+
+_cache = RenderedMarkdownCache()
+
+
+def init_app(app) -> None:
+    global _cache, _max_highlight_size
+
+    directory = None
+    if app.config["MARKDOWN_DISK_CACHE"]:
+        directory = app.config.get("MARKDOWN_CACHE_DIRECTORY") or os.path.join(app.instance_path, "cache", "markdown")
+    _cache = RenderedMarkdownCache(app.config["MARKDOWN_CACHE_SIZE"], directory)
+
+    with _parsers_lock:
+        _max_highlight_size = app.config["HIGHLIGHT_MAX_CODE_SIZE"]
+        _parsers.clear()  # Parsers are (re)created with the new renderer configuration on first use
+
+
+def get_markdown(plugins: tuple = DEFAULT_PLUGINS) -> mistune.Markdown:
+    """
+    Return the shared markdown parser for a set of plugins, creating it on first use.
+    Mistune creates a fresh parsing state for every call so the same parser can safely be used by all threads.
+    :param plugins: The mistune plugins the parser is configured with.
+    :return: The (compiled) markdown parser.
+    """
+    key = tuple(plugins)
+    parser = _parsers.get(key)
+    if parser is None:
+        with _parsers_lock:
+            parser = _parsers.get(key)
+            if parser is None:
+                parser = mistune.create_markdown(
+                    renderer=HighlightRenderer(escape=False, max_highlight_size=_max_highlight_size),
+                    plugins=list(key),
+                )
+                _parsers[key] = parser
+    return parser
+
+
+def _cache_key(text: bytes, plugins: tuple) -> str:
+    digest = hashlib.sha256()
+    digest.update(f"{RENDERER_VERSION}:{_max_highlight_size}:{','.join(plugins)}:".encode())
+    digest.update(text)
+    return digest.hexdigest()
+
+
+def _to_bytes(text: str | bytes) -> bytes:
+    return text if isinstance(text, bytes) else text.encode("utf-8")
+
+
+def render_markdown(text: str | bytes, plugins: tuple = DEFAULT_PLUGINS) -> str:
+    """
+    Render markdown to HTML, serving previously rendered text from the cache.
+    :param text: The markdown, either as a string or as the raw (UTF-8 encoded) bytes of an occurrence.
+    :param plugins: The mistune plugins to render with.
+    :return: The rendered HTML.
+    """
+    raw_text = _to_bytes(text)
+    key = _cache_key(raw_text, tuple(plugins))
+    html = _cache.get(key)
+    if html is None:
+        html = get_markdown(plugins)(raw_text.decode("utf-8"))
+        _cache.set(key, html)
+    return html
+
+
+def warm_markdown(text: str | bytes, plugins: tuple = DEFAULT_PLUGINS) -> None:
+    render_markdown(text, plugins)
+
+
+def discard_markdown(text: str | bytes, plugins: tuple = DEFAULT_PLUGINS) -> None:
+    _cache.discard(_cache_key(_to_bytes(text), tuple(plugins)))
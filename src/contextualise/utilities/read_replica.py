@@ -0,0 +1,125 @@
+"""
+read_replica.py file. Part of the Contextualise project.
+
+October 18, 2026
+Brett Alistair Kromkamp (brettkromkamp@gmail.com)
+"""
+
+import logging
+import os
+import sqlite3
+import stat
+import threading
+import time
+from collections.abc import Callable
+from typing import Any
+
+from .database import connect
+
+
+def _make_snapshot(database_path: str, snapshot_path: str) -> None:
+    # The snapshot is written next to the current one and then renamed so that readers never see a partial copy
+    temporary_path = f"{snapshot_path}.{os.getpid()}.tmp"
+    if os.path.exists(temporary_path):
+        os.remove(temporary_path)
+
+    try:
+        source = connect(database_path)
+        try:
+            target = sqlite3.connect(temporary_path)
+            try:
+                source.backup(target)  # A single read transaction; in WAL mode the editors' writes carry on meanwhile
+                target.execute("PRAGMA journal_mode = DELETE")  # The copy doesn't need (nor should inherit) a WAL file
+            finally:
+                target.close()
+        finally:
+            source.close()
+
+        # SQLite opens a read-only file read-only (unless running as root): writes through the snapshot fail instead
+        # of being lost at the next refresh
+        os.chmod(temporary_path, stat.S_IRUSR | stat.S_IRGRP | stat.S_IROTH)
+        os.replace(temporary_path, snapshot_path)
+    except BaseException:
+        # A restarted worker (with another process identifier) wouldn't reuse, and so never remove, the partial copy
+        for path in (temporary_path, f"{temporary_path}-journal"):
+            if os.path.exists(path):
+                os.remove(path)
+        raise
+
+
+class ReadReplica:
+    """
+    A periodically refreshed, read-only snapshot of the topic store database (made with SQLite's backup API) and the
+    topic store that reads it. The worker processes share the snapshot file; whichever process first notices that the
+    snapshot is out of date refreshes it (in the background) and the other processes pick up the new file.
+    """
+
+    def __init__(
+        self,
+        database_path: str,
+        snapshot_path: str,
+        interval: float,
+        store_factory: Callable[[str], Any],
+        logger: logging.Logger | None = None,
+    ) -> None:
+        """
+        :param database_path: The path of the (primary) database file.
+        :param snapshot_path: The path of the snapshot file.
+        :param interval: Seconds between refreshes of the snapshot.
+        :param store_factory: Creates a topic store for the path of a database file.
+        :param logger: Where to log failed refreshes.
+        """
+        self.database_path = database_path
+        self.snapshot_path = snapshot_path
+        self.interval = interval
+        self._store_factory = store_factory
+        self._logger = logger or logging.getLogger(__name__)
+        self._store = None
+        self._snapshot: tuple[int, int] | None = None  # (Inode, modification time) of the file the store reads
+        self._refreshing = False
+        self._lock = threading.Lock()
+
+    def get_store(self) -> Any | None:
+        """
+        The topic store reading the current snapshot, refreshing the snapshot first (in the background) if it is out of
+        date.
+        :return: The topic store or `None` as long as there is no snapshot yet.
+        """
+        try:
+            status = os.stat(self.snapshot_path)
+        except FileNotFoundError:
+            status = None
+
+        with self._lock:
+            out_of_date = status is None or time.time() - status.st_mtime >= self.interval
+            if out_of_date and not self._refreshing:
+                self._refreshing = True
+                threading.Thread(target=self._refresh, daemon=True).start()
+            if status is None:
+                return None
+            snapshot = (status.st_ino, status.st_mtime_ns)
+            if snapshot != self._snapshot:
+                # Connections (of the previous store) to a replaced snapshot keep reading the old file until closed
+                if self._store is not None:
+                    self._store.pool.close()
+                self._store = self._store_factory(self.snapshot_path)
+                self._snapshot = snapshot
+            return self._store
+
+    def refresh(self) -> None:
+        _make_snapshot(self.database_path, self.snapshot_path)
+
+    def _refresh(self) -> None:
+        try:
+            # Another process can have refreshed the snapshot in the meantime
+            try:
+                up_to_date = time.time() - os.stat(self.snapshot_path).st_mtime < self.interval
+            except FileNotFoundError:
+                up_to_date = False
+            if not up_to_date:
+                self.refresh()
+        except (OSError, sqlite3.Error) as error:
+            self._logger.error(f"Refreshing the read replica failed: {error}")
+        finally:
+            with self._lock:
+                self._refreshing = False
@@ -0,0 +1,215 @@
+"""
+resource_store.py file. Part of the Contextualise project.
+
+October 18, 2026
+Brett Alistair Kromkamp (brettkromkamp@gmail.com)
+"""
+
+import hashlib
+import hmac
+import os
+import secrets
+import shutil
+import time
+import uuid
+from collections import Counter
+from typing import BinaryIO
+
+from flask import current_app
+
+from contextualise import constants
+
+# The uploaded files are stored once, by the SHA-256 digest of their content, in the (hidden) blobs directory and hard
+# linked into the resources directories of the maps using them. The number of links of a stored file is the number of
+# maps using it; within a map, occurrences (and the map's image) with the same content share the same file. The
+# resources directories are served without access checks so the names of the links are keyed hashes of the map and the
+# digest: knowing a file's content doesn't reveal whether (or where) a map contains it. The key is the
+# 'RESOURCE_LINK_KEY' setting or, by default, a random key created once in the instance folder; when it changes, the
+# files that are uploaded again are linked under new names instead of sharing the existing links.
+#
+# Files are only ever unlinked by `collect_garbage`, after a grace period that `link_resource` restarts: a link that is
+# reused while the last occurrence referring to it is being deleted isn't removed before the new occurrence exists.
+BLOBS_DIRECTORY = ".blobs"
+LINK_KEY_FILE = "resource-link.key"
+
+_BLOCK_SIZE = 1024 * 1024
+
+
+def _resources_directory() -> str:
+    return os.path.join(current_app.static_folder, constants.RESOURCES_DIRECTORY)
+
+
+def _blob_path(digest: str) -> str:
+    return os.path.join(_resources_directory(), BLOBS_DIRECTORY, digest[:2], digest)
+
+
+def _link_key() -> bytes:
+    key = current_app.extensions.get("resource_link_key")
+    if key is None:
+        key = current_app.config.get("RESOURCE_LINK_KEY")
+        key = key.encode("utf-8") if isinstance(key, str) else key or _instance_link_key()
+        current_app.extensions["resource_link_key"] = key
+    return key
+
+
+def _instance_link_key() -> bytes:
+    path = os.path.join(current_app.instance_path, LINK_KEY_FILE)
+    if not os.path.exists(path):
+        os.makedirs(current_app.instance_path, exist_ok=True)
+        temporary_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        with open(temporary_path, "xb") as file:
+            file.write(secrets.token_bytes(32))
+        try:
+            os.link(temporary_path, path)  # Fails (rather than replacing the key) if another process created it first
+        except FileExistsError:
+            pass
+        finally:
+            os.remove(temporary_path)
+    with open(path, "rb") as file:
+        return file.read()
+
+
+def _link_name(map_identifier: int, digest: str) -> str:
+    return hmac.new(_link_key(), f"{map_identifier}:{digest}".encode("ascii"), hashlib.sha256).hexdigest()[:32]
+
+
+def get_map_directory(map_identifier: int) -> str:
+    return os.path.join(_resources_directory(), str(map_identifier))
+
+
+def _store_blob(path: str, digest: str) -> str:
+    blob_path = _blob_path(digest)
+    if os.path.exists(blob_path):
+        os.remove(path)
+        os.utime(blob_path)  # Keeps garbage collection away until the file is linked into a map
+    else:
+        os.makedirs(os.path.dirname(blob_path), exist_ok=True)
+        os.replace(path, blob_path)
+    return digest
+
+
+def save_blob(stream: BinaryIO) -> str:
+    """
+    Store a file (unless a file with the same content is already stored).
+    :param stream: The file's content.
+    :return: The SHA-256 digest of the content.
+    """
+    blobs_directory = os.path.join(_resources_directory(), BLOBS_DIRECTORY)
+    os.makedirs(blobs_directory, exist_ok=True)
+
+    digest = hashlib.sha256()
+    temporary_path = os.path.join(blobs_directory, f".{uuid.uuid4().hex}.tmp")
+    try:
+        with open(temporary_path, "xb") as file:
+            while block := stream.read(_BLOCK_SIZE):
+                digest.update(block)
+                file.write(block)
+    except BaseException:
+        os.remove(temporary_path)
+        raise
+    return _store_blob(temporary_path, digest.hexdigest())
+
+
+def add_blob(path: str) -> str:
+    """
+    Move a file (like a completed chunked upload) to the stored files.
+    :param path: The path of the file.
+    :return: The SHA-256 digest of the file's content.
+    """
+    blobs_directory = os.path.join(_resources_directory(), BLOBS_DIRECTORY)
+    os.makedirs(blobs_directory, exist_ok=True)
+    if os.stat(path).st_dev != os.stat(blobs_directory).st_dev:
+        # The instance folder is on another file system: the file can't be renamed (atomically) into place
+        with open(path, "rb") as file:
+            digest = save_blob(file)
+        os.remove(path)
+        return digest
+
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        while block := file.read(_BLOCK_SIZE):
+            digest.update(block)
+    return _store_blob(path, digest.hexdigest())
+
+
+def link_resource(map_identifier: int, digest: str, extension: str) -> str:
+    """
+    Make a stored file available in a map's resources directory (without copying it).
+    :param map_identifier: The topic map identifier.
+    :param digest: The SHA-256 digest of the file's content.
+    :param extension: The file's extension.
+    :return: The file name (the resource reference of the occurrence or the map's image path).
+    """
+    file_name = f"{_link_name(map_identifier, digest)}.{extension}"
+    directory = get_map_directory(map_identifier)
+    os.makedirs(directory, exist_ok=True)
+
+    path = os.path.join(directory, file_name)
+    try:
+        os.link(_blob_path(digest), path)
+    except FileExistsError:  # The map already uses the file: restart its grace period, see `collect_garbage`
+        os.utime(path)
+    except OSError:  # The file system doesn't support hard links
+        shutil.copyfile(_blob_path(digest), path)
+    return file_name
+
+
+def save_resource(map_identifier: int, stream: BinaryIO, extension: str) -> str:
+    """
+    Store an uploaded file and make it available in a map's resources directory.
+    :param map_identifier: The topic map identifier.
+    :param stream: The file's content.
+    :param extension: The file's extension.
+    :return: The file name (the resource reference of the occurrence or the map's image path).
+    """
+    return link_resource(map_identifier, save_blob(stream), extension)
+
+
+def collect_garbage(store, grace_period: float = constants.RESOURCE_GRACE_PERIOD, dry_run: bool = False) -> tuple:
+    """
+    Remove the files in the maps' resources directories that no occurrence (nor map image) refers to, like those of
+    deleted topics, followed by the stored files that aren't linked into any map anymore.
+    :param store: The topic store.
+    :param grace_period: Seconds files are left alone after they've been stored (or linked) so that the uploads in
+    progress aren't affected.
+    :param dry_run: Only count the files that would be removed.
+    :return: The number of removed files and the number of bytes freed.
+    """
+    removed_files = 0
+    freed_bytes = 0
+    removed_links = Counter()  # Inode -> number of (would be) removed links
+    now = time.time()
+    if not os.path.isdir(_resources_directory()):  # Nothing has been uploaded yet
+        return removed_files, freed_bytes
+
+    for map_entry in os.scandir(_resources_directory()):
+        if not map_entry.is_dir() or not map_entry.name.isdigit():
+            continue
+        reference_counts = store.get_resource_reference_counts(int(map_entry.name))
+        for entry in os.scandir(map_entry.path):
+            if entry.name in reference_counts or not entry.is_file():
+                continue
+            status = entry.stat()
+            if now - status.st_mtime < grace_period:
+                continue
+            if status.st_nlink - removed_links[status.st_ino] == 1:  # Not a link to a (still) stored file
+                freed_bytes += status.st_size
+            removed_links[status.st_ino] += 1
+            removed_files += 1
+            if not dry_run:
+                os.remove(entry.path)
+
+    blobs_directory = os.path.join(_resources_directory(), BLOBS_DIRECTORY)
+    if os.path.isdir(blobs_directory):
+        for prefix_entry in os.scandir(blobs_directory):
+            if not prefix_entry.is_dir():
+                continue
+            for entry in os.scandir(prefix_entry.path):
+                status = entry.stat()
+                if status.st_nlink - removed_links[status.st_ino] > 1 or now - status.st_mtime < grace_period:
+                    continue
+                freed_bytes += status.st_size
+                removed_files += 1
+                if not dry_run:
+                    os.remove(entry.path)
+    return removed_files, freed_bytes
@@ -0,0 +1,237 @@
+"""
+search_index.py file. Part of the Contextualise project.
+
+October 18, 2026
+Brett Alistair Kromkamp (brettkromkamp@gmail.com)
+"""
+
+import re
+import sqlite3
+from collections.abc import Iterator
+from contextlib import contextmanager
+
+from markupsafe import escape
+from topicdb.topicdberror import TopicDbError
+
+from ..topic_store import get_topic_store
+
+# Each topic map gets its own FTS5 table (in the topic store's database) so that a query only has to consider the
+# documents of the map being searched and deleting a map drops its index in one go. The tables are built on the first
+# search of a map and from then on kept current by the views that change names, texts, notes, links and attributes.
+INDEXED_OCCURRENCE_TYPES = ("text", "note", "url")
+
+_SNIPPET_START = "\x02"
+_SNIPPET_END = "\x03"
+_SNIPPET_TOKENS = 16
+_TITLE_WEIGHT = 4.0  # BM25 weight of names, titles and attribute names relative to the documents' text
+_MAX_TOPICS_PER_STATEMENT = 300  # The topic identifiers are bound three times (SQLite's older limit is 999 variables)
+
+_TOKEN = re.compile(r"\w+", re.UNICODE)
+
+
+def _table(map_identifier: int) -> str:
+    return f"search_{int(map_identifier)}"
+
+
+@contextmanager
+def _connection() -> Iterator[sqlite3.Connection]:
+    # The search index begins and commits its (immediate) transactions itself. A map's index is built on its first
+    # search, also by anonymous visitors, so it always uses the primary database.
+    with get_topic_store(primary=True).pool.connection() as connection:
+        connection.isolation_level = None
+        connection.row_factory = sqlite3.Row
+        yield connection
+
+
+def _table_exists(cursor: sqlite3.Cursor, map_identifier: int) -> bool:
+    cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (_table(map_identifier),))
+    return cursor.fetchone() is not None
+
+
+def _index_documents(cursor: sqlite3.Cursor, map_identifier: int, topic_identifiers: list[str] | None) -> None:
+    # (Re)index the names, text-like occurrences and attributes of all of the map's topics or just of some of them
+    table = _table(map_identifier)
+    if topic_identifiers is None:
+        topic_filter = ("", "", "")
+        bind_variables = ()
+    else:
+        placeholders = ", ".join("?" * len(topic_identifiers))
+        topic_filter = (
+            f" AND basename.topic_identifier IN ({placeholders})",
+            f" AND occurrence.topic_identifier IN ({placeholders})",
+            f" AND attribute.entity_identifier IN ({placeholders})",
+        )
+        bind_variables = tuple(topic_identifiers)
+    occurrence_types = ", ".join("?" * len(INDEXED_OCCURRENCE_TYPES))
+    cursor.execute(
+        f"""INSERT INTO {table} (topic_identifier, entity_identifier, kind, scope, title, content)
+        SELECT basename.topic_identifier, basename.identifier, 'name', basename.scope, basename.name, ''
+            FROM basename
+            JOIN topic ON topic.map_identifier = basename.map_identifier AND
+                topic.identifier = basename.topic_identifier AND
+                topic.scope IS NULL
+            WHERE basename.map_identifier = ?{topic_filter[0]}
+        UNION ALL
+        SELECT occurrence.topic_identifier, occurrence.identifier, occurrence.instance_of, occurrence.scope,
+            COALESCE((SELECT value FROM attribute
+                WHERE attribute.map_identifier = occurrence.map_identifier AND
+                attribute.entity_identifier = occurrence.identifier AND
+                attribute.name = 'title'
+                LIMIT 1), ''),
+            COALESCE(CAST(occurrence.resource_data AS TEXT), occurrence.resource_ref)
+            FROM occurrence
+            WHERE occurrence.map_identifier = ? AND
+            occurrence.instance_of IN ({occurrence_types}){topic_filter[1]}
+        UNION ALL
+        SELECT attribute.entity_identifier, attribute.identifier, 'attribute', attribute.scope, attribute.name,
+            attribute.value
+            FROM attribute
+            JOIN topic ON topic.map_identifier = attribute.map_identifier AND
+                topic.identifier = attribute.entity_identifier AND
+                topic.scope IS NULL
+            WHERE attribute.map_identifier = ? AND
+            attribute.data_type != 'timestamp'{topic_filter[2]}""",
+        (
+            map_identifier,
+            *bind_variables,
+            map_identifier,
+            *INDEXED_OCCURRENCE_TYPES,
+            *bind_variables,
+            map_identifier,
+            *bind_variables,
+        ),
+    )
+
+
+def _build_index(cursor: sqlite3.Cursor, map_identifier: int) -> None:
+    cursor.execute(
+        f"""CREATE VIRTUAL TABLE {_table(map_identifier)} USING fts5(
+            topic_identifier UNINDEXED,
+            entity_identifier UNINDEXED,
+            kind UNINDEXED,
+            scope UNINDEXED,
+            title,
+            content,
+            tokenize = 'unicode61 remove_diacritics 2'
+        )"""
+    )
+    _index_documents(cursor, map_identifier, None)
+
+
+def update_search_index(map_identifier: int, *topic_identifiers: str) -> None:
+    """
+    Bring the search index of a topic map up to date after (some of) the indexed data of one or more topics changed
+    (including the topics having been deleted or renamed).
+    :param map_identifier: The topic map identifier.
+    :param topic_identifiers: The identifiers of the topics to reindex.
+    """
+    topic_identifiers = list(dict.fromkeys(topic_identifiers))
+    if not topic_identifiers:
+        return
+
+    with _connection() as connection:
+        cursor = connection.cursor()
+        try:
+            cursor.execute("BEGIN IMMEDIATE")
+            if _table_exists(cursor, map_identifier):  # Maps that haven't been searched yet are indexed on first use
+                for index in range(0, len(topic_identifiers), _MAX_TOPICS_PER_STATEMENT):
+                    chunk = topic_identifiers[index : index + _MAX_TOPICS_PER_STATEMENT]
+                    placeholders = ", ".join("?" * len(chunk))
+                    cursor.execute(
+                        f"DELETE FROM {_table(map_identifier)} WHERE topic_identifier IN ({placeholders})", chunk
+                    )
+                    _index_documents(cursor, map_identifier, chunk)
+            cursor.execute("COMMIT")
+        except sqlite3.Error as error:
+            if connection.in_transaction:
+                connection.rollback()
+            raise TopicDbError(f"Error updating search index: {error}")
+        finally:
+            cursor.close()
+
+
+def drop_search_index(map_identifier: int) -> None:
+    with _connection() as connection:
+        cursor = connection.cursor()
+        try:
+            cursor.execute(f"DROP TABLE IF EXISTS {_table(map_identifier)}")
+        except sqlite3.Error as error:
+            raise TopicDbError(f"Error deleting search index: {error}")
+        finally:
+            cursor.close()
+
+
+def _match_expression(query: str) -> str | None:
+    # Every word of the query has to match (as a prefix) so that results narrow down while the user is typing. Quoting
+    # the words keeps FTS5's query syntax (operators, column filters) out of the user's hands.
+    tokens = _TOKEN.findall(query)
+    if not tokens:
+        return None
+    return " ".join(f'"{token}"*' for token in tokens)
+
+
+def _highlight(snippet: str) -> str:
+    return str(escape(snippet)).replace(_SNIPPET_START, "<mark>").replace(_SNIPPET_END, "</mark>")
+
+
+def search(
+    map_identifier: int, query: str, scope: str | None = None, offset: int = 0, limit: int = 20
+) -> tuple[int, list[dict]]:
+    """
+    Full-text search a topic map's names, texts, notes, links and attributes.
+    :param map_identifier: The topic map identifier.
+    :param query: The (free-form) search text.
+    :param scope: Only return matches in this scope.
+    :param offset: The number of matches to skip.
+    :param limit: The maximum number of matches to return.
+    :return: A tuple with the total number of matches and a list of dictionaries with each match's 'topic_identifier',
+    'entity_identifier', 'kind', 'scope', 'title' and (HTML) 'snippet' ordered by relevance (BM25).
+    """
+    match_expression = _match_expression(query)
+    if match_expression is None:
+        return 0, []
+
+    table = _table(map_identifier)
+    where = f"{table} MATCH ?{' AND scope = ?' if scope else ''}"
+    bind_variables = (match_expression, scope) if scope else (match_expression,)
+
+    with _connection() as connection:
+        cursor = connection.cursor()
+        try:
+            if not _table_exists(cursor, map_identifier):
+                cursor.execute("BEGIN IMMEDIATE")
+                if not _table_exists(cursor, map_identifier):  # Another process can have built it in the meantime
+                    _build_index(cursor, map_identifier)
+                cursor.execute("COMMIT")
+
+            cursor.execute(f"SELECT COUNT(*) FROM {table} WHERE {where}", bind_variables)
+            count = cursor.fetchone()[0]
+            cursor.execute(
+                f"""SELECT topic_identifier, entity_identifier, kind, scope, title,
+                    snippet({table}, -1, ?, ?, '…', ?) AS snippet
+                    FROM {table}
+                    WHERE {where}
+                    ORDER BY bm25({table}, 0.0, 0.0, 0.0, 0.0, ?, 1.0)
+                    LIMIT ? OFFSET ?""",
+                (_SNIPPET_START, _SNIPPET_END, _SNIPPET_TOKENS, *bind_variables, _TITLE_WEIGHT, limit, offset),
+            )
+            records = cursor.fetchall()
+        except sqlite3.Error as error:
+            if connection.in_transaction:
+                connection.rollback()
+            raise TopicDbError(f"Error searching map: {error}")
+        finally:
+            cursor.close()
+
+    result = [
+        {
+            "topic_identifier": record["topic_identifier"],
+            "entity_identifier": record["entity_identifier"],
+            "kind": record["kind"],
+            "scope": record["scope"],
+            "title": record["title"],
+            "snippet": _highlight(record["snippet"]),
+        }
+        for record in records
+    ]
+    return count, result
@@ -0,0 +1,140 @@
+"""
+trigram_index.py file. Part of the Contextualise project.
+
+October 18, 2026
+Brett Alistair Kromkamp (brettkromkamp@gmail.com)
+"""
+
+import re
+import threading
+from array import array
+from collections import Counter, defaultdict
+from collections.abc import Iterable
+from heapq import nlargest
+from typing import NamedTuple
+
+SIMILARITY_THRESHOLD = 0.3  # Minimum (Jaccard) similarity of the trigrams of a query and a topic's identifier or name
+
+_WORD = re.compile(r"[^\W_]+")
+
+
+class SimilarTopic(NamedTuple):
+    identifier: str
+    name: str | None
+    similarity: float
+
+
+def trigrams(text: str) -> frozenset[str]:
+    # Like PostgreSQL's pg_trgm: the (lower-cased, alphanumeric) words are padded with two spaces in front and one behind
+    result = set()
+    for word in _WORD.findall(text.lower()):
+        padded = f"  {word} "
+        result.update([padded[index : index + 3] for index in range(len(padded) - 2)])
+    return frozenset(result)
+
+
+class TrigramIndex:
+    """
+    An inverted index from trigrams to the identifiers and base names of a topic map's topics for (typo-tolerant)
+    similarity lookups.
+    """
+
+    def __init__(self, records: Iterable[tuple[str, str, str | None]]) -> None:
+        """
+        :param records: The (topic identifier, topic type, base name) tuples of the map's topics, one per base name.
+        """
+        self._keys: list[tuple[str, int] | None] = []  # (Topic identifier, number of trigrams); `None` if removed
+        self._postings: dict[str, array] = defaultdict(lambda: array("i"))
+        self._topics: dict[str, tuple[str, str | None, list[int]]] = {}  # Identifier -> (type, name, keys)
+        self._lock = threading.Lock()
+
+        names = defaultdict(list)
+        instance_ofs = {}
+        for identifier, instance_of, name in records:
+            instance_ofs[identifier] = instance_of
+            if name:
+                names[identifier].append(name)
+        for identifier, instance_of in instance_ofs.items():
+            self._add(identifier, instance_of, names[identifier])
+
+    def __len__(self) -> int:
+        return len(self._topics)
+
+    def similar(
+        self,
+        query: str,
+        limit: int = 5,
+        instance_ofs: list[str] | None = None,
+        threshold: float = SIMILARITY_THRESHOLD,
+    ) -> list[SimilarTopic]:
+        """
+        Find the topics whose identifier or one of whose names is most similar to the query.
+        :param query: The (prospective) topic name or identifier.
+        :param limit: The maximum number of topics to return.
+        :param instance_ofs: Only consider topics of these types.
+        :param threshold: The minimum similarity (between 0 and 1).
+        :return: The most similar topics, most similar first.
+        """
+        query_trigrams = trigrams(query)
+        if not query_trigrams:
+            return []
+
+        with self._lock:
+            counts = Counter()
+            for trigram in query_trigrams:
+                postings = self._postings.get(trigram)
+                if postings:
+                    counts.update(postings)
+
+            # A key can only reach the threshold if it shares at least this many trigrams with the query
+            minimum_count = threshold * len(query_trigrams)
+            similarities = {}
+            for key, count in counts.items():
+                if count < minimum_count or self._keys[key] is None:
+                    continue
+                identifier, size = self._keys[key]
+                similarity = count / (len(query_trigrams) + size - count)
+                if similarity >= threshold and similarity > similarities.get(identifier, 0.0):
+                    similarities[identifier] = similarity
+
+            if instance_ofs is not None:
+                similarities = {
+                    identifier: similarity
+                    for identifier, similarity in similarities.items()
+                    if self._topics[identifier][0] in instance_ofs
+                }
+            best = nlargest(limit, similarities.items(), key=lambda item: (item[1], item[0]))
+            return [
+                SimilarTopic(identifier, self._topics[identifier][1], round(similarity, 3))
+                for identifier, similarity in best
+            ]
+
+    def update(self, identifier: str, records: Iterable[tuple[str, str, str | None]]) -> None:
+        """
+        Replace a topic's entries.
+        :param identifier: The topic identifier.
+        :param records: The topic's current (topic identifier, topic type, base name) tuples. None if the topic no
+        longer exists.
+        """
+        records = list(records)
+        with self._lock:
+            topic = self._topics.pop(identifier, None)
+            if topic is not None:
+                for key in topic[2]:  # The keys' postings are skipped from now on
+                    self._keys[key] = None
+            if records:
+                self._add(identifier, records[0][1], [name for _, _, name in records if name])
+
+    def _add(self, identifier: str, instance_of: str, names: list[str]) -> None:
+        keys = []
+        postings = self._postings
+        for text in dict.fromkeys([identifier, *names]):
+            text_trigrams = trigrams(text)
+            if not text_trigrams:
+                continue
+            key = len(self._keys)
+            self._keys.append((identifier, len(text_trigrams)))
+            for trigram in text_trigrams:
+                postings[trigram].append(key)
+            keys.append(key)
+        self._topics[identifier] = (instance_of, names[0] if names else None, keys)
@@ -0,0 +1,225 @@
+"""
+uploads.py file. Part of the Contextualise project.
+
+October 18, 2026
+Brett Alistair Kromkamp (brettkromkamp@gmail.com)
+"""
+
+import json
+import os
+import re
+import time
+import uuid
+from typing import BinaryIO
+
+from flask import current_app
+
+from contextualise import constants
+
+from .resource_store import add_blob, link_resource
+
+# The types of occurrence that can be uploaded (in chunks) and their allowed file extensions (`None` for any)
+UPLOAD_KINDS = {
+    "image": constants.IMAGE_EXTENSIONS_WHITELIST,
+    "file": None,
+    "3d-scene": constants.THREE_D_EXTENSIONS_WHITELIST,
+}
+
+_UPLOAD_IDENTIFIER = re.compile(r"^[0-9a-f]{32}$")
+_PART_FILE_NAME = re.compile(r"^([0-9a-f]{32})\.part$")
+_BLOCK_SIZE = 64 * 1024
+
+
+class UploadError(Exception):
+    def __init__(self, message: str, code: int) -> None:
+        """
+        :param message: What went wrong.
+        :param code: The corresponding HTTP status code.
+        """
+        super().__init__(message)
+        self.code = code
+
+
+def get_file_extension(file_name: str) -> str:
+    return file_name.rsplit(".", 1)[1].lower() if "." in file_name else ""
+
+
+# Uploads in progress are kept in the instance folder (rather than in the publicly served resources directories), per
+# map, as a '<upload identifier>.part' file with a '<upload identifier>.json' file describing the upload next to it.
+# Only `finish_upload` moves the received file to the stored files
+UPLOADS_DIRECTORY = "uploads"
+
+
+def _uploads_directory() -> str:
+    return os.path.join(current_app.instance_path, UPLOADS_DIRECTORY)
+
+
+def get_upload_directory(map_identifier: int) -> str:
+    return os.path.join(_uploads_directory(), str(map_identifier))
+
+
+def _part_path(directory: str, upload_identifier: str) -> str:
+    return os.path.join(directory, f"{upload_identifier}.part")
+
+
+def _metadata_path(directory: str, upload_identifier: str) -> str:
+    return os.path.join(directory, f"{upload_identifier}.json")
+
+
+def start_upload(directory: str, file_name: str, size: int, kind: str, user_identifier: int, max_size: int) -> dict:
+    """
+    Check an upload's file name and size up front and set up the (empty) file it is streamed to.
+    :param directory: The map's uploads directory; see `get_upload_directory`.
+    :param file_name: The (original) name of the file.
+    :param size: The size of the file (in bytes).
+    :param kind: The type of occurrence; see `UPLOAD_KINDS`.
+    :param user_identifier: The user uploading the file.
+    :param max_size: The maximum size of the file (in bytes).
+    :return: The upload's description, including its 'identifier' and (current) 'offset'.
+    """
+    if kind not in UPLOAD_KINDS:
+        raise UploadError(f"Unsupported kind of upload: '{kind}'", 400)
+    extension = get_file_extension(file_name)
+    allowed_extensions = UPLOAD_KINDS[kind]
+    if not extension or (allowed_extensions is not None and extension not in allowed_extensions):
+        raise UploadError(f"Files of this type can't be uploaded as a {kind}: '{file_name}'", 415)
+    if size <= 0:
+        raise UploadError("The file is empty", 400)
+    if size > max_size:
+        raise UploadError(f"The file is larger than {max_size} bytes", 413)
+
+    if not os.path.isdir(directory):
+        os.makedirs(directory)
+    remove_expired_uploads(directory)
+
+    upload = {
+        "identifier": uuid.uuid4().hex,
+        "file_name": file_name,
+        "extension": extension,
+        "size": size,
+        "kind": kind,
+        "user_identifier": user_identifier,
+    }
+    with open(_metadata_path(directory, upload["identifier"]), "w", encoding="utf-8") as file:
+        json.dump(upload, file)
+    open(_part_path(directory, upload["identifier"]), "wb").close()
+    return {**upload, "offset": 0}
+
+
+def get_upload(directory: str, upload_identifier: str, user_identifier: int) -> dict:
+    """
+    Look up an upload in progress, for example to resume it.
+    :param directory: The map's uploads directory.
+    :param upload_identifier: The upload identifier.
+    :param user_identifier: The user uploading the file.
+    :return: The upload's description, including the number of bytes received so far as its 'offset'.
+    """
+    if not _UPLOAD_IDENTIFIER.match(upload_identifier):
+        raise UploadError("Upload not found", 404)
+    try:
+        with open(_metadata_path(directory, upload_identifier), encoding="utf-8") as file:
+            upload = json.load(file)
+        offset = os.path.getsize(_part_path(directory, upload_identifier))
+    except FileNotFoundError:
+        raise UploadError("Upload not found", 404)
+    if upload["user_identifier"] != user_identifier:
+        raise UploadError("Upload not found", 404)
+    return {**upload, "offset": offset}
+
+
+def write_chunk(directory: str, upload: dict, offset: int, stream: BinaryIO) -> int:
+    """
+    Append a chunk to an upload, a block at a time. The bytes received before a dropped connection are kept so that
+    the upload can be resumed from the (new) offset.
+    :param directory: The map's uploads directory.
+    :param upload: The upload as returned by `get_upload`.
+    :param offset: The position of the chunk in the file, which has to be the upload's current offset.
+    :param stream: The chunk.
+    :return: The upload's new offset.
+    """
+    if offset != upload["offset"]:
+        raise UploadError(f"The upload continues at offset {upload['offset']}", 409)
+
+    position = offset
+    with open(_part_path(directory, upload["identifier"]), "r+b") as file:
+        file.seek(offset)
+        while True:
+            block = stream.read(_BLOCK_SIZE)
+            if not block:
+                break
+            if position + len(block) > upload["size"]:
+                file.truncate(offset)  # The chunk is rejected as a whole
+                raise UploadError(f"The file is larger than the announced {upload['size']} bytes", 413)
+            file.write(block)
+            position += len(block)
+    return position
+
+
+def finish_upload(directory: str, upload: dict, map_identifier: int) -> str:
+    """
+    Move a completely received upload to the stored files and link it into the map's resources directory.
+    :param directory: The map's uploads directory.
+    :param upload: The upload as returned by `get_upload`.
+    :param map_identifier: The topic map identifier.
+    :return: The file name (the resource reference of the upload's occurrence).
+    """
+    if upload["offset"] != upload["size"]:
+        raise UploadError(f"Only {upload['offset']} of {upload['size']} bytes have been received", 409)
+
+    digest = add_blob(_part_path(directory, upload["identifier"]))
+    os.remove(_metadata_path(directory, upload["identifier"]))
+    return link_resource(map_identifier, digest, upload["extension"])
+
+
+def cancel_upload(directory: str, upload_identifier: str) -> None:
+    for path in (_part_path(directory, upload_identifier), _metadata_path(directory, upload_identifier)):
+        try:
+            os.remove(path)
+        except FileNotFoundError:  # Removed by another process in the meantime
+            pass
+
+
+def remove_expired_uploads(directory: str, max_age: float = constants.UPLOAD_EXPIRY, dry_run: bool = False) -> tuple:
+    """
+    Remove the uploads (of a map) that haven't received a chunk for a while. Abandoned uploads are removed when the next
+    upload to the same map starts and by `collect_expired_uploads`.
+    :param directory: The map's uploads directory.
+    :param max_age: Seconds after the last chunk an upload is considered abandoned.
+    :param dry_run: Only count the uploads that would be removed.
+    :return: The number of removed uploads and the number of bytes freed.
+    """
+    removed_uploads = 0
+    freed_bytes = 0
+    now = time.time()
+    for entry in os.scandir(directory):
+        match = _PART_FILE_NAME.match(entry.name)
+        if match is None:
+            continue
+        try:
+            status = entry.stat()
+        except FileNotFoundError:  # Finished or cancelled in the meantime
+            continue
+        if now - status.st_mtime > max_age:
+            removed_uploads += 1
+            freed_bytes += status.st_size
+            if not dry_run:
+                cancel_upload(directory, match.group(1))
+    return removed_uploads, freed_bytes
+
+
+def collect_expired_uploads(max_age: float = constants.UPLOAD_EXPIRY, dry_run: bool = False) -> tuple:
+    """
+    Remove the abandoned uploads of all maps, including those of maps that nobody uploads to anymore.
+    :param max_age: Seconds after the last chunk an upload is considered abandoned.
+    :param dry_run: Only count the uploads that would be removed.
+    :return: The number of removed uploads and the number of bytes freed.
+    """
+    removed_uploads = 0
+    freed_bytes = 0
+    if os.path.isdir(_uploads_directory()):
+        for entry in os.scandir(_uploads_directory()):
+            if entry.is_dir() and entry.name.isdigit():
+                uploads, size = remove_expired_uploads(entry.path, max_age, dry_run)
+                removed_uploads += uploads
+                freed_bytes += size
+    return removed_uploads, freed_bytes
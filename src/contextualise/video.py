@@ -16,6 +16,8 @@ from topicdb.topicdberror import TopicDbError
 
 from contextualise.utilities.topicstore import initialize
 
+from .utilities.map_cache import get_notes_count
+
 bp = Blueprint("video", __name__)
 
 
@@ -45,7 +47,7 @@ def index(map_identifier, topic_identifier):
     creation_date_attribute = topic.get_attribute_by_name("creation-timestamp")
     creation_date = maya.parse(creation_date_attribute.value) if creation_date_attribute else "Undefined"
 
-    map_notes_count = store.get_topic_occurrences_statistics(map_identifier, "notes")["note"]
+    map_notes_count = get_notes_count(map_identifier)
 
     return render_template(
         "video/index.html",
@@ -62,7 +64,7 @@ def index(map_identifier, topic_identifier):
 def add(map_identifier, topic_identifier):
     store, topic_map, topic = initialize(map_identifier, topic_identifier, current_user)
 
-    map_notes_count = store.get_topic_occurrences_statistics(map_identifier, "notes")["note"]
+    map_notes_count = get_notes_count(map_identifier)
     error = 0
 
     if request.method == "POST":
@@ -148,7 +150,7 @@ def edit(map_identifier, topic_identifier, video_identifier):
     form_video_title = video_occurrence.get_attribute_by_name("title").value
     form_video_scope = video_occurrence.scope
 
-    map_notes_count = store.get_topic_occurrences_statistics(map_identifier, "notes")["note"]
+    map_notes_count = get_notes_count(map_identifier)
     error = 0
 
     if request.method == "POST":
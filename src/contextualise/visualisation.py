@@ -12,6 +12,8 @@ from topicdb.store.retrievalmode import RetrievalMode
 from werkzeug.exceptions import abort
 
 from .topic_store import get_topic_store
+from .utilities.map_access import get_map_access
+from .utilities.map_cache import get_notes_count
 
 bp = Blueprint("visualisation", __name__)
 
@@ -20,27 +22,13 @@ bp = Blueprint("visualisation", __name__)
 def _initialize(map_identifier, topic_identifier, current_user):
     store = get_topic_store()
 
-    collaboration_mode = None
-    if current_user.is_authenticated:  # User is logged in
-        is_map_owner = store.is_map_owner(map_identifier, current_user.id)
-        if is_map_owner:
-            topic_map = store.get_map(map_identifier, current_user.id)
-        else:
-            topic_map = store.get_map(map_identifier)
-        if topic_map is None:
-            abort(404)
-        collaboration_mode = store.get_collaboration_mode(map_identifier, current_user.id)
-        # The map is private and doesn't belong to the user who is trying to
-        # access it
-        if not topic_map.published and not is_map_owner:
-            if not collaboration_mode:  # The user is not collaborating on the map
-                abort(403)
-    else:  # User is not logged in
-        topic_map = store.get_map(map_identifier)
-        if topic_map is None:
-            abort(404)
-        if not topic_map.published:  # User is not logged in and the map is not published
-            abort(403)
+    map_access = get_map_access(map_identifier, current_user)
+    topic_map = map_access.topic_map
+    if topic_map is None:
+        abort(404)
+    # The map is private and the user is neither its owner nor collaborating on it
+    if not map_access.can_read:
+        abort(403)
 
     topic = store.get_topic(
         map_identifier,
@@ -58,12 +46,12 @@ def _initialize(map_identifier, topic_identifier, current_user):
 
 @bp.route("/visualisations/network/<map_identifier>/<topic_identifier>")
 def network(map_identifier, topic_identifier):
-    store, topic_map, topic = _initialize(map_identifier, topic_identifier, current_user)
+    _, topic_map, topic = _initialize(map_identifier, topic_identifier, current_user)
 
     creation_date_attribute = topic.get_attribute_by_name("creation-timestamp")
     creation_date = maya.parse(creation_date_attribute.value) if creation_date_attribute else "Undefined"
 
-    map_notes_count = store.get_topic_occurrences_statistics(map_identifier, "notes")["note"]
+    map_notes_count = get_notes_count(map_identifier)
 
     return render_template(
         "visualisation/network.html",
@@ -94,7 +82,7 @@ def tags_cloud(map_identifier, topic_identifier):
     creation_date_attribute = topic.get_attribute_by_name("creation-timestamp")
     creation_date = maya.parse(creation_date_attribute.value) if creation_date_attribute else "Undefined"
 
-    map_notes_count = store.get_topic_occurrences_statistics(map_identifier, "notes")["note"]
+    map_notes_count = get_notes_count(map_identifier)
 
     return render_template(
         "visualisation/tags_cloud.html",
@@ -109,12 +97,12 @@ def tags_cloud(map_identifier, topic_identifier):
 
 @bp.route("/visualisations/timeline/<map_identifier>/<topic_identifier>")
 def timeline(map_identifier, topic_identifier):
-    store, topic_map, topic = _initialize(map_identifier, topic_identifier, current_user)
+    _, topic_map, topic = _initialize(map_identifier, topic_identifier, current_user)
 
     creation_date_attribute = topic.get_attribute_by_name("creation-timestamp")
     creation_date = maya.parse(creation_date_attribute.value) if creation_date_attribute else "Undefined"
 
-    map_notes_count = store.get_topic_occurrences_statistics(map_identifier, "notes")["note"]
+    map_notes_count = get_notes_count(map_identifier)
 
     return render_template(
         "visualisation/timeline.html",
@@ -128,12 +116,12 @@ def timeline(map_identifier, topic_identifier):
 
 @bp.route("/visualisations/geographic-map/<map_identifier>/<topic_identifier>")
 def geographic_map(map_identifier, topic_identifier):
-    store, topic_map, topic = _initialize(map_identifier, topic_identifier, current_user)
+    _, topic_map, topic = _initialize(map_identifier, topic_identifier, current_user)
 
     creation_date_attribute = topic.get_attribute_by_name("creation-timestamp")
     creation_date = maya.parse(creation_date_attribute.value) if creation_date_attribute else "Undefined"
 
-    map_notes_count = store.get_topic_occurrences_statistics(map_identifier, "notes")["note"]
+    map_notes_count = get_notes_count(map_identifier)
 
     return render_template(
         "visualisation/geographic_map.html",
@@ -0,0 +1,58 @@
+"""
+conftest.py file. Part of the Contextualise project.
+
+October 18, 2026
+Brett Alistair Kromkamp (brettkromkamp@gmail.com)
+"""
+
+import pytest
+from flask import Flask
+from flask_login import LoginManager, UserMixin
+
+from contextualise import topic_store
+from contextualise.utilities import map_cache
+
+USER_IDENTIFIER = 1
+
+
+class User(UserMixin):
+    id = USER_IDENTIFIER
+
+
+@pytest.fixture
+def store(tmp_path):
+    """
+    A topic store with one (populated) map owned by `USER_IDENTIFIER`.
+    """
+    store = topic_store.TopicStore(str(tmp_path / "contextualise.sqlite3"))
+    store.create_database()
+    map_identifier = store.create_map(USER_IDENTIFIER, "Test map", initialised=True)
+    store.populate_map(map_identifier, USER_IDENTIFIER)
+    store.map_identifier = map_identifier
+    yield store
+    store.pool.close()
+
+
+@pytest.fixture
+def app(tmp_path, store):
+    """
+    A bare application with the topic store, the map caches and a login manager whose (only) user is `User`.
+    """
+    app = Flask("contextualise", instance_path=str(tmp_path / "instance"))
+    app.config.from_object("contextualise.settings")
+    app.config.update(TESTING=True, DATABASE_PATH=store.database_path, SECRET_KEY="test")
+    topic_store.init_app(app)
+    map_cache.init_app(app)
+    LoginManager(app).user_loader(lambda identifier: User())
+    yield app
+    app.extensions["topic_store"].pool.close()
+
+
+@pytest.fixture
+def resource_app(app, tmp_path):
+    """
+    The application (context) with a static folder of its own, for the uploaded files.
+    """
+    app.static_folder = str(tmp_path / "static")
+    with app.app_context():
+        yield app
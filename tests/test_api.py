@@ -0,0 +1,108 @@
+"""
+test_api.py file. Part of the Contextualise project.
+
+October 18, 2026
+Brett Alistair Kromkamp (brettkromkamp@gmail.com)
+"""
+
+import pytest
+from conftest import User
+from flask_login import login_user
+from topicdb.models.attribute import Attribute
+from topicdb.models.occurrence import Occurrence
+
+from contextualise import api
+
+
+def create_topics(app, map_identifier, items):
+    with app.test_request_context(method="POST", json=items):
+        login_user(User())
+        response, code = api.create_topics(str(map_identifier))
+        return code, {
+            result["identifier"]: (result["code"], result.get("message")) for result in response.json["results"]
+        }
+
+
+def test_create_topics(app, store):
+    code, results = create_topics(
+        app,
+        store.map_identifier,
+        [
+            {"identifier": "person", "name": "Person"},
+            {"identifier": "ada-lovelace", "instanceOf": "person", "name": "Ada Lovelace", "scope": "person"},
+        ],
+    )
+
+    assert code == 201
+    assert results == {"person": (201, None), "ada-lovelace": (201, None)}
+    assert store.get_topic(store.map_identifier, "ada-lovelace").instance_of == "person"
+
+
+def test_create_topics_rejects_existing_and_duplicate_topics(app, store):
+    code, results = create_topics(
+        app, store.map_identifier, [{"identifier": "home"}, {"identifier": "new"}, {"identifier": "new"}, {"name": "x"}]
+    )
+
+    assert code == 207
+    assert [result[0] for result in results.values()] == [409, 409, 400]
+    assert store.topic_exists(store.map_identifier, "new")
+
+
+def test_create_topics_rejects_items_referring_to_rejected_items(app, store):
+    code, results = create_topics(
+        app,
+        store.map_identifier,
+        [
+            # Each item's type is the next item, and the last one's type doesn't exist
+            {"identifier": "subspecies", "instanceOf": "species"},
+            {"identifier": "species", "instanceOf": "genus"},
+            {"identifier": "genus", "instanceOf": "missing"},
+            {"identifier": "scoped", "scope": "species"},
+            {"identifier": "valid", "instanceOf": "home"},
+        ],
+    )
+
+    assert code == 207
+    assert results == {
+        "subspecies": (409, "Topic type 'species' does not exist"),
+        "species": (409, "Topic type 'genus' does not exist"),
+        "genus": (409, "Topic type 'missing' does not exist"),
+        "scoped": (409, "Scope 'species' does not exist"),
+        "valid": (201, None),
+    }
+    assert store.get_topic_instance_ofs(
+        store.map_identifier, ["subspecies", "species", "genus", "scoped", "valid"]
+    ) == {"valid": "home"}
+
+
+def get_geographic_map(app, map_identifier, bounding_box, zoom=0):
+    with app.test_request_context(query_string={"bbox": bounding_box, "zoom": zoom}):
+        login_user(User())
+        response, code = api.get_geographic_map(str(map_identifier))
+        return code, response.json
+
+
+@pytest.mark.parametrize("bounding_box", ["0,0,10", "0,nan,10,10", "-inf,0,10,10", "0,0,1e400,10"])
+def test_get_geographic_map_rejects_invalid_bounding_box(app, store, bounding_box):
+    location = Occurrence("amsterdam", "location", "home", resource_data="Amsterdam")
+    store.create_entities(
+        store.map_identifier,
+        occurrences=[location],
+        attributes=[Attribute("geographic-coordinates", "52.37,4.89", "amsterdam")],
+    )
+
+    code, _ = get_geographic_map(app, store.map_identifier, bounding_box)
+    assert code == 400
+
+
+def test_get_geographic_map_clamps_latitudes(app, store):
+    store.create_entities(
+        store.map_identifier,
+        occurrences=[Occurrence("north-pole", "location", "home", resource_data="North Pole")],
+        attributes=[Attribute("geographic-coordinates", "90,0", "north-pole")],
+    )
+
+    # Unclamped, the (cluster) grid cells of latitudes this large overflow
+    code, result = get_geographic_map(app, store.map_identifier, "-10,-1.7e308,10,1.7e308", zoom=10)
+    assert code == 200
+    assert [location["occurrence_identifier"] for location in result["locations"]] == ["north-pole"]
@@ -0,0 +1,49 @@
+"""
+test_database.py file. Part of the Contextualise project.
+
+October 18, 2026
+Brett Alistair Kromkamp (brettkromkamp@gmail.com)
+"""
+
+from topicdb.models.topic import Topic
+from topicdb.store.retrievalmode import RetrievalMode
+
+from contextualise.utilities.database import ConnectionPool
+
+
+def test_nested_blocks_share_connection(tmp_path):
+    pool = ConnectionPool(str(tmp_path / "pool.sqlite3"), size=1, timeout=0.1)
+    with pool.connection() as connection:
+        connection.execute("CREATE TABLE test (value INTEGER)")
+        connection.execute("INSERT INTO test VALUES (1)")
+        with pool.connection() as nested_connection:  # Would time out (with a pool of one) if it checked out another
+            assert nested_connection is connection
+        assert connection.in_transaction  # Only the outermost block rolls back
+
+    assert pool.metrics().checkouts == 1
+    with pool.connection() as connection:
+        assert connection.execute("SELECT COUNT(*) FROM test").fetchone() == (0,)
+    pool.close()
+
+
+def test_topicdb_methods_use_pool(store):
+    store.create_topic(store.map_identifier, Topic("test", "topic", "Test"))
+    checkouts = store.pool.metrics().checkouts
+
+    # `get_topic` calls `get_attributes` and `get_topic_occurrences` with a connection of its own checked out
+    topic = store.get_topic(
+        store.map_identifier,
+        "test",
+        resolve_attributes=RetrievalMode.RESOLVE_ATTRIBUTES,
+        resolve_occurrences=RetrievalMode.RESOLVE_OCCURRENCES,
+    )
+
+    assert topic.first_base_name.name == "Test"
+    assert store.pool.metrics().checkouts == checkouts + 1
+    assert store.pool.metrics().open == 1
+
+
+def test_topicdb_methods_without_open_pool_connect(store):
+    store.pool.close()
+    assert store.get_topic(store.map_identifier, "home") is not None
+    assert store.pool.metrics().open == 0
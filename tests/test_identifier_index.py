@@ -0,0 +1,54 @@
+"""
+test_identifier_index.py file. Part of the Contextualise project.
+
+October 18, 2026
+Brett Alistair Kromkamp (brettkromkamp@gmail.com)
+"""
+
+from contextualise.utilities.identifier_index import IdentifierIndex
+
+RECORDS = [
+    ("ada-lovelace", "person", "Ada Lovelace"),
+    ("ada-lovelace", "person", "Augusta Ada King"),
+    ("adder", "animal", "Adder"),
+    ("alan-turing", "person", "Alan Turing"),
+    ("analytical-engine", "machine", None),
+    ("countess", "title", "Countess of Lovelace"),
+]
+
+
+def test_lookup_matches_identifiers_before_names():
+    index = IdentifierIndex(RECORDS)
+
+    assert len(index) == 5
+    assert index.lookup("ad") == ["ada-lovelace", "adder"]
+    assert index.lookup("AUG") == ["ada-lovelace"]  # By name, case-insensitively
+    assert index.lookup("a") == ["ada-lovelace", "adder", "alan-turing", "analytical-engine"]
+    assert index.lookup("a", limit=2) == ["ada-lovelace", "adder"]
+    assert index.lookup("countess o") == ["countess"]
+    assert index.lookup("lovelace") == []  # Only prefixes match
+
+
+def test_lookup_by_topic_type():
+    index = IdentifierIndex(RECORDS)
+
+    assert index.lookup("a", instance_ofs=["person", "machine"]) == ["ada-lovelace", "alan-turing", "analytical-engine"]
+    assert index.lookup("a", instance_ofs=["missing"]) == []
+
+
+def test_update_replaces_topic_entries():
+    index = IdentifierIndex(RECORDS)
+
+    index.update("adder", [("adder", "snake", "Common European Adder")])
+    assert index.lookup("ad", instance_ofs=["animal"]) == []
+    assert index.lookup("common") == ["adder"]
+    assert index.lookup("adder", instance_ofs=["snake"]) == ["adder"]
+
+    index.update("ada-lovelace", [])  # Deleted
+    assert index.lookup("ada") == []
+    assert index.lookup("aug") == []
+    assert len(index) == 4
+
+    index.update("babbage", [("babbage", "person", "Charles Babbage")])  # Created
+    assert index.lookup("charles") == ["babbage"]
+    assert index.lookup("b", instance_ofs=["person"]) == ["babbage"]
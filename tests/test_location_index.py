@@ -0,0 +1,73 @@
+"""
+test_location_index.py file. Part of the Contextualise project.
+
+October 18, 2026
+Brett Alistair Kromkamp (brettkromkamp@gmail.com)
+"""
+
+from contextualise.utilities.location_index import Location, LocationIndex
+
+
+def location(identifier, latitude, longitude):
+    return Location(identifier, identifier, identifier.title(), "", latitude, longitude, identifier)
+
+
+LOCATIONS = [
+    location("amsterdam", 52.37, 4.89),
+    location("utrecht", 52.09, 5.12),
+    location("antwerp", 51.22, 4.40),
+    location("suva", -18.14, 178.44),  # Fiji, west of the antimeridian
+    location("apia", -13.83, -171.76),  # Samoa, east of the antimeridian
+]
+
+
+def identifiers(locations):
+    return sorted(location.occurrence_identifier for location in locations)
+
+
+def test_within_bounding_box():
+    index = LocationIndex(LOCATIONS)
+
+    assert len(index) == 5
+    assert index.get("antwerp") == LOCATIONS[2]
+    assert identifiers(index.within(4.0, 52.0, 6.0, 53.0)) == ["amsterdam", "utrecht"]
+    assert identifiers(index.within(4.0, 51.0, 6.0, 53.0)) == ["amsterdam", "antwerp", "utrecht"]
+    assert identifiers(index.within(4.0, 52.0, 5.5, 52.2)) == ["utrecht"]  # Amsterdam's grid cell, not Amsterdam
+    assert index.within(10.0, 10.0, 20.0, 20.0) == []
+
+
+def test_within_across_antimeridian():
+    index = LocationIndex(LOCATIONS)
+
+    # A viewport from 170 E to 170 W, as (wrapping) map libraries report it: east of 180 or west of -180
+    assert identifiers(index.within(170.0, -20.0, 190.0, -10.0)) == ["apia", "suva"]
+    assert identifiers(index.within(-190.0, -20.0, -170.0, -10.0)) == ["apia", "suva"]
+    # The same viewport given with west greater than east
+    assert identifiers(index.within(170.0, -20.0, -170.0, -10.0)) == ["apia", "suva"]
+    # A viewport wider than the world
+    assert identifiers(index.within(-200.0, -90.0, 200.0, 90.0)) == identifiers(LOCATIONS)
+
+
+def test_clusters():
+    index = LocationIndex(LOCATIONS)
+
+    locations, clusters = index.clusters(-180.0, -90.0, 180.0, 90.0, 0)
+    assert identifiers(locations) == ["apia", "suva"]  # In clusters of their own
+    assert len(clusters) == 1
+    cluster = clusters[0]
+    assert cluster.count == 3
+    assert (cluster.south, cluster.west, cluster.north, cluster.east) == (51.22, 4.40, 52.37, 5.12)
+    assert round(cluster.latitude, 2) == 51.89
+
+    # Amsterdam and Utrecht are still clustered when Antwerp no longer is
+    locations, clusters = index.clusters(-180.0, -90.0, 180.0, 90.0, 6)
+    assert identifiers(locations) == ["antwerp", "apia", "suva"]
+    assert [cluster.count for cluster in clusters] == [2]
+
+
+def test_clusters_across_antimeridian():
+    index = LocationIndex(LOCATIONS)
+
+    locations, clusters = index.clusters(170.0, -20.0, 190.0, -10.0, 4)
+    assert identifiers(locations) == ["apia", "suva"]
+    assert clusters == []
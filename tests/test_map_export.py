@@ -0,0 +1,55 @@
+"""
+test_map_export.py file. Part of the Contextualise project.
+
+October 18, 2026
+Brett Alistair Kromkamp (brettkromkamp@gmail.com)
+"""
+
+import io
+import json
+
+from conftest import USER_IDENTIFIER
+from topicdb.models.association import Association
+from topicdb.models.attribute import Attribute
+from topicdb.models.occurrence import Occurrence
+from topicdb.models.topic import Topic
+
+from contextualise.utilities.map_export import RECORD_TYPES, export_records
+from contextualise.utilities.map_import import MapImporter, read_ndjson
+
+
+def all_records(store, map_identifier):
+    return {
+        record_type: store.get_map_records(map_identifier, record_type, limit=10000, resolve_resource_data=True)
+        for record_type in RECORD_TYPES
+    }
+
+
+def test_export_pages_and_import_round_trip(store):
+    store.create_entities(
+        store.map_identifier,
+        topics=[Topic(f"topic-{index}", "topic", f"Topic {index}") for index in range(7)],
+        occurrences=[
+            Occurrence("topic-1-text", "text", "topic-1", resource_data="Text with ünicode"),
+            Occurrence("topic-2-file", "file", "topic-2", resource_data=b"\xff\x00\xfe"),
+        ],
+        associations=[Association("topic-1-topic-2", src_topic_ref="topic-1", dest_topic_ref="topic-2")],
+        attributes=[Attribute("colour", "green", "topic-3")],
+    )
+    topic_map = store.get_map(store.map_identifier)
+
+    # Pages of three records exercise the keyset pagination (at page boundaries as well)
+    chunks = list(export_records(store, topic_map, resolve_resource_data=True, page_size=3))
+    lines = "".join(chunks).splitlines()
+    header = json.loads(lines[0])
+    assert header["type"] == "map"
+    assert header["identifier"] == store.map_identifier
+    assert all(chunk.count("\n") <= 3 for chunk in chunks)
+    assert len(lines) == 1 + sum(len(records) for records in all_records(store, store.map_identifier).values())
+
+    copy_identifier = store.create_map(USER_IDENTIFIER, "Copy", initialised=True)
+    importer = MapImporter(store, copy_identifier, batch_size=4, creation_timestamps=False)
+    progress = importer.import_records(read_ndjson(io.StringIO("\n".join(lines))))
+
+    assert (progress.skipped, progress.rejected) == (0, 0)
+    assert all_records(store, copy_identifier) == all_records(store, store.map_identifier)
@@ -0,0 +1,65 @@
+"""
+test_map_import.py file. Part of the Contextualise project.
+
+October 18, 2026
+Brett Alistair Kromkamp (brettkromkamp@gmail.com)
+"""
+
+from topicdb.topicdberror import TopicDbError
+
+from contextualise.utilities.map_import import MapImporter
+
+
+def note(identifier, topic_identifier, text):
+    return {
+        "type": "occurrence",
+        "identifier": identifier,
+        "topicIdentifier": topic_identifier,
+        "instanceOf": "note",
+        "resourceData": text,
+    }
+
+
+def test_failing_record_is_rejected_and_rest_of_batch_imported(store):
+    records = [
+        (1, {"identifier": "apple", "name": "Apple"}),
+        (2, note("apple-note", "apple", "First")),
+        (3, note("apple-note", "apple", "Second")),  # Fails the batch's transaction
+        (4, {"identifier": "pear", "name": "Pear", "text": "Pear text"}),
+        (5, {"type": "attribute", "entityIdentifier": "pear", "name": "colour", "value": "green"}),
+    ]
+    importer = MapImporter(store, store.map_identifier, batch_size=100)
+    progress = importer.import_records(records)
+
+    assert progress.rejected == 1
+    assert [line_number for line_number, _ in importer.rejections] == [3]
+    assert store.get_topic(store.map_identifier, "pear") is not None
+    assert [occurrence.identifier for occurrence in store.get_topic_occurrences(store.map_identifier, "apple")] == [
+        "apple-note"
+    ]
+    attributes = store.get_attributes(store.map_identifier, "pear")
+    assert [attribute.value for attribute in attributes if attribute.name == "colour"] == ["green"]
+
+
+def test_rejected_topic_drops_its_names_and_occurrences(store, monkeypatch):
+    create_entities = store.create_entities
+
+    def failing_create_entities(map_identifier, topics=(), **entities):
+        if any(topic.identifier == "broken" for topic in topics):
+            raise TopicDbError("Broken topic")
+        create_entities(map_identifier, topics=topics, **entities)
+
+    monkeypatch.setattr(store, "create_entities", failing_create_entities)
+    records = [
+        (1, {"identifier": "broken", "name": "Broken", "text": "Broken text"}),
+        (2, {"type": "baseName", "topicIdentifier": "broken", "name": "Also broken"}),
+        (3, {"identifier": "fine", "name": "Fine"}),
+    ]
+    importer = MapImporter(store, store.map_identifier, batch_size=100)
+    progress = importer.import_records(records)
+
+    assert progress.rejected == 1
+    assert importer.rejections[0][0] == 1
+    assert store.get_topic(store.map_identifier, "broken") is None
+    assert store.get_topic(store.map_identifier, "fine") is not None
+    assert store.get_topic_occurrences(store.map_identifier, "broken") == []
@@ -0,0 +1,55 @@
+"""
+test_resource_store.py file. Part of the Contextualise project.
+
+October 18, 2026
+Brett Alistair Kromkamp (brettkromkamp@gmail.com)
+"""
+
+import io
+import os
+
+from contextualise.utilities import resource_store
+
+
+def save(map_identifier, content):
+    return resource_store.save_resource(map_identifier, io.BytesIO(content), "txt")
+
+
+def test_link_key_is_created_once_in_instance_folder(resource_app):
+    file_name = save(1, b"Content")
+    key_path = os.path.join(resource_app.instance_path, resource_store.LINK_KEY_FILE)
+    with open(key_path, "rb") as file:
+        key = file.read()
+
+    resource_app.extensions.pop("resource_link_key")
+    resource_app.secret_key = "another-secret-key"
+    assert save(1, b"Content") == file_name
+    with open(key_path, "rb") as file:
+        assert file.read() == key
+    assert save(2, b"Content") != file_name
+
+
+def test_link_key_setting(resource_app):
+    resource_app.config["RESOURCE_LINK_KEY"] = "configured-key"
+    file_name = save(1, b"Content")
+    assert not os.path.exists(os.path.join(resource_app.instance_path, resource_store.LINK_KEY_FILE))
+
+    resource_app.extensions.pop("resource_link_key")
+    resource_app.config["RESOURCE_LINK_KEY"] = "another-key"
+    assert save(1, b"Content") != file_name
+
+
+def test_unreferenced_files_are_collected_after_grace_period(resource_app, store):
+    file_name = save(store.map_identifier, b"Content")
+    path = os.path.join(resource_store.get_map_directory(store.map_identifier), file_name)
+    os.utime(path, (0, 0))
+    assert save(store.map_identifier, b"Content") == file_name  # Reusing the link restarts its grace period
+
+    assert resource_store.collect_garbage(store, grace_period=60) == (0, 0)
+    assert os.path.exists(path)
+    assert resource_store.collect_garbage(store, grace_period=0) == (2, len(b"Content"))
+    assert not os.path.exists(path)
+
+
+def test_collect_garbage_without_uploaded_files(resource_app, store):
+    assert resource_store.collect_garbage(store) == (0, 0)
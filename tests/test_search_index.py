@@ -0,0 +1,47 @@
+"""
+test_search_index.py file. Part of the Contextualise project.
+
+October 18, 2026
+Brett Alistair Kromkamp (brettkromkamp@gmail.com)
+"""
+
+import pytest
+from topicdb.models.occurrence import Occurrence
+from topicdb.models.topic import Topic
+
+from contextualise.utilities.search_index import _match_expression, search, update_search_index
+
+
+@pytest.mark.parametrize(
+    "query, expression",
+    [
+        ("lovelace", '"lovelace"*'),
+        ("  Ada   Love ", '"Ada"* "Love"*'),
+        ("engine:analytical", '"engine"* "analytical"*'),  # Not a column filter
+        ('ada OR "babbage" NOT turing*', '"ada"* "OR"* "babbage"* "NOT"* "turing"*'),  # Not operators
+        ("café naïve", '"café"* "naïve"*'),
+        ("", None),
+        ('- * " ( )', None),
+    ],
+)
+def test_match_expression(query, expression):
+    assert _match_expression(query) == expression
+
+
+def test_search(app, store):
+    store.create_entities(
+        store.map_identifier,
+        topics=[Topic("ada-lovelace", "topic", "Ada Lovelace")],
+        occurrences=[Occurrence("ada-text", "text", "ada-lovelace", resource_data="Notes on the Analytical Engine")],
+    )
+    with app.app_context():
+        count, results = search(store.map_identifier, "analyt")
+        assert count == 1
+        assert results[0]["topic_identifier"] == "ada-lovelace"
+        assert "<mark>Analytical</mark>" in results[0]["snippet"]
+        assert search(store.map_identifier, "engine NOT")[0] == 1  # A prefix of "Notes" rather than an operator
+
+        store.create_entities(store.map_identifier, topics=[Topic("babbage", "topic", "Charles Babbage")])
+        assert search(store.map_identifier, "charles") == (0, [])  # Until the index is brought up to date
+        update_search_index(store.map_identifier, "babbage")
+        assert search(store.map_identifier, "charles")[0] == 1
@@ -0,0 +1,56 @@
+"""
+test_trigram_index.py file. Part of the Contextualise project.
+
+October 18, 2026
+Brett Alistair Kromkamp (brettkromkamp@gmail.com)
+"""
+
+from contextualise.utilities.trigram_index import SimilarTopic, TrigramIndex, trigrams
+
+RECORDS = [
+    ("ada-lovelace", "person", "Ada Lovelace"),
+    ("alan-turing", "person", "Alan Turing"),
+    ("turing-machine", "machine", "Turing Machine"),
+    ("analytical-engine", "machine", None),
+]
+
+
+def test_trigrams_of_words():
+    assert trigrams("Ada") == {"  a", " ad", "ada", "da "}
+    assert trigrams("a-b") == trigrams("A B") == {"  a", " a ", "  b", " b "}
+    assert trigrams("--") == frozenset()
+
+
+def test_similar_tolerates_typos():
+    index = TrigramIndex(RECORDS)
+
+    assert len(index) == 4
+    assert [topic.identifier for topic in index.similar("Alan Turnig")] == ["alan-turing"]
+    assert index.similar("Ada Lovelace")[0] == SimilarTopic("ada-lovelace", "Ada Lovelace", 1.0)
+    assert index.similar("analytical engine")[0] == SimilarTopic("analytical-engine", None, 1.0)
+    assert index.similar("zzz") == []
+    assert index.similar("") == []
+
+
+def test_similar_orders_filters_and_limits():
+    index = TrigramIndex(RECORDS)
+
+    results = index.similar("turing", threshold=0.1)
+    assert [topic.identifier for topic in results] == ["alan-turing", "turing-machine"]  # Fewer other trigrams
+    assert results[0].similarity > results[1].similarity
+    assert [topic.identifier for topic in index.similar("turing", threshold=0.1, limit=1)] == ["alan-turing"]
+    assert [topic.identifier for topic in index.similar("turing", threshold=0.1, instance_ofs=["machine"])] == [
+        "turing-machine"
+    ]
+
+
+def test_update_replaces_topic_entries():
+    index = TrigramIndex(RECORDS)
+
+    index.update("alan-turing", [("alan-turing", "person", "Alan Mathison")])
+    assert [topic.identifier for topic in index.similar("Alan Mathison")] == ["alan-turing"]
+    assert index.similar("Alan Mathison")[0].name == "Alan Mathison"
+
+    index.update("ada-lovelace", [])
+    assert index.similar("Ada Lovelace") == []
+    assert len(index) == 3
@@ -0,0 +1,68 @@
+"""
+test_uploads.py file. Part of the Contextualise project.
+
+October 18, 2026
+Brett Alistair Kromkamp (brettkromkamp@gmail.com)
+"""
+
+import io
+import os
+
+import pytest
+
+from contextualise.utilities import resource_store, uploads
+
+MAP_IDENTIFIER = 1
+USER_IDENTIFIER = 1
+CONTENT = b"A file uploaded in chunks"
+SIZE = len(CONTENT)
+
+
+def start(size=SIZE):
+    directory = uploads.get_upload_directory(MAP_IDENTIFIER)
+    upload = uploads.start_upload(directory, "notes.txt", size, "file", USER_IDENTIFIER, 1024)
+    return directory, upload
+
+
+def files(directory):
+    return sorted(
+        os.path.relpath(os.path.join(path, name), directory)
+        for path, _, names in os.walk(directory)
+        for name in names
+        if not name.endswith(".key")
+    )
+
+
+def test_upload_is_kept_out_of_static_folder_until_finished(resource_app):
+    directory, upload = start()
+    for offset in range(0, len(CONTENT), 10):
+        upload["offset"] = uploads.write_chunk(directory, upload, offset, io.BytesIO(CONTENT[offset : offset + 10]))
+    assert files(resource_app.static_folder) == []
+    assert directory.startswith(resource_app.instance_path)
+
+    file_name = uploads.finish_upload(directory, upload, MAP_IDENTIFIER)
+
+    assert os.listdir(directory) == []
+    with open(os.path.join(resource_store.get_map_directory(MAP_IDENTIFIER), file_name), "rb") as file:
+        assert file.read() == CONTENT
+
+
+def test_upload_rejects_chunk_beyond_announced_size(resource_app):
+    directory, upload = start(size=5)
+    with pytest.raises(uploads.UploadError) as error:
+        uploads.write_chunk(directory, upload, 0, io.BytesIO(CONTENT))
+    assert error.value.code == 413
+    assert uploads.get_upload(directory, upload["identifier"], USER_IDENTIFIER)["offset"] == 0
+
+
+def test_expired_uploads_are_collected(resource_app):
+    directory, expired = start()
+    _, current = start()
+    uploads.write_chunk(directory, expired, 0, io.BytesIO(CONTENT))
+    os.utime(os.path.join(directory, f"{expired['identifier']}.part"), (0, 0))
+
+    assert uploads.collect_expired_uploads(dry_run=True) == (1, SIZE)
+    assert uploads.collect_expired_uploads() == (1, SIZE)
+    with pytest.raises(uploads.UploadError):
+        uploads.get_upload(directory, expired["identifier"], USER_IDENTIFIER)
+    assert uploads.get_upload(directory, current["identifier"], USER_IDENTIFIER)["offset"] == 0